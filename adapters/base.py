@@ -1,15 +1,33 @@
 from abc import ABC, abstractmethod
 
+from .transport import get_transport
+
 class BaseAdapter(ABC):
     """
     Abstrakte Basisklasse für alle LLM-Adapter.
     Garantiert, dass jeder Adapter die gleiche Struktur liefert.
     """
 
+    # Einstellungen für den geteilten HTTP-Pool (siehe adapters/transport.py)
+    transport_settings = None
+    provider = None
+    model_name = None
+
+    @property
+    def transport(self):
+        """Geteilte, gepoolte Keep-Alive-Session für alle Adapter mit gleichen Einstellungen."""
+        return get_transport(self.transport_settings)
+
+    def model_digest(self):
+        """Eindeutiger Stand der Modellgewichte (für den Antwort-Cache), falls bekannt."""
+        return None
+
     @abstractmethod
-    def send(self, prompt: str) -> dict:
+    def send(self, prompt: str, options: dict = None) -> dict:
         """
         Sendet einen Prompt an das Modell und gibt ein standardisiertes 
         Dictionary mit Antwort und Metriken zurück.
+        `options` enthält optionale Generierungs-Einstellungen
+        (stream, max_tokens, deadline, stop_keywords).
         """
         pass
\ No newline at end of file
@@ -0,0 +1,43 @@
+from core.profiling import span
+from core.response_cache import BYPASS, READ_WRITE, make_key
+from .base import BaseAdapter
+
+class CachedAdapter(BaseAdapter):
+    """
+    Legt den persistenten Antwort-Cache zwischen Executor und einen Adapter.
+    Treffer werden mit `cached: True` markiert und kosten keine Inferenz.
+    """
+
+    def __init__(self, adapter, cache, policy=READ_WRITE):
+        self.adapter = adapter
+        self.cache = cache
+        self.policy = policy
+        self._digest = None
+
+    def _model_digest(self):
+        if self._digest is None:
+            self._digest = self.adapter.model_digest() or ""
+        return self._digest
+
+    def send(self, prompt: str, options: dict = None) -> dict:
+        if self.policy == BYPASS:
+            return self.adapter.send(prompt, options)
+
+        digest = self._model_digest()
+        # Ohne Digest lässt sich nicht garantieren, dass es dasselbe Modell ist
+        if not digest:
+            return self.adapter.send(prompt, options)
+
+        with span("cache.lookup"):
+            key = make_key(self.adapter.provider, self.adapter.model_name, digest, prompt, options)
+            hit = self.cache.get(key)
+        if hit is not None:
+            hit["cached"] = True
+            hit.setdefault("metrics", {})["cached"] = True
+            return hit
+
+        res = self.adapter.send(prompt, options)
+        if self.policy == READ_WRITE and "error" not in res:
+            with span("cache.store"):
+                self.cache.put(key, self.adapter.provider, self.adapter.model_name, digest, res)
+        return res
\ No newline at end of file
@@ -1,29 +1,101 @@
-import requests
+import json
 import time
+from core.metrics import percentile
+from core.profiling import span
+from core.scoring import KeywordStream
+from core.tokens import ESTIMATED, SERVER_REPORTED
 from .base import BaseAdapter
+from .transport import TransportError
+
+DEFAULT_HOST = "http://localhost:11434"
+
+def server_timings(data, wall_time):
+    """
+    Zerlegt Ollamas Nanosekunden-Zeiten in Sekunden: Modell laden, Prompt
+    verarbeiten, Generierung. `overhead` ist der Rest der Wanduhrzeit
+    (Netzwerk, Serialisierung, Harness).
+    """
+    if not data.get("total_duration"):
+        return {}
+    total = data["total_duration"] / 1e9
+    return {
+        "load_time": round(data.get("load_duration", 0) / 1e9, 4),
+        "prompt_tokens": data.get("prompt_eval_count", 0),
+        "prompt_time": round(data.get("prompt_eval_duration", 0) / 1e9, 4),
+        "gen_time": round(data.get("eval_duration", 0) / 1e9, 4),
+        "server_time": round(total, 4),
+        "overhead": round(max(wall_time - total, 0), 4),
+    }
 
 class OllamaAdapter(BaseAdapter):
-    def __init__(self, model_name, host="http://localhost:11434"):
+    provider = "ollama"
+
+    def __init__(self, model_name, host=None, transport_settings=None):
         self.model_name = model_name
-        self.url = f"{host}/api/chat"
+        self.host = (host or DEFAULT_HOST).rstrip("/")
+        self.url = f"{self.host}/api/chat"
+        self.transport_settings = transport_settings
+
+    def _get_models(self, endpoint):
+        try:
+            response = self.transport.get(f"{self.host}{endpoint}")
+            response.raise_for_status()
+            return response.json().get("models", [])
+        except Exception:
+            return None
+
+    def list_models(self):
+        """Installierte Modelle laut /api/tags (None, wenn der Host nicht erreichbar ist)."""
+        return self._get_models("/api/tags")
+
+    def list_loaded(self):
+        """Aktuell geladene Modelle laut /api/ps (None, wenn der Host nicht erreichbar ist)."""
+        return self._get_models("/api/ps")
+
+    def matches(self, name):
+        return name == self.model_name or name == f"{self.model_name}:latest"
+
+    def model_digest(self):
+        """Digest des Modells laut /api/tags (None, wenn nicht ermittelbar)."""
+        for m in self.list_models() or []:
+            if self.matches(m.get("name", "")):
+                return m.get("digest")
+        return None
+
+    def unload(self):
+        """Entlädt das Modell sofort (keep_alive 0), um Speicher für das nächste freizugeben."""
+        try:
+            self.transport.post(f"{self.host}/api/generate", {"model": self.model_name, "keep_alive": 0})
+            return True
+        except Exception:
+            return False
 
-    def send(self, prompt: str) -> dict:
+    def send(self, prompt: str, options: dict = None) -> dict:
+        options = options or {}
         payload = {
             "model": self.model_name,
             "messages": [{"role": "user", "content": prompt}],
-            "stream": False
+            "stream": bool(options.get("stream", False))
         }
+        if options.get("max_tokens"):
+            payload["options"] = {"num_predict": int(options["max_tokens"])}
+        if options.get("keep_alive") is not None:
+            payload["keep_alive"] = options["keep_alive"]
 
         start_time = time.time()
         try:
-            response = requests.post(self.url, json=payload, timeout=60)
-            response.raise_for_status()
+            if payload["stream"]:
+                return self._send_stream(payload, options)
+
+            with span("http.request"):
+                response, call = self.transport.post(self.url, payload)
             end_time = time.time()
-            
-            data = response.json()
-            
+
+            with span("adapter.parse"):
+                data = response.json()
+
             duration_total = end_time - start_time
-            eval_count = data.get("eval_count", 0) 
+            eval_count = data.get("eval_count", 0)
             tps = eval_count / (data.get("eval_duration", 1) / 1e9) if eval_count > 0 else 0
 
             return {
@@ -31,8 +103,98 @@ class OllamaAdapter(BaseAdapter):
                 "metrics": {
                     "duration": round(duration_total, 2),
                     "tps": round(tps, 2),
-                    "token_count": eval_count
+                    "token_count": eval_count,
+                    **server_timings(data, duration_total),
+                    "retries": call["retries"],
+                    "backoff_time": round(call["backoff_time"], 3),
+                    "connection_reused": call["connection_reused"]
                 }
             }
+        except TransportError as e:
+            return {"error": str(e), "metrics": {"retries": e.retries}}
         except Exception as e:
-            return {"error": str(e)}
\ No newline at end of file
+            return {"error": str(e)}
+
+    def _send_stream(self, payload, options):
+        """
+        Liest Ollamas NDJSON-Chunks, sobald sie eintreffen.
+        Misst Time-to-first-token und Inter-Token-Latenzen und bricht bei
+        max_tokens, Deadline oder (optional) vollständigen Keywords ab.
+        """
+        max_tokens = options.get("max_tokens")
+        deadline = options.get("deadline")
+        keywords = KeywordStream(options["stop_keywords"]) if options.get("stop_keywords") else None
+
+        start = time.perf_counter()
+        with span("http.request"):
+            response, call = self.transport.post(self.url, payload, stream=True)
+
+        pieces = []
+        token_times = []
+        final = {}
+        stop_reason = "incomplete"
+        # Eigenzeit von http.stream ist Warten auf Chunks; Parsen und Keyword-Prüfung messen eigene Spans
+        with span("http.stream"):
+            try:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    with span("adapter.parse"):
+                        chunk = json.loads(line)
+                    now = time.perf_counter()
+                    piece = chunk.get("message", {}).get("content", "")
+                    if piece:
+                        pieces.append(piece)
+                        token_times.append(now)
+
+                    if chunk.get("done"):
+                        final = chunk
+                        stop_reason = chunk.get("done_reason", "stop")
+                        break
+                    if max_tokens and len(token_times) >= max_tokens:
+                        stop_reason = "max_tokens"
+                        break
+                    if deadline and now - start >= deadline:
+                        stop_reason = "deadline"
+                        break
+                    if keywords is not None and piece:
+                        with span("score.stream"):
+                            complete = keywords.feed(piece)
+                        if complete:
+                            stop_reason = "keywords"
+                            break
+            finally:
+                # Schließen der Verbindung beendet die Generierung auch serverseitig
+                response.close()
+
+        duration_total = time.perf_counter() - start
+        gaps = [b - a for a, b in zip(token_times, token_times[1:])]
+
+        # Ohne Abschluss-Chunk (Abbruch) zählen die empfangenen Chunks, etwa ein Token je Chunk
+        eval_count = final.get("eval_count") or len(token_times)
+        if final.get("eval_duration"):
+            tps = eval_count / (final["eval_duration"] / 1e9)
+        elif len(token_times) > 1:
+            tps = (len(token_times) - 1) / (token_times[-1] - token_times[0])
+        else:
+            tps = 0
+
+        return {
+            "response": "".join(pieces),
+            "metrics": {
+                "duration": round(duration_total, 2),
+                "tps": round(tps, 2),
+                "token_count": eval_count,
+                "token_source": SERVER_REPORTED if final.get("eval_count") else ESTIMATED,
+                "ttft": round(token_times[0] - start, 3) if token_times else None,
+                "itl_mean": round(sum(gaps) / len(gaps), 4) if gaps else None,
+                "itl_p50": round(percentile(gaps, 50), 4) if gaps else None,
+                "itl_p95": round(percentile(gaps, 95), 4) if gaps else None,
+                "itl_max": round(max(gaps), 4) if gaps else None,
+                "stop_reason": stop_reason,
+                **server_timings(final, duration_total),
+                "retries": call["retries"],
+                "backoff_time": round(call["backoff_time"], 3),
+                "connection_reused": call["connection_reused"]
+            }
+        }
\ No newline at end of file
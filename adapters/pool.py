@@ -0,0 +1,198 @@
+import threading
+import time
+
+from .base import BaseAdapter
+from .ollama import OllamaAdapter
+
+NO_HOST_ERROR = "Kein gesunder Ollama-Host mit diesem Modell verfügbar"
+
+
+class _Host:
+    """Zustand eines Servers im Pool (nur unter dem Pool-Lock ändern)."""
+
+    def __init__(self, adapter, weight, max_concurrency):
+        self.adapter = adapter
+        self.url = adapter.host
+        self.weight = weight
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.sent = 0
+        self.errors = 0
+        self.failures = 0          # Fehler in Folge
+        self.ejections = 0
+        self.ejected = False
+        self.has_model = False
+        self.digest = None
+        self.checking = False
+        self.next_check = 0.0
+
+    @property
+    def usable(self):
+        return self.has_model and not self.ejected
+
+    def has_slot(self):
+        return self.max_concurrency is None or self.in_flight < self.max_concurrency
+
+
+class OllamaPoolAdapter(BaseAdapter):
+    """
+    Verteilt die Items eines Modells auf mehrere Ollama-Server. Jedes Item geht
+    an den gesunden Host mit dem Modell, der relativ zu seinem Gewicht am
+    wenigsten ausgelastet ist; volle Hosts (concurrency) werden übersprungen.
+    Nach `max_failures` Fehlern in Folge fliegt ein Host aus dem Pool und wird
+    alle `health_interval` Sekunden per /api/tags geprüft, bis er wieder antwortet.
+    Sind alle Hosts ausgesetzt, warten Items bis zu `outage_timeout` Sekunden
+    auf die nächste erfolgreiche Prüfung, statt sofort fehlzuschlagen.
+    Schlägt ein Item fehl, wird es einmal auf einem anderen Host wiederholt.
+    """
+    provider = "ollama"
+
+    def __init__(self, model_name, hosts, transport_settings=None, max_failures=3, health_interval=10.0,
+                 outage_timeout=60.0):
+        self.model_name = model_name
+        self.transport_settings = transport_settings
+        self.max_failures = max(1, int(max_failures))
+        self.health_interval = float(health_interval)
+        self.outage_timeout = float(outage_timeout)
+        self._hosts = [
+            _Host(OllamaAdapter(model_name, host=h["url"], transport_settings=transport_settings),
+                  float(h.get("weight") or 1), h.get("concurrency"))
+            for h in hosts
+        ]
+        self._cond = threading.Condition()
+        self._checked = False
+
+    # --- Gesundheit ---
+
+    def _check(self, host):
+        models = host.adapter.list_models()
+        entry = next((m for m in models or [] if host.adapter.matches(m.get("name", ""))), None)
+        with self._cond:
+            host.checking = False
+            if models is None:
+                host.ejected = True
+                host.next_check = time.monotonic() + self.health_interval
+            else:
+                host.has_model = entry is not None
+                host.digest = entry.get("digest") if entry else None
+                host.ejected = False
+                host.failures = 0
+            self._cond.notify_all()
+
+    def _start_check(self, host):
+        # Aufrufer hält den Lock
+        host.checking = True
+        thread = threading.Thread(target=self._check, args=(host,), daemon=True)
+        thread.start()
+        return thread
+
+    def _ensure_checked(self):
+        """Beim ersten Zugriff alle Hosts parallel prüfen (erreichbar? Modell vorhanden?)."""
+        with self._cond:
+            if self._checked:
+                return
+            self._checked = True
+            threads = [self._start_check(host) for host in self._hosts]
+        for thread in threads:
+            thread.join()
+
+    def _recheck_due(self):
+        # Aufrufer hält den Lock
+        now = time.monotonic()
+        for host in self._hosts:
+            if host.ejected and not host.checking and now >= host.next_check:
+                self._start_check(host)
+
+    # --- Verteilung ---
+
+    def _acquire(self, exclude=()):
+        self._ensure_checked()
+        give_up = time.monotonic() + self.outage_timeout
+        with self._cond:
+            self._recheck_due()
+            while True:
+                candidates = [h for h in self._hosts if h.usable and h not in exclude]
+                if not candidates:
+                    # Laufende Prüfungen abwarten; ausgesetzte Hosts können zurückkommen, also bis
+                    # zu ihrer nächsten fälligen Prüfung warten (Wiederholungen warten darauf nicht)
+                    pending = [h for h in self._hosts if (h.ejected or h.checking) and h not in exclude]
+                    checking = any(h.checking for h in pending)
+                    now = time.monotonic()
+                    if not pending or now >= give_up or (exclude and not checking):
+                        return None
+                    wake = give_up if checking else min(min(h.next_check for h in pending), give_up)
+                    self._cond.wait(max(wake - now, 0))
+                    self._recheck_due()
+                    continue
+                free = [h for h in candidates if h.has_slot()]
+                if free:
+                    host = min(free, key=lambda h: ((h.in_flight + 1) / h.weight, h.sent / h.weight))
+                    host.in_flight += 1
+                    return host
+                self._cond.wait()
+
+    def _release(self, host, failed):
+        with self._cond:
+            host.in_flight -= 1
+            host.sent += 1
+            if failed:
+                host.errors += 1
+                host.failures += 1
+                if host.failures >= self.max_failures and not host.ejected:
+                    host.ejected = True
+                    host.ejections += 1
+                    host.next_check = time.monotonic() + self.health_interval
+            else:
+                host.failures = 0
+            self._cond.notify_all()
+
+    def send(self, prompt: str, options: dict = None) -> dict:
+        tried = []
+        res = {"error": NO_HOST_ERROR}
+        while len(tried) < 2:
+            host = self._acquire(exclude=tried)
+            if host is None:
+                break
+            tried.append(host)
+            try:
+                res = host.adapter.send(prompt, options)
+            except Exception as e:
+                res = {"error": str(e)}
+            self._release(host, "error" in res)
+            res.setdefault("metrics", {})["host"] = host.url
+            if "error" not in res:
+                break
+        if len(tried) > 1:
+            # Fehlversuche zählen in der Run-Statistik des jeweiligen Hosts mit
+            res["metrics"]["failed_hosts"] = [h.url for h in tried[:-1]]
+        return res
+
+    # --- Verwaltung ---
+
+    def model_digest(self):
+        """
+        Digest des Modells für den Antwort-Cache. Melden die Hosts verschiedene
+        Builds (Digests), gibt es keinen gemeinsamen: None, der Cache bleibt aus.
+        """
+        self._ensure_checked()
+        with self._cond:
+            digests = {h.digest for h in self._hosts if h.has_model and h.digest}
+        return digests.pop() if len(digests) == 1 else None
+
+    def unload(self):
+        """Entlädt das Modell auf allen Hosts."""
+        return all([host.adapter.unload() for host in self._hosts])
+
+    def stats(self):
+        """Zähler pro Host: gesendet, Fehler, Auswürfe, gerade in Arbeit, Zustand."""
+        with self._cond:
+            return {
+                h.url: {
+                    "sent": h.sent,
+                    "errors": h.errors,
+                    "ejections": h.ejections,
+                    "in_flight": h.in_flight,
+                    "healthy": h.usable,
+                }
+                for h in self._hosts
+            }
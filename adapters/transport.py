@@ -0,0 +1,142 @@
+import json
+import random
+import threading
+import time
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.profiling import span
+
+# Status-Codes, bei denen ein erneuter Versuch sinnvoll ist (Überlast / Gateway)
+RETRYABLE_STATUS = {429, 502, 503, 504}
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+DEFAULT_SETTINGS = {
+    "pool_size": 10,
+    "connect_timeout": 5.0,
+    "read_timeout": 120.0,
+    "max_retries": 3,
+    "backoff_base": 0.5,
+    "backoff_max": 10.0,
+    "retry_on_read_timeout": False,
+}
+
+
+class TransportError(Exception):
+    """Request endgültig fehlgeschlagen; trägt die Anzahl der Retries mit."""
+
+    def __init__(self, message, retries=0):
+        super().__init__(message)
+        self.retries = retries
+
+
+class HttpTransport:
+    """
+    Gepoolte Keep-Alive-Session für alle Adapter.
+    Verbindungen werden pro Host wiederverwendet, transiente Fehler werden
+    mit exponentiellem Backoff (Full Jitter) wiederholt.
+    """
+
+    def __init__(self, **settings):
+        self.settings = {**DEFAULT_SETTINGS, **settings}
+        pool_size = int(self.settings["pool_size"])
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._known_connections = weakref.WeakSet()
+        self.stats = {"requests": 0, "new_connections": 0, "reused_connections": 0, "retries": 0}
+
+    @property
+    def timeout(self):
+        return (float(self.settings["connect_timeout"]), float(self.settings["read_timeout"]))
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.settings["backoff_max"])
+        ceiling = min(self.settings["backoff_max"], self.settings["backoff_base"] * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _track_connection(self, response, call):
+        # Läuft als Response-Hook, solange die Verbindung noch am Response hängt
+        # Der Socket (nicht das Connection-Objekt) zählt: urllib3 verbindet Objekte neu
+        conn = getattr(getattr(response.raw, "connection", None), "sock", None)
+        if conn is None:
+            return
+        with self._lock:
+            if conn in self._known_connections:
+                call["connection_reused"] = True
+                self.stats["reused_connections"] += 1
+            else:
+                self._known_connections.add(conn)
+                self.stats["new_connections"] += 1
+
+    def _is_retryable(self, error):
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        if isinstance(error, requests.ReadTimeout):
+            return bool(self.settings["retry_on_read_timeout"])
+        return isinstance(error, requests.ConnectionError)
+
+    def post(self, url, payload, stream=False):
+        """
+        Schickt einen JSON-POST und gibt (response, call_stats) zurück.
+        Wirft TransportError, wenn alle Versuche aufgebraucht sind.
+        """
+        call = {"retries": 0, "backoff_time": 0.0, "connection_reused": False}
+        hooks = {"response": lambda r, *args, **kwargs: self._track_connection(r, call)}
+        max_retries = int(self.settings["max_retries"])
+        # Einmal serialisieren (auch für Wiederholungen) und als eigene Phase messen
+        with span("adapter.serialize"):
+            body = json.dumps(payload, allow_nan=False).encode("utf-8")
+
+        for attempt in range(max_retries + 1):
+            with self._lock:
+                self.stats["requests"] += 1
+            call["connection_reused"] = False
+            response = None
+            try:
+                response = self.session.post(url, data=body, headers=JSON_HEADERS, timeout=self.timeout,
+                                             stream=stream, hooks=hooks)
+                if response.status_code not in RETRYABLE_STATUS:
+                    response.raise_for_status()
+                    return response, call
+                error = requests.HTTPError(f"{response.status_code} Server Error for url: {url}", response=response)
+                response.close()
+            except requests.RequestException as e:
+                if not self._is_retryable(e):
+                    raise TransportError(str(e), retries=call["retries"]) from e
+                error = e
+
+            if attempt >= max_retries:
+                raise TransportError(str(error), retries=call["retries"]) from error
+
+            delay = self._backoff(attempt, response)
+            call["retries"] += 1
+            call["backoff_time"] += delay
+            with self._lock:
+                self.stats["retries"] += 1
+            time.sleep(delay)
+
+    def get(self, url, timeout=None):
+        return self.session.get(url, timeout=timeout or self.timeout)
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(settings=None) -> HttpTransport:
+    """Liefert die prozessweit geteilte Transport-Instanz für diese Einstellungen."""
+    merged = {**DEFAULT_SETTINGS, **(settings or {})}
+    key = tuple(sorted(merged.items()))
+    with _transports_lock:
+        if key not in _transports:
+            _transports[key] = HttpTransport(**merged)
+        return _transports[key]
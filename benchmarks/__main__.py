@@ -0,0 +1,140 @@
+"""
+Benchmark-Suite für den Harness selbst (ohne echtes Modell, ohne Textual-Fenster).
+
+    python -m benchmarks                    # schnelle Fälle, Vergleich mit baseline.json
+    python -m benchmarks --full             # inkl. 100k Runs / 200k Items
+    python -m benchmarks -k scoring         # nur Fälle, deren Name "scoring" enthält
+    python -m benchmarks --update-baseline  # aktuelle Messung als neue Baseline speichern
+
+Gemessen wird die beste von mehreren Wiederholungen in Sekunden pro
+Operation. Ein Fall gilt als Regression, wenn er mehr als --tolerance
+langsamer ist als die Baseline; dann ist der Exit-Code 1. Die Baseline ist
+maschinenabhängig und sollte auf derselben Maschine (bzw. demselben
+CI-Runner-Typ) erzeugt werden, auf der verglichen wird.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+
+from benchmarks.cases import CASES
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks der Harness-Hot-Paths")
+    parser.add_argument("-k", "--filter", help="Nur Fälle, deren Name diesen Teilstring enthält")
+    parser.add_argument("--full", action="store_true", help="Auch die großen (langsamen) Fälle")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline-Datei (Default: benchmarks/baseline.json)")
+    parser.add_argument("--update-baseline", action="store_true", help="Ergebnisse in die Baseline übernehmen")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Erlaubte Verlangsamung (0.25 = +25%%)")
+    parser.add_argument("--json", action="store_true", help="Ergebnisse als JSON auf stdout")
+    return parser
+
+
+def _flatten(name, result):
+    """Ein Fall liefert ein Ergebnis oder mehrere benannte Teilergebnisse."""
+    if result is None:
+        return {}
+    if "seconds" in result:
+        return {name: result}
+    return {f"{name}.{sub}": value for sub, value in result.items()}
+
+
+def run_cases(name_filter=None, full=False):
+    """Führt die Fälle jeweils in einem frischen Temp-Verzeichnis aus."""
+    repo_dir = os.getcwd()
+    results = {}
+    for name, fn, full_only in CASES:
+        if (full_only and not full) or (name_filter and name_filter not in name):
+            continue
+        workdir = tempfile.mkdtemp(prefix="llm-bench-")
+        os.chdir(workdir)
+        try:
+            results.update(_flatten(name, fn()))
+        finally:
+            os.chdir(repo_dir)
+            shutil.rmtree(workdir, ignore_errors=True)
+        sys.stderr.write(f"  {name} fertig\n")
+    return results
+
+
+def load_baseline(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("results", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(path, results):
+    existing = load_baseline(path)
+    existing.update({name: {"seconds": r["seconds"]} for name, r in results.items()})
+    data = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "results": dict(sorted(existing.items())),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def compare(results, baseline, tolerance):
+    """Pro Fall: Verhältnis aktuell/Baseline und ob es eine Regression ist."""
+    rows = []
+    for name, result in results.items():
+        base = baseline.get(name, {}).get("seconds")
+        ratio = result["seconds"] / base if base else None
+        rows.append({
+            "name": name,
+            "seconds": result["seconds"],
+            "ops_per_s": round(1 / result["seconds"], 1) if result["seconds"] else None,
+            "baseline": base,
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            "regression": ratio is not None and ratio > 1 + tolerance,
+        })
+    return rows
+
+
+def _format_seconds(value):
+    if value is None:
+        return "-"
+    for unit, factor in (("s", 1), ("ms", 1e3), ("µs", 1e6)):
+        if value * factor >= 1:
+            return f"{value * factor:.2f}{unit}"
+    return f"{value * 1e9:.0f}ns"
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_cases(args.filter, args.full)
+    rows = compare(results, load_baseline(args.baseline), args.tolerance)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'Fall':<52} {'pro Op':>10} {'Baseline':>10} {'Faktor':>7}")
+        for row in rows:
+            mark = "  REGRESSION" if row["regression"] else ""
+            ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "neu"
+            print(
+                f"{row['name']:<52} {_format_seconds(row['seconds']):>10} "
+                f"{_format_seconds(row['baseline']):>10} {ratio:>7}{mark}"
+            )
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results)
+        sys.stderr.write(f"Baseline aktualisiert: {args.baseline}\n")
+        return EXIT_OK
+    return EXIT_REGRESSION if any(row["regression"] for row in rows) else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
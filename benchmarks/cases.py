@@ -0,0 +1,247 @@
+"""
+Benchmark-Fälle für die heißen Pfade des Harness.
+
+Jeder Fall bekommt ein frisches Arbeitsverzeichnis (relative Pfade wie
+config/history.db und datasets/ zeigen also in ein Temp-Verzeichnis) und
+gibt {"seconds": Sekunden pro Operation, "ops": Anzahl} zurück. Aufbau
+(Daten erzeugen, Server starten) zählt nicht zur Messzeit.
+"""
+import json
+import os
+import random
+import time
+
+CASES = []
+
+
+def case(name, full_only=False):
+    """Registriert einen Fall; `full_only` läuft nur mit --full (zu langsam für jeden Commit)."""
+    def register(fn):
+        CASES.append((name, fn, full_only))
+        return fn
+    return register
+
+
+def timed(fn, ops=1, repeat=3):
+    """Bester von `repeat` Durchläufen, umgerechnet auf Sekunden pro Operation."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {"seconds": best / ops, "ops": ops}
+
+
+# --- Scoring ---
+
+WORDS = ("modell", "antwort", "berlin", "paris", "quantisierung", "token", "latenz", "speicher",
+         "def", "return", "class", "import", "ß-straße", "überprüfung", "größe", "x")
+
+
+def _scoring_inputs(text_len, keyword_count, n, seed=1):
+    rng = random.Random(seed)
+    keywords = [f"{rng.choice(WORDS)}{i}" for i in range(keyword_count)]
+    inputs = []
+    for _ in range(n):
+        vocabulary = WORDS + tuple(keywords)
+        words, length = [], 0
+        while length < text_len:
+            word = rng.choice(vocabulary)
+            words.append(word)
+            length += len(word) + 1
+        inputs.append((" ".join(words), keywords))
+    return inputs
+
+
+def _scoring_case(text_len, keyword_count, n):
+    from core.scoring import score_response
+
+    inputs = _scoring_inputs(text_len, keyword_count, n)
+
+    def run():
+        for response, keywords in inputs:
+            score_response(response, keywords)
+    return timed(run, ops=n)
+
+
+@case("scoring.short_200c_5kw")
+def scoring_short():
+    return _scoring_case(200, 5, 2000)
+
+
+@case("scoring.medium_5kc_20kw")
+def scoring_medium():
+    return _scoring_case(5000, 20, 300)
+
+
+@case("scoring.long_100kc_50kw")
+def scoring_long():
+    return _scoring_case(100_000, 50, 10)
+
+
+# --- Run-Store ---
+
+def _fake_result(i):
+    return {
+        "id": f"item_{i}", "prompt": f"Prompt {i}", "response": "Antwort " * 20, "score": i % 101,
+        "status": "✅", "metrics": {"duration": 0.5, "token_count": 40, "tps": 80.0, "response_length": 160},
+        "business": {"completeness": True, "keywords_present": 0},
+    }
+
+
+def _populate_history(run_count, items_per_run=5):
+    """Füllt die Datenbank in einer Transaktion (Aufbau, nicht Teil der Messung)."""
+    from core import history_manager as hm
+
+    details = [_fake_result(i) for i in range(items_per_run)]
+    summary = hm.summarize_results(details)
+    conn = hm._connect()
+    try:
+        with conn:
+            for i in range(run_count):
+                run = {
+                    "id": f"20260101_{i:06d}", "created_at": f"2026-01-01T00:00:{i % 60:02d}.{i:06d}",
+                    "timestamp": "00:00 - 01.01.26", "model": f"model{i % 7}", "datasets": ["a.json"],
+                    "run_type": "single", "status": hm.STATUS_COMPLETE, **summary,
+                }
+                hm._insert_run(conn, run, details)
+    finally:
+        conn.close()
+
+
+def _history_cases(run_count):
+    from core import history_manager as hm
+    from core.regression import compare_runs
+
+    _populate_history(run_count)
+    results = {}
+    results["load_all_runs"] = timed(hm.load_all_runs)
+    results["query_first_page"] = timed(lambda: hm.query_runs(limit=100, sort="score"), repeat=5)
+    results["count_filtered"] = timed(lambda: hm.count_runs(model="model3"), repeat=5)
+    results["compare_runs"] = timed(
+        lambda: compare_runs("20260101_000000", f"20260101_{run_count - 7:06d}"), repeat=5
+    )
+    details = [_fake_result(i) for i in range(50)]
+    results["save_run_50_items"] = timed(lambda: hm.save_run("bench", ["a.json"], details), repeat=5)
+    return results
+
+
+@case("history.100_runs")
+def history_small():
+    return _history_cases(100)
+
+
+@case("history.10k_runs")
+def history_medium():
+    return _history_cases(10_000)
+
+
+@case("history.100k_runs", full_only=True)
+def history_large():
+    return _history_cases(100_000)
+
+
+# --- Datasets ---
+
+def _write_dataset(name, count, jsonl=False):
+    from core.datasets import DATASET_DIR
+
+    os.makedirs(DATASET_DIR, exist_ok=True)
+    items = (
+        {"id": f"q{i}", "category": f"cat{i % 5}", "weight": 1.0 + i % 3,
+         "prompt": f"Frage {i}: " + "Kontext " * 30, "expected_keywords": ["kontext", "frage"]}
+        for i in range(count)
+    )
+    with open(os.path.join(DATASET_DIR, name), "w", encoding="utf-8") as f:
+        if jsonl:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        else:
+            json.dump(list(items), f, ensure_ascii=False)
+
+
+def _dataset_case(count):
+    from core.datasets import build_manifest_entry, iter_items
+
+    _write_dataset("large.json", count)
+    _write_dataset("large.jsonl", count, jsonl=True)
+    return {
+        "iter_json": timed(lambda: sum(1 for _ in iter_items("large.json")), ops=count),
+        "iter_jsonl": timed(lambda: sum(1 for _ in iter_items("large.jsonl")), ops=count),
+        "manifest": timed(lambda: build_manifest_entry("large.json"), repeat=2),
+    }
+
+
+@case("datasets.20k_items")
+def datasets_medium():
+    return _dataset_case(20_000)
+
+
+@case("datasets.200k_items", full_only=True)
+def datasets_large():
+    return _dataset_case(200_000)
+
+
+# --- Ende-zu-Ende gegen den lokalen Fake-Server ---
+
+def _end_to_end(item_count, concurrency, stream):
+    from core.config_loader import ConfigLoader
+    from core.runner import run_suite
+    from devtools.fake_ollama import FakeOllama
+
+    _write_dataset("e2e.json", item_count)
+    fake = FakeOllama(models=["bench"], latency="0", tps="1000000", tokens=32)
+    url = fake.start()
+    try:
+        os.makedirs("config", exist_ok=True)
+        with open("config/config.yaml", "w", encoding="utf-8") as f:
+            f.write(
+                "app:\n  cache:\n    policy: bypass\n"
+                f"datasets:\n  default:\n    stream: {str(stream).lower()}\n"
+                f"providers:\n  ollama:\n    host: \"{url}\"\n    concurrency: {concurrency}\n"
+            )
+        config = ConfigLoader()
+        # Ohne Modell-Latenz misst das den Harness selbst: Items pro Sekunde
+        return timed(lambda: run_suite("bench", ["e2e.json"], config=config), ops=item_count, repeat=2)
+    finally:
+        fake.stop()
+
+
+@case("e2e.run_suite_500_items_c4")
+def e2e_blocking():
+    return _end_to_end(500, 4, stream=False)
+
+
+@case("e2e.run_suite_500_items_c4_stream")
+def e2e_stream():
+    return _end_to_end(500, 4, stream=True)
+
+
+# --- Textual ---
+
+@case("ui.archive_refresh_10k_runs")
+def ui_archive_refresh():
+    try:
+        from textual.app import App
+    except ImportError:
+        return None
+    import asyncio
+    from ui.results import ResultArchiveScreen
+
+    _populate_history(10_000)
+    result = {}
+
+    class BenchApp(App):
+        def on_mount(self):
+            self.push_screen(ResultArchiveScreen())
+
+    async def measure():
+        app = BenchApp()
+        async with app.run_test(size=(160, 50)) as pilot:
+            await pilot.pause()
+            screen = app.screen
+            result.update(timed(screen.refresh_history, repeat=5))
+
+    asyncio.run(measure())
+    return result
@@ -1,28 +1,328 @@
 import yaml
 import os
+import threading
+import time
+
+DEFAULT_CONFIG_PATH = "config/config.yaml"
+# Höchstens so oft (Sekunden) per stat() prüfen, ob sich die Datei geändert hat
+RELOAD_CHECK_INTERVAL = 0.5
+
+# Bekannte Schlüssel und ihre Typen. Unbekannte Schlüssel sind erlaubt,
+# "*" steht für einen beliebigen Provider.
+SCHEMA = {
+    "app": dict,
+    "app.name": str,
+    "app.default_threshold": (int, float),
+    "app.cache": dict,
+    "app.cache.policy": str,
+    "app.cache.path": str,
+    "app.cache.max_entries": int,
+    "app.cache.max_mb": (int, float),
+    "app.profiling": dict,
+    "app.profiling.trace": bool,
+    "app.profiling.trace_dir": str,
+    "app.profiling.trace_format": str,
+    "datasets": dict,
+    "tokenizer": dict,
+    "tokenizer.default": str,
+    "tokenizer.families": dict,
+    "tokenizer.workers": int,
+    "tokenizer.cache_path": str,
+    "sampling": dict,
+    "sampling.ci_width": (int, float),
+    "sampling.confidence": float,
+    "sampling.max_seconds": (int, float),
+    "sampling.max_tokens": int,
+    "sampling.seed": int,
+    "providers": dict,
+    "providers.*": dict,
+    "providers.*.models": list,
+    "providers.ollama.host": str,
+    "providers.ollama.hosts": list,
+    "providers.ollama.max_failures": int,
+    "providers.ollama.health_interval": (int, float),
+    "providers.ollama.outage_timeout": (int, float),
+    "providers.ollama.concurrency": int,
+    "providers.ollama.keep_alive": (str, int),
+    "providers.ollama.memory_budget_gb": (int, float),
+    "providers.ollama.inventory_ttl": (int, float),
+    "providers.ollama.transport": dict,
+}
+
+
+class ConfigError(ValueError):
+    """Config ist kein gültiges YAML oder passt nicht zum Schema."""
+
+    def __init__(self, problems):
+        self.problems = list(problems)
+        super().__init__("; ".join(self.problems))
+
+
+def _type_names(expected):
+    types = expected if isinstance(expected, tuple) else (expected,)
+    return " oder ".join(t.__name__ for t in types)
+
+
+def _check(path, value, problems):
+    for pattern, expected in SCHEMA.items():
+        parts = pattern.split(".")
+        keys = path.split(".")
+        if len(parts) == len(keys) and all(p in ("*", k) for p, k in zip(parts, keys)):
+            # bool ist in Python ein int, als Zahl aber fast immer ein Tippfehler
+            if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+                problems.append(f"{path}: erwartet {_type_names(expected)}, gefunden {type(value).__name__}")
+                return False
+    return True
+
+
+def _walk(prefix, data, problems):
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if _check(path, value, problems) and isinstance(value, dict) and path.count(".") < 2:
+            _walk(path, value, problems)
+
+
+def validate_config(data):
+    """Prüft eine geparste Config gegen SCHEMA und ein paar Wertebereiche; wirft ConfigError."""
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        raise ConfigError(["Oberste Ebene muss ein Mapping sein"])
+
+    problems = []
+    _walk("", data, problems)
+
+    app = data.get("app") or {}
+    threshold = app.get("default_threshold") if isinstance(app, dict) else None
+    if isinstance(threshold, (int, float)) and not 0 <= threshold <= 100:
+        problems.append("app.default_threshold: muss zwischen 0 und 100 liegen")
+    profiling = app.get("profiling") if isinstance(app, dict) else None
+    if isinstance(profiling, dict) and profiling.get("trace_format", "chrome") not in ("chrome", "speedscope"):
+        problems.append("app.profiling.trace_format: chrome oder speedscope")
+
+    sampling = data.get("sampling") or {}
+    if isinstance(sampling, dict):
+        if isinstance(sampling.get("confidence"), float) and not 0 < sampling["confidence"] < 1:
+            problems.append("sampling.confidence: muss zwischen 0 und 1 liegen (z.B. 0.95)")
+        if isinstance(sampling.get("ci_width"), (int, float)) and sampling["ci_width"] <= 0:
+            problems.append("sampling.ci_width: muss größer als 0 sein")
+
+    providers = data.get("providers") or {}
+    for provider, settings in (providers.items() if isinstance(providers, dict) else []):
+        if not isinstance(settings, dict):
+            continue
+        for i, model in enumerate(settings.get("models") or []):
+            if not isinstance(model, dict) or not isinstance(model.get("name"), str):
+                problems.append(f"providers.{provider}.models[{i}]: braucht einen Namen (name)")
+            elif "concurrency" in model and (not isinstance(model["concurrency"], int) or model["concurrency"] < 1):
+                problems.append(f"providers.{provider}.models[{i}].concurrency: ganze Zahl >= 1")
+        if isinstance(settings.get("concurrency"), int) and settings["concurrency"] < 1:
+            problems.append(f"providers.{provider}.concurrency: ganze Zahl >= 1")
+        host = settings.get("host")
+        if isinstance(host, str) and not host.startswith(("http://", "https://")):
+            problems.append(f"providers.{provider}.host: muss mit http:// oder https:// beginnen")
+        for i, entry in enumerate(settings.get("hosts") or []):
+            problems.extend(_host_problems(f"providers.{provider}.hosts[{i}]", entry))
+
+    if problems:
+        raise ConfigError(problems)
+    return data
+
+
+def _host_problems(path, entry):
+    """Ein Eintrag in providers.ollama.hosts: URL-String oder {url, weight, concurrency}."""
+    if isinstance(entry, str):
+        entry = {"url": entry}
+    if not isinstance(entry, dict):
+        return [f"{path}: erwartet URL oder Mapping mit url"]
+    problems = []
+    url = entry.get("url")
+    if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+        problems.append(f"{path}.url: muss mit http:// oder https:// beginnen")
+    weight = entry.get("weight", 1)
+    if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight <= 0:
+        problems.append(f"{path}.weight: Zahl > 0")
+    concurrency = entry.get("concurrency", 1)
+    if isinstance(concurrency, bool) or not isinstance(concurrency, int) or concurrency < 1:
+        problems.append(f"{path}.concurrency: ganze Zahl >= 1")
+    return problems
+
+
+def parse_config(text):
+    """YAML-Text -> validierte Config (wirft ConfigError)."""
+    try:
+        data = yaml.safe_load(text)
+    except yaml.YAMLError as e:
+        raise ConfigError([f"Ungültiges YAML: {e}"]) from None
+    return validate_config(data or {})
+
+
+def _index_models(data):
+    """(Provider, Modellname) -> Modell-Eintrag."""
+    index = {}
+    for provider, settings in (data.get("providers") or {}).items():
+        for model in (settings or {}).get("models") or []:
+            index[(provider, model["name"])] = model
+    return index
+
+
+class _ConfigFile:
+    """
+    Geparster Stand einer Config-Datei, prozessweit geteilt. Wird neu geladen,
+    sobald sich mtime oder Größe ändern; ist die neue Fassung ungültig, bleibt
+    die letzte gültige aktiv und `error` beschreibt das Problem.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._checked_at = 0.0
+        self.data = {}
+        self.index = {}
+        self.version = 0
+        self.error = None
+        self._load(first=True)
+
+    def _load(self, first=False):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if first:
+                raise FileNotFoundError(f"Konfigurationsdatei nicht gefunden: {self.path}") from None
+            self.error = f"Konfigurationsdatei nicht gefunden: {self.path}"
+            return
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        self._stamp = stamp
+        try:
+            data = parse_config(text)
+        except ConfigError as e:
+            if first:
+                raise
+            self.error = str(e)
+            return
+        self.data = data
+        self.index = _index_models(data)
+        self.error = None
+        self.version += 1
+
+    def current(self, force=False):
+        now = time.monotonic()
+        if force or now - self._checked_at >= RELOAD_CHECK_INTERVAL:
+            with self._lock:
+                self._checked_at = now
+                self._load()
+        return self
+
+
+_files = {}
+_files_lock = threading.Lock()
+
+
+def _config_file(path):
+    key = os.path.abspath(path)
+    with _files_lock:
+        if key not in _files:
+            _files[key] = _ConfigFile(path)
+        return _files[key]
+
 
 class ConfigLoader:
-    def __init__(self, config_path="config/config.yaml"):
+    """
+    Zugriff auf die config.yaml. Die Datei wird nur einmal pro Prozess geparst
+    und bei Änderungen (mtime) automatisch neu geladen; alle Instanzen für
+    denselben Pfad sehen also immer denselben, aktuellen Stand.
+    """
+
+    def __init__(self, config_path=DEFAULT_CONFIG_PATH):
         self.config_path = config_path
-        self.config = self._load_yaml()
+        self._file = _config_file(config_path)
+
+    @property
+    def config(self):
+        return self._file.current().data
+
+    @property
+    def version(self):
+        """Zählt bei jedem erfolgreichen Neuladen hoch (billige Änderungserkennung)."""
+        return self._file.current().version
 
-    def _load_yaml(self):
-        if not os.path.exists(self.config_path):
-            raise FileNotFoundError(f"Konfigurationsdatei nicht gefunden: {self.config_path}")
-        
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+    @property
+    def error(self):
+        """Problem der zuletzt gelesenen Fassung, falls sie ungültig war (sonst None)."""
+        return self._file.current().error
+
+    def reload(self):
+        """Sofort neu laden, ohne auf das Prüfintervall zu warten."""
+        self._file.current(force=True)
+        return self
+
+    def save_text(self, text):
+        """Validiert YAML-Text, schreibt ihn atomar und lädt neu (wirft ConfigError)."""
+        parse_config(text)
+        tmp_path = self.config_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, self.config_path)
+        return self.reload()
 
     def get_ollama_config(self):
         return self.config.get('providers', {}).get('ollama', {})
 
-    def get_model_metadata(self, model_name):
+    def get_model_metadata(self, model_name, provider="ollama"):
         """Sucht technische Eckdaten für ein spezifisches Modell."""
-        models = self.get_ollama_config().get('models', [])
-        for m in models:
-            if m['name'] == model_name:
-                return m
-        return {}
+        index = self._file.current().index
+        meta = index.get((provider, model_name))
+        if meta is None and model_name.endswith(":latest"):
+            meta = index.get((provider, model_name[:-len(":latest")]))
+        return meta or {}
+
+    def _model_concurrency(self, model_name):
+        value = self.get_model_metadata(model_name).get('concurrency') if model_name else None
+        if value is None:
+            value = self.get_ollama_config().get('concurrency', 1)
+        return max(1, int(value))
+
+    def get_ollama_hosts(self, model_name=None):
+        """
+        Ollama-Server als Liste von {url, weight, concurrency}: aus `hosts`,
+        sonst nur `host` (url None = Adapter-Default). Ohne eigenes Limit gilt
+        pro Host die Concurrency des Modells.
+        """
+        ollama = self.get_ollama_config()
+        default = self._model_concurrency(model_name)
+        hosts = []
+        for entry in ollama.get('hosts') or [ollama.get('host')]:
+            if not isinstance(entry, dict):
+                entry = {"url": entry}
+            hosts.append({
+                "url": entry.get("url"),
+                "weight": entry.get("weight", 1),
+                "concurrency": entry.get("concurrency", default),
+            })
+        return hosts
+
+    def get_concurrency(self, model_name):
+        """
+        Maximale parallele Requests für ein Modell (Modell-Eintrag vor Provider-Default),
+        bei mehreren Hosts die Summe ihrer Limits.
+        """
+        return sum(h["concurrency"] for h in self.get_ollama_hosts(model_name))
+
+    def get_dataset_options(self, dataset_name):
+        """Generierungs-Optionen (stream, max_tokens, deadline, ...) für ein Dataset."""
+        datasets = self.config.get('datasets') or {}
+        return {**(datasets.get('default') or {}), **(datasets.get(dataset_name) or {})}
+
+    def get_tokenizer_settings(self):
+        return self.config.get('tokenizer') or {}
+
+    def get_sampling_settings(self):
+        return self.config.get('sampling') or {}
 
     def get_app_settings(self):
-        return self.config.get('app', {})
\ No newline at end of file
+        return self.config.get('app', {})
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import threading
+
+DATASET_DIR = "datasets"
+DATASET_EXTENSIONS = (".json", ".jsonl")
+MANIFEST_FILE = "config/dataset_manifest.json"
+
+_READ_CHUNK = 1 << 16
+_WHITESPACE = " \t\r\n"
+_manifest_lock = threading.Lock()
+
+
+def list_datasets(dataset_dir=DATASET_DIR):
+    """Alle Dataset-Dateien (.json / .jsonl), alphabetisch."""
+    if not os.path.exists(dataset_dir):
+        return []
+    return sorted(f for f in os.listdir(dataset_dir) if f.endswith(DATASET_EXTENSIONS))
+
+
+def _check_item(item, number):
+    if not isinstance(item, dict):
+        raise ValueError(f"Item {number} ist kein JSON-Objekt: {json.dumps(item, ensure_ascii=False)[:40]}")
+    return item
+
+
+def _iter_json_array(f):
+    """
+    Liest ein JSON-Array elementweise, ohne die ganze Datei zu parsen.
+    Es liegt immer nur ein Lesepuffer plus das aktuelle Item im Speicher.
+    Items müssen Objekte sein: nur die sind selbstbegrenzend, eine Zahl am
+    Pufferende ließe sich nicht von ihrem abgeschnittenen Anfang unterscheiden.
+    """
+    decoder = json.JSONDecoder()
+    buf = f.read(_READ_CHUNK).lstrip()
+    if not buf:
+        return
+    if not buf.startswith("["):
+        # Kein Array (z.B. einzelnes Objekt): klassisch laden
+        data = json.loads(buf + f.read())
+        for number, item in enumerate(data if isinstance(data, list) else [data]):
+            yield _check_item(item, number)
+        return
+
+    pos = 1
+    chunk = _READ_CHUNK
+    number = 0
+    # Nach "[" und "," kommt ein Item, nach einem Item "," oder "]"
+    expect_item = True
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos < len(buf):
+            char = buf[pos]
+            if not expect_item or (char == "]" and number == 0):
+                if char == "]":
+                    if (buf[pos + 1:] + f.read()).strip():
+                        raise ValueError("Zusätzliche Daten nach dem JSON-Array")
+                    return
+                if char != ",":
+                    raise ValueError(f"Komma oder ] nach Item {number - 1} erwartet, gefunden: {char!r}")
+                pos += 1
+                expect_item = True
+                continue
+            if char == "]":
+                raise ValueError(f"Komma ohne folgendes Item nach Item {number - 1}")
+            if char != "{":
+                raise ValueError(f"Item {number} ist kein JSON-Objekt (beginnt mit {char!r})")
+            try:
+                item, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                pass
+            else:
+                yield item
+                number += 1
+                expect_item = False
+                continue
+        # Item reicht über das Pufferende hinaus: nachladen (bei sehr großen Items wachsend)
+        more = f.read(chunk)
+        if not more:
+            if pos < len(buf):
+                # Fehlerhaftes letztes Item: mit der Meldung des Parsers abbrechen
+                decoder.raw_decode(buf, pos)
+            raise ValueError("Unerwartetes Dateiende im JSON-Array")
+        buf = buf[pos:] + more
+        pos = 0
+        chunk = min(chunk * 2, 1 << 24)
+
+
+def iter_items(ds_name, dataset_dir=DATASET_DIR):
+    """Generator über die Items eines Datasets (.json-Array oder .jsonl, eine Zeile pro Item)."""
+    path = os.path.join(dataset_dir, ds_name)
+    if not os.path.exists(path):
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        if ds_name.endswith(".jsonl"):
+            number = 0
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield _check_item(json.loads(line), number)
+                    number += 1
+        else:
+            yield from _iter_json_array(f)
+
+
+def item_weight(item):
+    """Gewicht eines Items für gewichtete Scores; fehlend oder null heißt 1.0."""
+    value = item.get("weight")
+    if value is None:
+        return 1.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Item {item.get('id', '?')}: ungültiges Gewicht {value!r}") from None
+
+
+def _file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def build_manifest_entry(ds_name, dataset_dir=DATASET_DIR):
+    """Kennzahlen eines Datasets in einem Durchlauf über die Items."""
+    path = os.path.join(dataset_dir, ds_name)
+    stat = os.stat(path)
+    entry = {
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "count": 0,
+        "categories": {},
+        "preview": "",
+        "total_weight": 0.0,
+        "hash": _file_hash(path),
+        "error": None,
+    }
+    try:
+        for item in iter_items(ds_name, dataset_dir):
+            if entry["count"] == 0:
+                entry["preview"] = item.get("prompt", "")[:40]
+            entry["count"] += 1
+            category = item.get("category", "Unbekannt")
+            entry["categories"][category] = entry["categories"].get(category, 0) + 1
+            entry["total_weight"] += item_weight(item)
+    except (ValueError, AttributeError) as e:
+        entry["error"] = str(e)
+    entry["total_weight"] = round(entry["total_weight"], 3)
+    return entry
+
+
+def _load_manifest_file():
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest_file(manifest):
+    os.makedirs(os.path.dirname(MANIFEST_FILE) or ".", exist_ok=True)
+    tmp_path = MANIFEST_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+
+def load_manifests(dataset_dir=DATASET_DIR):
+    """
+    Manifest aller Datasets. Einträge werden nur neu berechnet, wenn sich
+    mtime oder Größe der Datei geändert haben; alles andere kommt aus dem Cache.
+    """
+    with _manifest_lock:
+        cached = _load_manifest_file()
+        manifest = {}
+        changed = False
+        for ds_name in list_datasets(dataset_dir):
+            stat = os.stat(os.path.join(dataset_dir, ds_name))
+            entry = cached.get(ds_name)
+            if not entry or entry.get("mtime") != stat.st_mtime or entry.get("size") != stat.st_size:
+                entry = build_manifest_entry(ds_name, dataset_dir)
+                changed = True
+            manifest[ds_name] = entry
+        if changed or set(cached) != set(manifest):
+            _save_manifest_file(manifest)
+        return manifest
@@ -0,0 +1,209 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from core.profiling import span
+from core.response_cache import BYPASS, get_cache
+from core.scoring import score_response
+from core.tokens import ESTIMATED, HEURISTIC, SERVER_REPORTED, estimate_tokens
+
+STREAM_METRICS = ("ttft", "itl_mean", "itl_p50", "itl_p95", "itl_max", "stop_reason")
+TIMING_METRICS = ("load_time", "prompt_tokens", "prompt_time", "gen_time", "server_time", "overhead")
+POOL_METRICS = ("host", "failed_hosts")
+
+
+def _transport_settings(settings, concurrency):
+    """
+    HTTP-Pool mindestens so groß wie die Parallelität: sonst warten Requests
+    blockierend auf eine freie Verbindung, und die Wartezeit zählt als Dauer.
+    """
+    from adapters.transport import DEFAULT_SETTINGS
+
+    if not concurrency:
+        return settings
+    pool_size = (settings or {}).get("pool_size", DEFAULT_SETTINGS["pool_size"])
+    if int(pool_size) >= concurrency:
+        return settings
+    return {**(settings or {}), "pool_size": int(concurrency)}
+
+
+def create_client(model, config=None, concurrency=None):
+    """
+    Roher Ollama-Client ohne Cache: ein Host oder, wenn providers.ollama.hosts
+    mehrere Server nennt, ein Pool über alle. `concurrency` (parallele
+    Requests des Runs) vergrößert bei Bedarf den HTTP-Pool.
+    """
+    from adapters.ollama import OllamaAdapter
+    from adapters.pool import OllamaPoolAdapter
+
+    if not config:
+        return OllamaAdapter(model, transport_settings=_transport_settings(None, concurrency))
+    ollama_config = config.get_ollama_config()
+    hosts = config.get_ollama_hosts(model)
+    transport = _transport_settings(ollama_config.get("transport"), concurrency)
+    if len(hosts) == 1:
+        return OllamaAdapter(model, host=hosts[0]["url"], transport_settings=transport)
+    return OllamaPoolAdapter(
+        model, hosts, transport_settings=transport,
+        max_failures=ollama_config.get("max_failures", 3),
+        health_interval=ollama_config.get("health_interval", 10),
+        outage_timeout=ollama_config.get("outage_timeout", 60)
+    )
+
+
+def create_adapter(model, config=None, cache_policy=None, concurrency=None):
+    """
+    Baut den Adapter für einen Run: Ollama (bzw. Host-Pool) mit geteiltem Transport,
+    davor der Antwort-Cache gemäß Policy (Default aus app.cache.policy).
+    """
+    from adapters.cached import CachedAdapter
+
+    cache_settings = (config.get_app_settings().get("cache") or {}) if config else {}
+    policy = cache_policy or cache_settings.get("policy", BYPASS)
+
+    adapter = create_client(model, config, concurrency)
+    if policy == BYPASS:
+        return adapter
+    return CachedAdapter(adapter, get_cache(cache_settings), policy)
+
+
+def evaluate_item(item, res, queue_time, request_time, token_counter=None):
+    """
+    Bewertet eine Adapter-Antwort und baut den Ergebnis-Eintrag für die Historie.
+    Fehlen Server-Zählungen (Antwort- oder Prompt-Tokens), zählt `token_counter`
+    erst dann lokal (ohne: Heuristik).
+    """
+    adapter_metrics = res.get("metrics", {})
+    duration = adapter_metrics.get("duration", request_time)
+    # Server-Zählung bevorzugen; sonst lokal zählen und als Schätzung kennzeichnen
+    tokenizer = None
+    if adapter_metrics.get("token_count"):
+        token_count = adapter_metrics["token_count"]
+        token_source = adapter_metrics.get("token_source", SERVER_REPORTED)
+    else:
+        response = res.get("response", "")
+        with span("tokens.count"):
+            token_count = token_counter.count(response) if token_counter else estimate_tokens(response)
+        token_source = ESTIMATED
+        tokenizer = token_counter.name if token_counter else HEURISTIC
+    tps = adapter_metrics.get("tps") or token_count / max(duration, 0.001)
+    response_length = len(res.get("response",""))
+
+    with span("score"):
+        eval_data = score_response(res.get("response",""), item.get("expected_keywords", []))
+
+    completeness = eval_data.get("completeness", True)
+    keywords_present = eval_data.get("keywords_present", 0)
+
+    metrics = {
+        "duration": duration,
+        "token_count": token_count,
+        "token_source": token_source,
+        "tps": tps,
+        "response_length": response_length,
+        "queue_time": round(queue_time, 3),
+        "request_time": round(request_time, 3),
+        "retries": adapter_metrics.get("retries", 0),
+        "connection_reused": adapter_metrics.get("connection_reused", False),
+        "cached": res.get("cached", False)
+    }
+    # Streaming- und Server-Metriken nur übernehmen, wenn der Adapter sie geliefert hat
+    for key in STREAM_METRICS + TIMING_METRICS + POOL_METRICS:
+        if key in adapter_metrics:
+            metrics[key] = adapter_metrics[key]
+    if "prompt_tokens" in metrics:
+        metrics["prompt_token_source"] = SERVER_REPORTED
+    else:
+        with span("tokens.prompt"):
+            prompt = item["prompt"]
+            metrics["prompt_tokens"] = token_counter.prompt_count(prompt) if token_counter else estimate_tokens(prompt)
+        metrics["prompt_token_source"] = ESTIMATED
+        tokenizer = token_counter.name if token_counter else HEURISTIC
+    if tokenizer:
+        # Lokal gezählt: womit ("heuristic" = grobe Schätzung ohne Tokenizer)
+        metrics["tokenizer"] = tokenizer
+
+    result = {
+        "id": item.get("id", "unknown"),
+        "prompt": item["prompt"],
+        "response": res.get("response", ""),
+        "score": eval_data.get("score", 0),
+        "status": "✅" if eval_data.get("score",0) >= 80 else "⚠️",
+        "metrics": metrics,
+        "business": {
+            "completeness": completeness,
+            "keywords_present": keywords_present
+        }
+    }
+    if res.get("error"):
+        result["error"] = res["error"]
+    return result
+
+
+class BenchmarkExecutor:
+    """
+    Schickt Dataset-Items über einen begrenzten Thread-Pool an einen Adapter.
+    Die Ergebnisse kommen unabhängig von der Fertigstellungsreihenfolge
+    immer in Dataset-Reihenfolge zurück.
+    """
+
+    def __init__(self, adapter, concurrency=1, token_counter=None):
+        self.adapter = adapter
+        self.concurrency = max(1, int(concurrency or 1))
+        self.token_counter = token_counter
+
+    def _item_options(self, item, options):
+        # Item-Felder überschreiben die Dataset-Optionen
+        item_options = {**options}
+        for key in ("max_tokens", "deadline"):
+            if key in item:
+                item_options[key] = item[key]
+        if item_options.pop("stop_on_keywords", False) and item.get("expected_keywords"):
+            item_options["stop_keywords"] = item["expected_keywords"]
+        return item_options
+
+    def _run_item(self, item, options, submitted_at, on_start=None):
+        if on_start:
+            on_start(item)
+        started_at = time.perf_counter()
+        try:
+            with span("adapter.send"):
+                res = self.adapter.send(item["prompt"], self._item_options(item, options))
+        except Exception as e:
+            res = {"error": str(e)}
+        finished_at = time.perf_counter()
+        with span("evaluate"):
+            return evaluate_item(item, res, started_at - submitted_at, finished_at - started_at, self.token_counter)
+
+    def iter_results(self, items, options=None, cancel=None, on_start=None, options_for=None):
+        """
+        Generator über die Ergebnisse in Dataset-Reihenfolge. `items` darf ein
+        Generator sein: es werden nur so viele Items gelesen, wie gerade in
+        Arbeit sind, der Rest des Datasets bleibt auf der Platte.
+        Ist das Event `cancel` gesetzt, werden keine neuen Items mehr gestartet;
+        laufende Requests werden noch fertig geliefert, wartende verworfen.
+        Kommen Items aus mehreren Datasets gemischt, liefert `options_for(item)`
+        die Optionen pro Item statt `options`.
+        """
+        options = options or {}
+        max_in_flight = self.concurrency * 2
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            pending = deque()
+            for item in items:
+                if cancel is not None and cancel.is_set():
+                    break
+                item_options = options_for(item) if options_for else options
+                pending.append(pool.submit(self._run_item, item, item_options, time.perf_counter(), on_start))
+                if len(pending) >= max_in_flight:
+                    yield pending.popleft().result()
+            while pending:
+                future = pending.popleft()
+                # Der Pool arbeitet FIFO: nach dem ersten verworfenen Future sind auch alle
+                # folgenden noch nicht gestartet, die Reihenfolge der Ergebnisse bleibt also erhalten
+                if cancel is not None and cancel.is_set() and future.cancel():
+                    continue
+                yield future.result()
+
+    def run(self, items, options=None) -> list:
+        return list(self.iter_results(items, options))
+
@@ -0,0 +1,199 @@
+"""
+Export von Item-Ergebnissen aus dem Run-Store nach CSV, NDJSON oder Parquet.
+
+Exportiert wird ein Datensatz pro Item (mit Run-ID, Modell und Zeitpunkt
+seines Runs). Die Items werden über einen Cursor gelesen und sofort
+geschrieben, der Speicherbedarf hängt also nicht von der Größe der Historie
+ab; Parquet puffert höchstens eine Row Group. Filter (Runs, Modell, Dataset,
+Zeitraum) wirken schon beim Lesen in der Datenbank, nicht gewählte Spalten
+werden gar nicht erst aufbereitet, Texte nur geladen, wenn sie gefragt sind.
+
+Parquet braucht pyarrow (optional); ohne pyarrow gibt es CSV und NDJSON.
+"""
+import csv
+import json
+import os
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional: ohne pyarrow kein Parquet
+    pyarrow = None
+
+from core.history_manager import TEXT_FIELDS, count_items, scan_items
+from core.progress import RunCancelled
+
+FORMATS = ("csv", "ndjson", "parquet")
+EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet"}
+ROW_GROUP_SIZE = 10000
+# Fortschritt alle so viele Datensätze melden
+PROGRESS_EVERY = 500
+
+# Spalte -> (Quelle, Schlüssel, Parquet-Typ); Quelle "item" = Feld des Items, sonst Unterobjekt
+COLUMNS = {
+    "run_id": ("item", "run_id", "string"),
+    "created_at": ("item", "created_at", "string"),
+    "model": ("item", "model", "string"),
+    "dataset": ("item", "dataset", "string"),
+    "item_id": ("item", "id", "string"),
+    "seq": ("item", "seq", "int64"),
+    "score": ("item", "score", "float64"),
+    "status": ("item", "status", "string"),
+    "error": ("item", "error", "string"),
+    "duration": ("metrics", "duration", "float64"),
+    "ttft": ("metrics", "ttft", "float64"),
+    "load_time": ("metrics", "load_time", "float64"),
+    "prompt_time": ("metrics", "prompt_time", "float64"),
+    "gen_time": ("metrics", "gen_time", "float64"),
+    "overhead": ("metrics", "overhead", "float64"),
+    "queue_time": ("metrics", "queue_time", "float64"),
+    "token_count": ("metrics", "token_count", "int64"),
+    "token_source": ("metrics", "token_source", "string"),
+    "tokenizer": ("metrics", "tokenizer", "string"),
+    "prompt_tokens": ("metrics", "prompt_tokens", "int64"),
+    "tps": ("metrics", "tps", "float64"),
+    "response_length": ("metrics", "response_length", "int64"),
+    "retries": ("metrics", "retries", "int64"),
+    "cached": ("metrics", "cached", "bool"),
+    "host": ("metrics", "host", "string"),
+    "completeness": ("business", "completeness", "bool"),
+    "keywords_present": ("business", "keywords_present", "int64"),
+    "prompt": ("item", "prompt", "string"),
+    "response": ("item", "response", "string"),
+}
+# Texte nur auf Wunsch: sie machen den Großteil der Datenmenge aus
+DEFAULT_COLUMNS = [c for c in COLUMNS if c not in TEXT_FIELDS]
+
+
+class ExportError(ValueError):
+    """Ungültige Export-Anfrage (Format, Spalten) oder fehlende optionale Abhängigkeit."""
+
+
+def format_for(path, fmt=None):
+    """Explizites Format oder aus der Dateiendung; sonst ExportError."""
+    fmt = fmt or EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt not in FORMATS:
+        raise ExportError(f"Unbekanntes Export-Format für {path} (möglich: {', '.join(FORMATS)})")
+    if fmt == "parquet" and pyarrow is None:
+        raise ExportError("Parquet-Export braucht pyarrow (pip install pyarrow)")
+    return fmt
+
+
+def parse_columns(columns):
+    """Spaltenliste (Liste oder kommagetrennter Text, leer = Standard) prüfen."""
+    if isinstance(columns, str):
+        columns = [c.strip() for c in columns.split(",") if c.strip()]
+    if not columns:
+        return list(DEFAULT_COLUMNS)
+    unknown = [c for c in columns if c not in COLUMNS]
+    if unknown:
+        raise ExportError(f"Unbekannte Spalten: {', '.join(unknown)} (möglich: {', '.join(COLUMNS)})")
+    return list(columns)
+
+
+def _record(item, columns):
+    record = {}
+    for column in columns:
+        source, key, _ = COLUMNS[column]
+        container = item if source == "item" else item.get(source) or {}
+        record[column] = container.get(key)
+    if "model" in record and record["model"] is None:
+        # Einzel-Runs speichern das Modell nur am Run
+        record["model"] = item.get("run_model")
+    return record
+
+
+class _CsvWriter:
+    def __init__(self, f, columns):
+        self._writer = csv.DictWriter(f, fieldnames=columns)
+        self._writer.writeheader()
+
+    def write(self, record):
+        self._writer.writerow(record)
+
+    def close(self):
+        pass
+
+
+class _NdjsonWriter:
+    def __init__(self, f, columns):
+        self._f = f
+
+    def write(self, record):
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        pass
+
+
+class _ParquetWriter:
+    """Sammelt bis zu ROW_GROUP_SIZE Datensätze spaltenweise und schreibt sie als Row Group."""
+
+    def __init__(self, path, columns):
+        self._schema = pyarrow.schema([(c, getattr(pyarrow, COLUMNS[c][2])()) for c in columns])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+        self._batch = {c: [] for c in columns}
+        self._size = 0
+
+    def write(self, record):
+        for column, values in self._batch.items():
+            values.append(record[column])
+        self._size += 1
+        if self._size >= ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._size:
+            self._writer.write_table(pyarrow.Table.from_pydict(self._batch, schema=self._schema))
+            for values in self._batch.values():
+                values.clear()
+            self._size = 0
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def export_items(path, fmt=None, columns=None, run_ids=None, on_progress=None, cancel=None, **filters):
+    """
+    Schreibt die Items der gewählten Runs (`run_ids`, sonst alle zu `filters`
+    passenden: model, dataset, since, until) nach `path` und gibt die Anzahl
+    Datensätze zurück. Geschrieben wird in eine temporäre Datei, die erst am
+    Ende umbenannt wird; bei Abbruch über `cancel` (RunCancelled) oder Fehler
+    bleibt keine halbe Datei liegen. `on_progress(done, total)` kommt
+    alle PROGRESS_EVERY Datensätze und am Ende.
+    """
+    fmt = format_for(path, fmt)
+    columns = parse_columns(columns)
+    total = count_items(run_ids, **filters)
+    with_text = any(c in TEXT_FIELDS for c in columns)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    done = 0
+    try:
+        if fmt == "parquet":
+            writer, f = _ParquetWriter(tmp_path, columns), None
+        else:
+            f = open(tmp_path, "w", encoding="utf-8", newline="")
+            writer = (_CsvWriter if fmt == "csv" else _NdjsonWriter)(f, columns)
+        try:
+            for item in scan_items(run_ids, with_text=with_text, **filters):
+                if cancel is not None and cancel.is_set():
+                    raise RunCancelled()
+                writer.write(_record(item, columns))
+                done += 1
+                if on_progress and done % PROGRESS_EVERY == 0:
+                    on_progress(done, total)
+            writer.close()
+        finally:
+            if f is not None:
+                f.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if on_progress:
+        on_progress(done, total)
+    return done
@@ -1,21 +1,613 @@
+import hashlib
 import json
 import os
+import socket
+import sqlite3
+import threading
+import zlib
 from datetime import datetime
 
-HISTORY_FILE = "config/history.json"
+from core.metrics import percentile
+from core.profiling import span
+from core.tokens import ESTIMATED
+
+HISTORY_DB = "config/history.db"
+LEGACY_HISTORY_FILE = "config/history.json"
+
+# Erlaubte Sortierungen (UI-Schlüssel -> Spalte), nie direkt aus Benutzereingaben
+RUN_SORT_COLUMNS = {
+    "date": "created_at",
+    "model": "model",
+    "score": "avg_score",
+    "duration": "avg_duration",
+    "tps": "avg_tps",
+    "items": "item_count",
+}
+ITEM_SORT_COLUMNS = {"seq": "seq", "id": "item_id", "score": "score"}
+
+# Lebenszyklus eines Runs (ältere Runs ohne Status gelten als abgeschlossen)
+STATUS_RUNNING = "running"
+STATUS_PARTIAL = "partial"
+STATUS_COMPLETE = "complete"
+
+_init_lock = threading.Lock()
+_initialized = set()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    model TEXT NOT NULL,
+    datasets TEXT NOT NULL,
+    avg_score REAL,
+    avg_duration REAL,
+    avg_tps REAL,
+    item_count INTEGER,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_model ON runs(model, created_at);
+CREATE TABLE IF NOT EXISTS run_items (
+    run_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    item_id TEXT,
+    score REAL,
+    data TEXT NOT NULL,
+    prompt_hash TEXT,
+    response_hash TEXT,
+    PRIMARY KEY (run_id, seq)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS item_series (
+    run_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    score REAL,
+    duration REAL,
+    ttft REAL,
+    token_count INTEGER,
+    tps REAL,
+    PRIMARY KEY (run_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_series_item ON item_series(model, item_id, dataset, created_at);
+"""
+
+# PRAGMA user_version: ab 1 ist item_series für alle vorhandenen Runs befüllt,
+# ab 2 liegen Prompt- und Antworttexte aller Items im Blob-Store
+INDEX_VERSION = 1
+BLOB_VERSION = 2
+
+# Item-Felder, die als komprimierte, deduplizierte Blobs gespeichert werden
+TEXT_FIELDS = ("prompt", "response")
+
+
+def _connect(check_same_thread=True):
+    """
+    Öffnet die Run-Datenbank. Schema, einmalige Migration aus der alten
+    history.json und das Aufräumen abgebrochener Runs laufen beim ersten
+    Zugriff pro Datei.
+    """
+    os.makedirs(os.path.dirname(HISTORY_DB) or ".", exist_ok=True)
+    conn = sqlite3.connect(HISTORY_DB, timeout=30, check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    # Absoluter Pfad als Schlüssel: nach einem chdir ist es eine andere Datei
+    db_key = os.path.abspath(HISTORY_DB)
+    if db_key not in _initialized:
+        with _init_lock:
+            if db_key not in _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+                _ensure_blob_columns(conn)
+                _migrate_legacy_json(conn)
+                _build_item_index(conn)
+                _externalize_texts(conn)
+                _recover_interrupted(conn)
+                _initialized.add(db_key)
+    return conn
+
+
+def _created_at(run_id):
+    try:
+        return datetime.strptime(run_id[:15], "%Y%m%d_%H%M%S").isoformat()
+    except (TypeError, ValueError):
+        return datetime.now().isoformat()
+
+
+def _insert_run(conn, run, details, ignore_existing=False):
+    summary = {k: v for k, v in run.items() if k != "details"}
+    summary.setdefault("created_at", _created_at(run["id"]))
+    verb = "INSERT OR IGNORE" if ignore_existing else "INSERT"
+    cur = conn.execute(
+        f"{verb} INTO runs (id, created_at, model, datasets, avg_score, avg_duration, avg_tps, item_count, summary) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            run["id"], summary["created_at"], run["model"],
+            json.dumps(run["datasets"]), run.get("avg_score", 0), run.get("avg_duration", 0),
+            run.get("avg_tps", 0), len(details), json.dumps(summary, ensure_ascii=False)
+        )
+    )
+    if cur.rowcount == 0:
+        return False
+    _store_items(conn, run["id"], enumerate(details))
+    _index_items(conn, summary, enumerate(details))
+    return True
+
+
+# --- Blob-Store: Prompt- und Antworttexte, komprimiert und nach Inhalt adressiert ---
+
+def _text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _put_blobs(conn, texts):
+    """Speichert {hash: text}; schon vorhandene Inhalte werden weder komprimiert noch geschrieben."""
+    hashes = list(texts)
+    known = set()
+    for start in range(0, len(hashes), 500):
+        chunk = hashes[start:start + 500]
+        known.update(row[0] for row in conn.execute(
+            f"SELECT hash FROM blobs WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+        ))
+    conn.executemany(
+        "INSERT OR IGNORE INTO blobs (hash, data, size) VALUES (?, ?, ?)",
+        (
+            (h, zlib.compress(raw), len(raw))
+            for h, raw in ((h, texts[h].encode("utf-8")) for h in hashes if h not in known)
+        )
+    )
+
+
+def _get_blobs(conn, hashes):
+    """{hash: text} für die angefragten Hashes (unbekannte fehlen im Ergebnis)."""
+    hashes = list({h for h in hashes if h})
+    texts = {}
+    for start in range(0, len(hashes), 500):
+        chunk = hashes[start:start + 500]
+        for h, data in conn.execute(f"SELECT hash, data FROM blobs WHERE hash IN ({','.join('?' * len(chunk))})", chunk):
+            texts[h] = zlib.decompress(data).decode("utf-8")
+    return texts
+
+
+def _split_texts(result, texts):
+    """Item ohne Texte plus (prompt_hash, response_hash); die Texte landen in `texts`."""
+    data = dict(result)
+    refs = []
+    for field in TEXT_FIELDS:
+        text = data.pop(field, None)
+        if text is None:
+            refs.append(None)
+            continue
+        h = _text_hash(text)
+        texts[h] = text
+        refs.append(h)
+    return data, refs
+
+
+def _store_items(conn, run_id, numbered_results):
+    texts = {}
+    rows = []
+    for seq, result in numbered_results:
+        data, (prompt_hash, response_hash) = _split_texts(result, texts)
+        rows.append((run_id, seq, result.get("id"), result.get("score", 0),
+                     json.dumps(data, ensure_ascii=False), prompt_hash, response_hash))
+    _put_blobs(conn, texts)
+    conn.executemany(
+        "INSERT INTO run_items (run_id, seq, item_id, score, data, prompt_hash, response_hash) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+    )
+
+
+def _ensure_blob_columns(conn):
+    """Ältere Datenbanken kennen die Hash-Spalten noch nicht."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(run_items)")}
+    for column in ("prompt_hash", "response_hash"):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE run_items ADD COLUMN {column} TEXT")
+    # Für die Garbage Collection: wird ein Blob noch referenziert?
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_items_prompt_hash ON run_items(prompt_hash)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_items_response_hash ON run_items(response_hash)")
+    conn.commit()
+
+
+def _externalize_texts(conn, batch_size=1000):
+    """Verschiebt eingebettete Texte älterer Items einmalig in den Blob-Store und verkleinert die Datei."""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= BLOB_VERSION:
+        return
+    moved = 0
+    last_rowid = 0
+    with conn:
+        while True:
+            rows = conn.execute(
+                "SELECT rowid, data FROM run_items WHERE rowid > ? ORDER BY rowid LIMIT ?", (last_rowid, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1][0]
+            texts = {}
+            updates = []
+            for rowid, raw in rows:
+                result = json.loads(raw)
+                if not any(field in result for field in TEXT_FIELDS):
+                    continue
+                data, (prompt_hash, response_hash) = _split_texts(result, texts)
+                updates.append((json.dumps(data, ensure_ascii=False), prompt_hash, response_hash, rowid))
+            _put_blobs(conn, texts)
+            conn.executemany(
+                "UPDATE run_items SET data = ?, prompt_hash = ?, response_hash = ? WHERE rowid = ?", updates
+            )
+            moved += len(updates)
+        conn.execute(f"PRAGMA user_version = {BLOB_VERSION}")
+    if moved:
+        # Freigewordene Seiten an das Dateisystem zurückgeben
+        conn.execute("VACUUM")
+
+
+def _collect_blobs(conn, candidates=None):
+    """Löscht Blobs, auf die kein Item mehr verweist (nur `candidates` prüfen, sonst alle)."""
+    unreferenced = (
+        "NOT EXISTS (SELECT 1 FROM run_items WHERE prompt_hash = blobs.hash) "
+        "AND NOT EXISTS (SELECT 1 FROM run_items WHERE response_hash = blobs.hash)"
+    )
+    if candidates is None:
+        return conn.execute(f"DELETE FROM blobs WHERE {unreferenced}").rowcount
+    removed = 0
+    candidates = list(candidates)
+    for start in range(0, len(candidates), 500):
+        chunk = candidates[start:start + 500]
+        removed += conn.execute(
+            f"DELETE FROM blobs WHERE hash IN ({','.join('?' * len(chunk))}) AND {unreferenced}", chunk
+        ).rowcount
+    return removed
+
+
+def _series_row(run, seq, result):
+    """Zeile für den Regressions-Index: (Modell, Dataset, Item-ID) -> Score/Latenz/Tokens."""
+    metrics = result.get("metrics", {})
+    datasets = run.get("datasets") or []
+    # Ältere Ergebnisse kennen ihr Dataset nicht; bei genau einem Dataset ist es eindeutig
+    dataset = result.get("dataset") or (datasets[0] if len(datasets) == 1 else "")
+    return (
+        run["id"], seq, result.get("model") or run["model"], dataset, str(result.get("id", "unknown")),
+        run["created_at"], result.get("score", 0), metrics.get("duration"), metrics.get("ttft"),
+        metrics.get("token_count"), metrics.get("tps")
+    )
+
+
+def _index_items(conn, run, numbered_results):
+    # Kapazitätsmessungen laufen absichtlich unter Last: ihre Latenzen gehören nicht in Item-Verläufe
+    if run.get("run_type") == "probe":
+        return
+    conn.executemany(
+        "INSERT OR IGNORE INTO item_series VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (_series_row(run, seq, result) for seq, result in numbered_results)
+    )
+
+
+def _build_item_index(conn):
+    """Befüllt den Regressions-Index einmalig für Runs, die vor ihm gespeichert wurden."""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= INDEX_VERSION:
+        return
+    with conn:
+        conn.execute("""
+            INSERT OR IGNORE INTO item_series
+            SELECT i.run_id, i.seq,
+                   COALESCE(json_extract(i.data, '$.model'), r.model),
+                   COALESCE(json_extract(i.data, '$.dataset'),
+                            CASE WHEN json_array_length(r.datasets) = 1 THEN json_extract(r.datasets, '$[0]') ELSE '' END),
+                   COALESCE(i.item_id, 'unknown'), r.created_at, i.score,
+                   json_extract(i.data, '$.metrics.duration'), json_extract(i.data, '$.metrics.ttft'),
+                   json_extract(i.data, '$.metrics.token_count'), json_extract(i.data, '$.metrics.tps')
+            FROM run_items i JOIN runs r ON r.id = i.run_id
+        """)
+        conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+
+
+def _legacy_fields(summary):
+    return {k: v for k, v in summary.items() if k not in ("id", "created_at", "details", "legacy_id")}
+
+
+def _migrate_legacy_run(conn, run):
+    """
+    Übernimmt einen Run aus der history.json. Runs derselben Sekunde hatten
+    dort dieselbe ID: sie bekommen einen Zähler-Suffix (die alte ID bleibt als
+    legacy_id erhalten). Ist der Run schon übernommen (Abbruch nach dem Commit,
+    vor dem Umbenennen der Datei), wird er nicht doppelt angelegt.
+    """
+    details = run.get("details", [])
+    base_id = run["id"]
+    suffix = 1
+    while not _insert_run(conn, run, details, ignore_existing=True):
+        row = conn.execute("SELECT summary FROM runs WHERE id = ?", (run["id"],)).fetchone()
+        if _legacy_fields(json.loads(row["summary"])) == _legacy_fields(run):
+            return
+        suffix += 1
+        run = {**run, "id": f"{base_id}_{suffix}", "legacy_id": base_id}
+
+
+def _migrate_legacy_json(conn):
+    """Übernimmt eine vorhandene history.json einmalig in die Datenbank."""
+    if not os.path.exists(LEGACY_HISTORY_FILE):
+        return
+    try:
+        with open(LEGACY_HISTORY_FILE, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+    except (OSError, ValueError):
+        return
+
+    with conn:
+        for run in legacy:
+            _migrate_legacy_run(conn, run)
+    # Erst nach erfolgreichem Commit umbenennen; ein Abbruch davor wird beim nächsten Start wiederholt
+    os.replace(LEGACY_HISTORY_FILE, LEGACY_HISTORY_FILE + ".migrated")
+
 
 def load_all_runs():
-    if not os.path.exists(HISTORY_FILE):
-        return []
+    """Run-Zusammenfassungen (ohne Item-Details), neueste zuerst."""
+    conn = _connect()
     try:
-        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return []
+        rows = conn.execute("SELECT summary FROM runs ORDER BY created_at DESC, id DESC").fetchall()
+    finally:
+        conn.close()
+    return [json.loads(row["summary"]) for row in rows]
+
+
+def _run_filters(model=None, dataset=None, since=None, until=None):
+    clauses, params = [], []
+    if model:
+        clauses.append("model LIKE ?")
+        params.append(f"%{model}%")
+    if dataset:
+        clauses.append("datasets LIKE ?")
+        params.append(f"%{dataset}%")
+    if since:
+        clauses.append("created_at >= ?")
+        params.append(since)
+    if until:
+        # Datum ohne Uhrzeit: der ganze Tag zählt noch dazu
+        clauses.append("created_at < ?")
+        params.append(until if "T" in until else f"{until}T99")
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+def query_runs(offset=0, limit=100, sort="date", descending=True, **filters):
+    """
+    Eine Seite Run-Zusammenfassungen, sortiert und gefiltert in der Datenbank.
+    Filter: model, dataset (Teilstring), since/until (ISO-Datum).
+    """
+    column = RUN_SORT_COLUMNS.get(sort, "created_at")
+    direction = "DESC" if descending else "ASC"
+    where, params = _run_filters(**filters)
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            f"SELECT summary FROM runs {where} ORDER BY {column} {direction}, id {direction} LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [json.loads(row["summary"]) for row in rows]
+
+
+def count_runs(**filters):
+    where, params = _run_filters(**filters)
+    conn = _connect()
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM runs {where}", params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def run_matches(run, model=None, dataset=None, since=None, until=None):
+    """Prüft eine Zusammenfassung gegen dieselben Filter wie query_runs (ohne DB-Zugriff)."""
+    created_at = run.get("created_at") or _created_at(run["id"])
+    if model and model.lower() not in run["model"].lower():
+        return False
+    if dataset and not any(dataset.lower() in d.lower() for d in run["datasets"]):
+        return False
+    if since and created_at < since:
+        return False
+    if until and created_at >= (until if "T" in until else f"{until}T99"):
+        return False
+    return True
+
+
+def load_run(run_id):
+    """Summary eines einzelnen Runs oder None."""
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT summary FROM runs WHERE id = ?", (run_id,)).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row["summary"]) if row else None
+
+
+def load_run_details(run_id, offset=0, limit=None, sort="seq", descending=False, with_text=True):
+    """
+    Item-Ergebnisse eines Runs, standardmäßig komplett in Dataset-Reihenfolge.
+    Jedes Item trägt `prompt_hash`/`response_hash`; die Texte selbst nur mit
+    `with_text` (sonst bei Bedarf über load_texts nachladen).
+    """
+    column = ITEM_SORT_COLUMNS.get(sort, "seq")
+    direction = "DESC" if descending else "ASC"
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            f"SELECT data, prompt_hash, response_hash FROM run_items WHERE run_id = ? "
+            f"ORDER BY {column} {direction}, seq LIMIT ? OFFSET ?",
+            (run_id, -1 if limit is None else limit, offset)
+        ).fetchall()
+        texts = _get_blobs(conn, [h for row in rows for h in (row["prompt_hash"], row["response_hash"])]) if with_text else {}
+    finally:
+        conn.close()
+
+    details = []
+    for row in rows:
+        item = json.loads(row["data"])
+        item["prompt_hash"] = row["prompt_hash"]
+        item["response_hash"] = row["response_hash"]
+        if with_text:
+            for field, h in zip(TEXT_FIELDS, (row["prompt_hash"], row["response_hash"])):
+                if h is not None:
+                    item[field] = texts.get(h, "")
+        details.append(item)
+    return details
+
+
+def _item_filters(run_ids=None, model=None, dataset=None, since=None, until=None):
+    """Run-Filter wie query_runs, dazu eine Run-Auswahl und der Dataset-Filter pro Item."""
+    where, params = _run_filters(model=model, dataset=dataset, since=since, until=until)
+    clauses = [where[len("WHERE "):]] if where else []
+    if run_ids:
+        clauses.append(f"r.id IN ({','.join('?' * len(run_ids))})")
+        params.extend(run_ids)
+    if dataset:
+        # In Multi-Dataset-Runs nur die Items des gesuchten Datasets
+        clauses.append("(json_extract(i.data, '$.dataset') IS NULL OR json_extract(i.data, '$.dataset') LIKE ?)")
+        params.append(f"%{dataset}%")
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
 
-def save_run(model, datasets, results_data):
-    history = load_all_runs()
-    
+def count_items(run_ids=None, **filters):
+    where, params = _item_filters(run_ids, **filters)
+    conn = _connect()
+    try:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM run_items i JOIN runs r ON r.id = i.run_id {where}", params
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def scan_items(run_ids=None, with_text=False, batch_size=500, **filters):
+    """
+    Alle Items der passenden Runs (älteste zuerst), eins nach dem anderen.
+    Gelesen wird batchweise über einen Cursor, es liegt also nie mehr als
+    `batch_size` Items im Speicher. Jedes Item trägt `run_id`, `run_model`
+    und `created_at` seines Runs; Texte nur mit `with_text`.
+    """
+    where, params = _item_filters(run_ids, **filters)
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            f"SELECT i.run_id, r.model AS run_model, r.created_at, i.seq, i.data, i.prompt_hash, i.response_hash "
+            f"FROM run_items i JOIN runs r ON r.id = i.run_id {where} ORDER BY r.created_at, r.id, i.seq",
+            params
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            texts = _get_blobs(conn, [h for row in rows for h in (row["prompt_hash"], row["response_hash"])]) if with_text else {}
+            for row in rows:
+                item = json.loads(row["data"])
+                item.update(run_id=row["run_id"], run_model=row["run_model"], created_at=row["created_at"], seq=row["seq"])
+                if with_text:
+                    for field, h in zip(TEXT_FIELDS, (row["prompt_hash"], row["response_hash"])):
+                        if h is not None:
+                            item[field] = texts.get(h, "")
+                yield item
+    finally:
+        conn.close()
+
+
+def load_texts(hashes):
+    """Prompt-/Antworttexte zu Blob-Hashes: {hash: text}."""
+    conn = _connect()
+    try:
+        return _get_blobs(conn, hashes)
+    finally:
+        conn.close()
+
+
+def delete_run(run_id):
+    """
+    Löscht einen Run samt Items und Index-Einträgen. Texte, die kein anderer
+    Run mehr verwendet, werden gleich mit entfernt. Gibt die Zahl gelöschter Blobs zurück.
+    """
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT summary FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(run_id)
+        if json.loads(row["summary"]).get("status") == STATUS_RUNNING:
+            raise ValueError(f"Run {run_id} läuft noch")
+        with conn:
+            candidates = {
+                h for pair in conn.execute(
+                    "SELECT prompt_hash, response_hash FROM run_items WHERE run_id = ?", (run_id,)
+                ) for h in pair if h
+            }
+            conn.execute("DELETE FROM run_items WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM item_series WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+            return _collect_blobs(conn, candidates)
+    finally:
+        conn.close()
+
+
+def _latency_stats(values, prefix):
+    """p50/p90/p99 einer Messreihe als Summary-Felder."""
+    if not values:
+        return {}
+    return {
+        f"{prefix}_p50": round(percentile(values, 50), 3),
+        f"{prefix}_p90": round(percentile(values, 90), 3),
+        f"{prefix}_p99": round(percentile(values, 99), 3),
+    }
+
+
+def _timing_breakdown(results_data):
+    """Mittlere Zeitanteile pro Item: Modell laden, Prompt, Generierung, Netzwerk/Harness."""
+    breakdown = {}
+    for key in ("load_time", "prompt_time", "gen_time", "overhead"):
+        values = [r['metrics'][key] for r in results_data if key in r.get('metrics', {})]
+        if values:
+            breakdown[f"avg_{key}"] = round(sum(values) / len(values), 4)
+    return breakdown
+
+
+def _host_breakdown(results_data, wall_time=None):
+    """Items, Fehler, Tokens und Durchsatz pro Ollama-Host (nur bei Runs über einen Host-Pool)."""
+    hosts = {}
+
+    def entry_for(host):
+        return hosts.setdefault(host, {"items": 0, "errors": 0, "tokens": 0, "durations": []})
+
+    for r in results_data:
+        # Fehlversuche vor einem Wechsel auf einen anderen Host
+        for failed in r.get('metrics', {}).get('failed_hosts', []):
+            entry_for(failed)["errors"] += 1
+        host = r.get('metrics', {}).get('host')
+        if host is None:
+            continue
+        entry = entry_for(host)
+        entry["items"] += 1
+        entry["errors"] += 1 if r.get('error') else 0
+        entry["tokens"] += r['metrics'].get('token_count', 0)
+        if 'duration' in r['metrics']:
+            entry["durations"].append(r['metrics']['duration'])
+    for entry in hosts.values():
+        durations = entry.pop("durations")
+        entry["avg_duration"] = round(sum(durations) / len(durations), 2) if durations else 0
+        if wall_time:
+            entry["items_per_s"] = round(entry["items"] / wall_time, 3)
+            entry["tokens_per_s"] = round(entry["tokens"] / wall_time, 1)
+    return hosts
+
+
+def summarize_results(results_data, wall_time=None):
+    """
+    Kennzahlen über eine Liste von Item-Ergebnissen (für Runs und Modell-Gruppen).
+    Mit `wall_time` (Sekunden) kommt der Durchsatz des ganzen Runs dazu.
+    """
     scores = [r['score'] for r in results_data]
     avg_score = round(sum(scores) / len(scores), 1) if scores else 0
 
@@ -28,20 +620,237 @@ def save_run(model, datasets, results_data):
     resp_len = [r['metrics']['response_length'] for r in results_data if 'metrics' in r]
     avg_resp_len = round(sum(resp_len) / len(resp_len), 1) if resp_len else 0
 
-    new_run = {
-        "id": datetime.now().strftime("%Y%m%d_%H%M%S"),
-        "timestamp": datetime.now().strftime("%H:%M - %d.%m.%y"),
-        "model": model,
-        "datasets": datasets,
+    retries = sum(r['metrics'].get('retries', 0) for r in results_data if 'metrics' in r)
+    reused = [r['metrics'].get('connection_reused', False) for r in results_data if 'metrics' in r]
+    reuse_rate = round(100 * sum(reused) / len(reused), 1) if reused else 0
+
+    cache_hits = sum(1 for r in results_data if r.get('metrics', {}).get('cached'))
+    estimated_tokens = sum(1 for r in results_data if r.get('metrics', {}).get('token_source') == ESTIMATED)
+
+    summary = {
         "avg_score": avg_score,
         "avg_duration": avg_duration,
         "avg_tps": avg_tps,
         "avg_response_length": avg_resp_len,
+        "total_retries": retries,
+        "connection_reuse_rate": reuse_rate,
+        "cache_hits": cache_hits,
+        "estimated_token_items": estimated_tokens,
+        "item_count": len(results_data),
+    }
+    summary.update(_latency_stats(durations, "duration"))
+    ttfts = [r['metrics']['ttft'] for r in results_data if r.get('metrics', {}).get('ttft') is not None]
+    summary.update(_latency_stats(ttfts, "ttft"))
+    summary.update(_timing_breakdown(results_data))
+
+    if wall_time:
+        tokens = sum(r['metrics'].get('token_count', 0) for r in results_data if 'metrics' in r)
+        summary["wall_time"] = round(wall_time, 2)
+        summary["throughput_items_per_s"] = round(len(results_data) / wall_time, 3)
+        summary["throughput_tokens_per_s"] = round(tokens / wall_time, 1)
+    hosts = _host_breakdown(results_data, wall_time)
+    if hosts:
+        summary["hosts"] = hosts
+    return summary
+
+
+def _new_run(model, datasets, run_type, extra):
+    now = datetime.now()
+    return {
+        "id": now.strftime("%Y%m%d_%H%M%S"),
+        "created_at": now.isoformat(),
+        "timestamp": now.strftime("%H:%M - %d.%m.%y"),
+        "model": model,
+        "datasets": datasets,
+        "run_type": run_type,
+        **(extra or {}),
+    }
+
+
+def _insert_unique(conn, run, details):
+    """Legt den Run an; bei gleicher Sekunde bekommt die ID einen Zähler-Suffix."""
+    base_id = run["id"]
+    suffix = 1
+    while True:
+        try:
+            # Eine Transaktion pro Run: Summary und Items landen ganz oder gar nicht
+            with conn:
+                _insert_run(conn, run, details)
+            return
+        except sqlite3.IntegrityError:
+            suffix += 1
+            run["id"] = f"{base_id}_{suffix}"
+
+
+def save_run(model, datasets, results_data, run_type="single", extra=None, wall_time=None):
+    """
+    Speichert einen Run. `run_type` unterscheidet normale Runs von
+    Sonderformen (z.B. "matrix"); `extra` landet zusätzlich in der Summary.
+    """
+    new_run = {
+        **_new_run(model, datasets, run_type, extra),
+        **summarize_results(results_data, wall_time),
+        "status": STATUS_COMPLETE,
         "details": results_data
     }
-    
-    history.insert(0, new_run)
-    os.makedirs("config", exist_ok=True)
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, indent=4)
-    return new_run
\ No newline at end of file
+
+    conn = _connect()
+    try:
+        _insert_unique(conn, new_run, results_data)
+    finally:
+        conn.close()
+    return new_run
+
+
+def _stored_results(conn, run_id, model=None):
+    """Score, Metriken und Fehler der gespeicherten Items, ohne Prompt- und Antworttext zu laden."""
+    sql = "SELECT score, json_extract(data, '$.metrics'), json_extract(data, '$.error') FROM run_items WHERE run_id = ?"
+    params = [run_id]
+    if model is not None:
+        sql += " AND json_extract(data, '$.model') = ?"
+        params.append(model)
+    return [
+        {"score": score, "metrics": json.loads(metrics or "{}"), "error": error}
+        for score, metrics, error in conn.execute(sql, params)
+    ]
+
+
+def _summarize_stored(conn, run, status, wall_time=None, model_wall_times=None):
+    """
+    Berechnet die Summary eines checkpointeten Runs aus seinen Items neu.
+    Wanduhr-Zeiten addieren sich über Fortsetzungen hinweg.
+    """
+    summary = {k: v for k, v in run.items() if k not in ("pid", "host")}
+    total_wall = (run.get("wall_time") or 0) + (wall_time or 0)
+    summary.update(summarize_results(_stored_results(conn, run["id"]), total_wall or None))
+    summary["status"] = status
+
+    if run.get("run_type") == "matrix":
+        previous = run.get("model_summaries", {})
+        model_summaries = {}
+        for model in run.get("models", []):
+            model_wall = (previous.get(model, {}).get("wall_time") or 0) + (model_wall_times or {}).get(model, 0)
+            model_summaries[model] = summarize_results(_stored_results(conn, run["id"], model), model_wall or None)
+        summary["model_summaries"] = model_summaries
+
+    conn.execute(
+        "UPDATE runs SET avg_score = ?, avg_duration = ?, avg_tps = ?, item_count = ?, summary = ? WHERE id = ?",
+        (
+            summary["avg_score"], summary["avg_duration"], summary["avg_tps"], summary["item_count"],
+            json.dumps(summary, ensure_ascii=False), run["id"]
+        )
+    )
+    return summary
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (OSError, TypeError, ValueError):
+        # Keine Berechtigung o.ä.: Prozess existiert vermutlich noch
+        return pid is not None
+    return True
+
+
+def _recover_interrupted(conn):
+    """Runs, deren Prozess nicht mehr läuft, werden als "partial" abgeschlossen."""
+    rows = conn.execute(
+        "SELECT summary FROM runs WHERE json_extract(summary, '$.status') = ?", (STATUS_RUNNING,)
+    ).fetchall()
+    host = socket.gethostname()
+    with conn:
+        for row in rows:
+            run = json.loads(row[0])
+            if run.get("host") == host and not _process_alive(run.get("pid")):
+                _summarize_stored(conn, run, STATUS_PARTIAL)
+
+
+class RunCheckpoint:
+    """
+    Schreibt die Item-Ergebnisse eines laufenden Runs einzeln in die Datenbank,
+    statt sie bis zum Ende im Speicher zu halten. Der Run steht ab dem Start
+    als "running" im Archiv; bricht der Prozess ab, wird er beim nächsten
+    Zugriff als "partial" markiert und kann fortgesetzt werden.
+    Thread-sicher (Matrix-Runs schreiben aus mehreren Threads).
+    """
+
+    def __init__(self, run):
+        self.run = run
+        self._lock = threading.Lock()
+        self._conn = _connect(check_same_thread=False)
+        row = self._conn.execute("SELECT MAX(seq) FROM run_items WHERE run_id = ?", (run["id"],)).fetchone()
+        self._next_seq = 0 if row[0] is None else row[0] + 1
+
+    @property
+    def run_id(self):
+        return self.run["id"]
+
+    def completed_items(self, model=None):
+        """(dataset, item_index) aller schon gespeicherten Items, optional nur für ein Modell."""
+        sql = (
+            "SELECT json_extract(data, '$.dataset'), json_extract(data, '$.item_index') "
+            "FROM run_items WHERE run_id = ?"
+        )
+        params = [self.run_id]
+        if model is not None:
+            sql += " AND json_extract(data, '$.model') = ?"
+            params.append(model)
+        with self._lock:
+            return {(ds, index) for ds, index in self._conn.execute(sql, params) if ds is not None}
+
+    def add(self, result):
+        """Speichert ein fertiges Item sofort (eigene Transaktion, übersteht Abstürze)."""
+        with span("store.add"), self._lock, self._conn:
+            _store_items(self._conn, self.run_id, [(self._next_seq, result)])
+            _index_items(self._conn, self.run, [(self._next_seq, result)])
+            self._next_seq += 1
+
+    def finish(self, status=STATUS_COMPLETE, wall_time=None, model_wall_times=None):
+        """Schließt den Run ab und gibt die neue Summary (ohne Details) zurück."""
+        with self._lock:
+            try:
+                with self._conn:
+                    self.run = _summarize_stored(self._conn, self.run, status, wall_time, model_wall_times)
+            finally:
+                self._conn.close()
+        return self.run
+
+
+def start_run(model, datasets, run_type="single", extra=None) -> RunCheckpoint:
+    """Legt einen neuen Run mit Status "running" an; Items folgen über RunCheckpoint.add."""
+    run = {
+        **_new_run(model, datasets, run_type, extra),
+        **summarize_results([]),
+        "status": STATUS_RUNNING,
+        "pid": os.getpid(),
+        "host": socket.gethostname(),
+    }
+    conn = _connect()
+    try:
+        _insert_unique(conn, run, [])
+    finally:
+        conn.close()
+    return RunCheckpoint(run)
+
+
+def reopen_run(run_id, allow_complete=False) -> RunCheckpoint:
+    """
+    Öffnet einen abgebrochenen Run zum Fortsetzen (Status wieder "running").
+    `allow_complete`: auch abgeschlossene Runs (Stichprobe zum vollen Run erweitern).
+    """
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT summary FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(run_id)
+        run = json.loads(row["summary"])
+        if run.get("status") != STATUS_PARTIAL and not (allow_complete and run.get("status") != STATUS_RUNNING):
+            raise ValueError(f"Run {run_id} ist nicht unterbrochen (Status: {run.get('status', STATUS_COMPLETE)})")
+        run.update(status=STATUS_RUNNING, pid=os.getpid(), host=socket.gethostname())
+        with conn:
+            conn.execute("UPDATE runs SET summary = ? WHERE id = ?", (json.dumps(run, ensure_ascii=False), run_id))
+    finally:
+        conn.close()
+    return RunCheckpoint(run)
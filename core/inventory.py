@@ -0,0 +1,143 @@
+"""
+Geteilter Bestand an Providern und Modellen.
+
+Fragt Ollama per HTTP (/api/tags, /api/ps) ab statt `ollama list` zu
+forken, und hält das Ergebnis mit TTL im Speicher. Screens lesen
+`snapshot()` ohne zu warten; ist der Stand älter als die TTL, wird im
+Hintergrund nachgeladen (immer höchstens eine Abfrage gleichzeitig).
+"""
+import threading
+import time
+
+DEFAULT_TTL = 30.0
+
+
+class ModelInventory:
+    def __init__(self, host=None, ttl=DEFAULT_TTL, transport_settings=None):
+        from adapters.ollama import OllamaAdapter
+
+        self.ttl = ttl
+        self._client = OllamaAdapter("", host=host, transport_settings=transport_settings)
+        self._lock = threading.Lock()
+        self._refreshing = None
+        self._listeners = []
+        self._state = {"online": None, "models": [], "fetched_at": 0.0}
+
+    @property
+    def host(self):
+        return self._client.host
+
+    def snapshot(self):
+        """
+        Aktueller Stand ohne Netzwerkzugriff. `online` ist None, solange noch
+        nie abgefragt wurde. Veraltete Stände stoßen eine Hintergrund-Abfrage an.
+        """
+        with self._lock:
+            state = dict(self._state)
+        if time.time() - state["fetched_at"] > self.ttl:
+            self.refresh()
+        return state
+
+    def get(self, max_age=None):
+        """Stand, der höchstens `max_age` Sekunden alt ist (Default: TTL); wartet notfalls auf die Abfrage."""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            fresh = time.time() - self._state["fetched_at"] <= max_age
+        if not fresh:
+            self.refresh().join()
+        with self._lock:
+            return dict(self._state)
+
+    def refresh(self):
+        """Startet eine Hintergrund-Abfrage (oder gibt die bereits laufende zurück)."""
+        with self._lock:
+            if self._refreshing is None:
+                self._refreshing = threading.Thread(target=self._refresh, daemon=True)
+                self._refreshing.start()
+            return self._refreshing
+
+    def invalidate(self):
+        """Nach Änderungen (Modell entladen, Host gewechselt) beim nächsten Zugriff neu abfragen."""
+        with self._lock:
+            self._state["fetched_at"] = 0.0
+
+    def subscribe(self, callback):
+        """`callback(state)` nach jeder Abfrage (aus dem Abfrage-Thread). Gibt eine Abmelde-Funktion zurück."""
+        with self._lock:
+            self._listeners.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._listeners:
+                    self._listeners.remove(callback)
+        return unsubscribe
+
+    def _refresh(self):
+        try:
+            tags = self._client.list_models()
+            loaded = {m.get("name"): m for m in (self._client.list_loaded() or [])} if tags is not None else {}
+            models = []
+            for m in tags or []:
+                details = m.get("details") or {}
+                running = loaded.get(m.get("name"))
+                models.append({
+                    "name": m.get("name", ""),
+                    "digest": m.get("digest", ""),
+                    "size": m.get("size", 0),
+                    "modified_at": m.get("modified_at"),
+                    "parameter_size": details.get("parameter_size"),
+                    "quantization": details.get("quantization_level"),
+                    "loaded": running is not None,
+                    "size_vram": running.get("size_vram") if running else None,
+                })
+            state = {"online": tags is not None, "models": models, "fetched_at": time.time()}
+            with self._lock:
+                self._state = state
+                listeners = list(self._listeners)
+        finally:
+            with self._lock:
+                self._refreshing = None
+        for callback in listeners:
+            callback(dict(state))
+
+    # --- Bequeme Abfragen ---
+
+    def model_names(self):
+        return [m["name"] for m in self.snapshot()["models"]]
+
+    def find(self, name, max_age=None):
+        """Modell-Eintrag nach Name (auch ohne ':latest'), None wenn unbekannt."""
+        for m in self.get(max_age)["models"]:
+            if m["name"] == name or m["name"] == f"{name}:latest":
+                return m
+        return None
+
+
+_inventories = {}
+_inventories_lock = threading.Lock()
+
+
+def get_inventory(config=None) -> ModelInventory:
+    """
+    Prozessweit geteilter Bestand pro Ollama-Host (Host/TTL aus providers.ollama).
+    Bei mehreren Hosts zählt der erste; dort plant auch der Matrix-Scheduler.
+    """
+    ollama_config = config.get_ollama_config() if config else {}
+    host = config.get_ollama_hosts()[0]["url"] if config else None
+    ttl = float(ollama_config.get("inventory_ttl", DEFAULT_TTL))
+    with _inventories_lock:
+        inventory = _inventories.get(host)
+        if inventory is None:
+            inventory = ModelInventory(host, ttl=ttl, transport_settings=ollama_config.get("transport"))
+            _inventories[host] = inventory
+        # Die Config wird zur Laufzeit neu geladen: geänderte TTL sofort übernehmen
+        inventory.ttl = ttl
+        return inventory
+
+
+def format_size(size):
+    """Bytes -> '4.7 GB' wie in `ollama list`."""
+    for unit, factor in (("GB", 1e9), ("MB", 1e6), ("KB", 1e3)):
+        if size >= factor:
+            return f"{size / factor:.1f} {unit}"
+    return f"{size} B"
@@ -0,0 +1,87 @@
+import math
+
+
+def percentile(values, p):
+    """Perzentil (0-100) mit linearer Interpolation, 0 bei leerer Liste."""
+    data = sorted(values)
+    if not data:
+        return 0
+    if len(data) == 1:
+        return data[0]
+    rank = (len(data) - 1) * p / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return data[low] + (data[high] - data[low]) * (rank - low)
+
+
+def mean_std(values):
+    """Mittelwert und Stichproben-Standardabweichung (0 bei weniger als zwei Werten)."""
+    n = len(values)
+    if n == 0:
+        return 0.0, 0.0
+    mean = sum(values) / n
+    if n < 2:
+        return mean, 0.0
+    return mean, math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1))
+
+
+def _betacf(a, b, x):
+    """Kettenbruch der unvollständigen Betafunktion (Numerical Recipes, betacf)."""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1, a - 1
+    c, d = 1.0, 1 - qab * x / qap
+    d = 1 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 200):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1 + aa * d
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = 1 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1 + aa * d
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = 1 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-12:
+            break
+    return h
+
+
+def _betai(a, b, x):
+    """Regularisierte unvollständige Betafunktion I_x(a, b)."""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    ln_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x)
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(ln_front) * _betacf(a, b, x) / a
+    return 1 - math.exp(ln_front) * _betacf(b, a, 1 - x) / b
+
+
+def t_test_p(t, dof):
+    """Zweiseitiger p-Wert der Student-t-Verteilung."""
+    if dof <= 0:
+        return 1.0
+    return _betai(dof / 2, 0.5, dof / (dof + t * t))
+
+
+def paired_t_test(differences):
+    """
+    Gepaarter t-Test über Differenzen (neu - alt).
+    Gibt n, mittlere Differenz, t und den zweiseitigen p-Wert zurück.
+    """
+    n = len(differences)
+    mean, std = mean_std(differences)
+    if n < 2:
+        return {"n": n, "mean_delta": mean, "t": 0.0, "p": 1.0}
+    if std == 0:
+        # Alle Differenzen gleich: entweder gar keine Änderung oder eine völlig systematische
+        return {"n": n, "mean_delta": mean, "t": math.inf if mean else 0.0, "p": 0.0 if mean else 1.0}
+    t = mean / (std / math.sqrt(n))
+    return {"n": n, "mean_delta": mean, "t": t, "p": t_test_p(t, n - 1)}
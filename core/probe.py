@@ -0,0 +1,190 @@
+"""
+Kapazitätsmessung: wie viele parallele Requests verträgt ein Modell/Host,
+bevor die Tail-Latenz kippt?
+
+Die Concurrency steigt stufenweise (1, 2, 4, ... bis `max_concurrency`).
+Jede Stufe schickt Items aus den Datasets (zyklisch wiederholt, Streaming,
+ohne Antwort-Cache) und misst Durchsatz, TTFT und p50/p95/p99 der Dauer.
+Adaptiv endet die Messung, sobald mehr Parallelität kaum noch Durchsatz
+bringt, die p95 deutlich über der ersten Stufe liegt oder zu viele Requests
+fehlschlagen. Der Knick der Durchsatzkurve wird nach Kneedle bestimmt.
+
+Gespeichert wird ein Run mit run_type "probe": die Stufen stehen in
+`levels`, der Knick in `knee`, die Items tragen ihre Stufe in `probe_concurrency`.
+"""
+import time
+from collections import deque
+
+from core.datasets import iter_items
+from core.executor import BenchmarkExecutor, create_adapter
+from core.history_manager import start_run
+from core.metrics import percentile
+from core.profiling import timed_iter
+from core.progress import RunCancelled
+from core.response_cache import BYPASS
+from core.runner import _checkpointed, load_config
+from core.tokens import get_counter
+
+RUN_TYPE = "probe"
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_ITEMS_PER_LEVEL = 20
+# Abbruchkriterien der adaptiven Rampe
+MIN_GAIN = 0.05             # weniger als 5 % mehr Durchsatz als die vorige Stufe
+LATENCY_LIMIT = 3.0         # p95 mehr als 3x so hoch wie auf der ersten Stufe
+MAX_ERROR_RATE = 0.1
+
+
+def probe_levels(max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """Verdoppelnde Stufen 1, 2, 4, ..., zuletzt genau `max_concurrency`."""
+    levels = []
+    level = 1
+    while level < max_concurrency:
+        levels.append(level)
+        level *= 2
+    levels.append(max(1, int(max_concurrency)))
+    return levels
+
+
+def find_knee(levels):
+    """
+    Knick der Durchsatzkurve (Kneedle): Concurrency und Durchsatz werden auf
+    [0, 1] normiert, der Knick ist die Stufe mit dem größten Abstand über der
+    Geraden vom ersten zum letzten Punkt. Ab dort kostet mehr Parallelität
+    vor allem Latenz. Bei flacher oder zu kurzer Kurve: Stufe mit dem höchsten Durchsatz.
+    """
+    if not levels:
+        return None
+    best = max(levels, key=lambda l: l["items_per_s"])["concurrency"]
+    if len(levels) < 3:
+        return best
+    xs = [l["concurrency"] for l in levels]
+    ys = [l["items_per_s"] for l in levels]
+    x_span = (xs[-1] - xs[0]) or 1
+    y_span = (max(ys) - min(ys)) or 1
+    distances = [(y - min(ys)) / y_span - (x - xs[0]) / x_span for x, y in zip(xs, ys)]
+    index = max(range(len(levels)), key=distances.__getitem__)
+    return xs[index] if distances[index] > 0 else best
+
+
+def _cycle_items(datasets):
+    """(Dataset, Index, Item) endlos über alle Datasets; leer, wenn es keine Items gibt."""
+    while True:
+        found = False
+        for ds_name in datasets:
+            for index, item in enumerate(timed_iter("dataset.parse", iter_items(ds_name))):
+                found = True
+                yield ds_name, index, item
+        if not found:
+            return
+
+
+def _level_stats(concurrency, results, wall_time):
+    durations = [r["metrics"]["duration"] for r in results if not r.get("error")]
+    ttfts = [r["metrics"]["ttft"] for r in results if r["metrics"].get("ttft") is not None]
+    tokens = sum(r["metrics"].get("token_count", 0) for r in results if not r.get("error"))
+    errors = sum(1 for r in results if r.get("error"))
+    stats = {
+        "concurrency": concurrency,
+        "items": len(results),
+        "errors": errors,
+        "error_rate": round(errors / len(results), 3) if results else 0,
+        "wall_time": round(wall_time, 3),
+        "items_per_s": round((len(results) - errors) / wall_time, 3) if wall_time > 0 else 0,
+        "tokens_per_s": round(tokens / wall_time, 1) if wall_time > 0 else 0,
+    }
+    for p in (50, 95, 99):
+        stats[f"duration_p{p}"] = round(percentile(durations, p), 3) if durations else None
+    for p in (50, 95):
+        stats[f"ttft_p{p}"] = round(percentile(ttfts, p), 3) if ttfts else None
+    return stats
+
+
+def _stop_reason(levels):
+    """Warum die adaptive Rampe nach der letzten Stufe endet (None = weiter)."""
+    current = levels[-1]
+    if current["error_rate"] > MAX_ERROR_RATE:
+        return "errors"
+    if len(levels) < 2:
+        return None
+    base_p95 = levels[0]["duration_p95"]
+    if base_p95 and current["duration_p95"] and current["duration_p95"] > LATENCY_LIMIT * base_p95:
+        return "latency"
+    previous = levels[-2]
+    if current["items_per_s"] < previous["items_per_s"] * (1 + MIN_GAIN):
+        return "plateau"
+    return None
+
+
+def run_probe(model, datasets, config=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+              items_per_level=DEFAULT_ITEMS_PER_LEVEL, adaptive=True, on_level=None,
+              on_result=None, cancel=None, progress=None):
+    """
+    Misst die Durchsatz-/Latenzkurve eines Modells und speichert sie als Probe-Run.
+    Pro Stufe laufen mindestens `items_per_level` Items, aber mindestens vier
+    pro paralleler Verbindung, damit die Stufe im eingeschwungenen Zustand gemessen wird.
+    `on_level(stats)` kommt nach jeder Stufe, `on_result(ds_name, result)` nach jedem Item.
+    Generierungs-Optionen kommen aus datasets.default (Streaming immer an, für TTFT).
+    """
+    if config is None:
+        config = load_config()
+    planned = probe_levels(max_concurrency)
+    settings = {"max_concurrency": max_concurrency, "items_per_level": items_per_level, "adaptive": adaptive}
+    checkpoint = start_run(model, datasets, run_type=RUN_TYPE, extra={"probe": settings, "levels": []})
+
+    # Cache-Treffer würden Durchsatz vortäuschen; der HTTP-Pool muss die höchste
+    # Stufe tragen, sonst misst die Rampe das Warten auf Verbindungen statt den Server
+    adapter = create_adapter(model, config, BYPASS, max_concurrency)
+    options = {**(config.get_dataset_options("default") if config else {}), "stream": True}
+    source = _cycle_items(datasets)
+    counter = get_counter(model, config)
+
+    def work():
+        levels = checkpoint.run["levels"]
+        # Aufwärmen: Modell laden, bevor die erste Stufe misst
+        first = next(source, None)
+        if first is None:
+            return None
+        adapter.send(first[2]["prompt"], options)
+
+        for concurrency in planned:
+            count = max(items_per_level, concurrency * 4)
+            positions = deque()
+
+            def level_items():
+                for n, (ds_name, index, item) in enumerate(source, 1):
+                    positions.append((ds_name, index))
+                    yield item
+                    if n >= count:
+                        return
+
+            executor = BenchmarkExecutor(adapter, concurrency=concurrency, token_counter=counter)
+            on_start = progress.item_started if progress else None
+            results = []
+            started = time.perf_counter()
+            for result in executor.iter_results(level_items(), options, cancel, on_start):
+                result["dataset"], result["item_index"] = positions.popleft()
+                result["probe_concurrency"] = concurrency
+                checkpoint.add(result)
+                results.append({"metrics": result["metrics"], "error": result.get("error")})
+                if progress:
+                    progress.item_finished(result)
+                if on_result:
+                    on_result(result["dataset"], result)
+            if cancel is not None and cancel.is_set():
+                break
+
+            stats = _level_stats(concurrency, results, time.perf_counter() - started)
+            levels.append(stats)
+            checkpoint.run["knee"] = find_knee(levels)
+            if on_level:
+                on_level(stats)
+            reason = _stop_reason(levels) if adaptive else None
+            if reason:
+                checkpoint.run["stop_reason"] = reason
+                break
+
+        if cancel is not None and cancel.is_set():
+            raise RunCancelled()
+        return None
+
+    return _checkpointed(checkpoint, work, config)
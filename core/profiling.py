@@ -0,0 +1,215 @@
+"""
+Zeitmessung der Phasen eines Runs: wie viel der Zeit ist Modell, wie viel Harness?
+
+Instrumentierte Stellen öffnen benannte Spans (`with span("score"): ...`).
+Läuft keine Messung, ist ein Span ein geteiltes No-op-Objekt (ein Lesezugriff
+auf eine Modulvariable). Während eines Runs sammelt ein Profiler pro Phase
+Anzahl, Gesamt- und Eigenzeit (ohne verschachtelte Spans); daraus entsteht
+die `profile`-Summary des Runs mit dem Harness-Anteil in Prozent. Optional
+werden alle Spans als Trace gespeichert (Chrome-Trace-Format für
+chrome://tracing / Perfetto oder speedscope).
+
+Modellzeit ist die Eigenzeit der MODEL_PHASES (HTTP-Request bis zum
+letzten Byte, inklusive Netzwerk), alles andere mit Span zählt als Harness.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Phasen, deren Eigenzeit beim Modell-Server (bzw. im Netzwerk) verbracht wird
+MODEL_PHASES = ("http.request", "http.stream")
+TRACE_FORMATS = ("chrome", "speedscope")
+DEFAULT_TRACE_DIR = "config/traces"
+
+_NULL_SPAN = nullcontext()
+_active = None
+# Überschreibt app.profiling aus der config.yaml (z.B. headless --trace)
+_overrides = {}
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "args", "start", "child_time")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.child_time = 0
+        self.profiler._stack().append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter_ns() - self.start
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].child_time += duration
+        self.profiler._record(self, duration)
+        return False
+
+
+class Profiler:
+    """Sammelt Spans aller Threads; `trace` bewahrt zusätzlich jeden einzelnen für den Export auf."""
+
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.started_ns = time.perf_counter_ns()
+        self.phases = {}
+        self.events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, span, duration):
+        with self._lock:
+            phase = self.phases.get(span.name)
+            if phase is None:
+                phase = self.phases[span.name] = [0, 0, 0]
+            phase[0] += 1
+            phase[1] += duration
+            phase[2] += duration - span.child_time
+            if self.trace:
+                self.events.append((span.name, threading.get_ident(), span.start, duration, span.args))
+
+    def summary(self, wall_time=None):
+        """
+        Zeiten pro Phase und der Harness-Anteil an der gemessenen Zeit (Modell
+        plus Harness, über alle Threads summiert). Ungemessene Zeit, etwa
+        Warten auf freie Worker, zählt nicht mit.
+        """
+        with self._lock:
+            phases = {
+                name: {"count": count, "total": round(total / 1e9, 4), "self": round(own / 1e9, 4)}
+                for name, (count, total, own) in sorted(self.phases.items())
+            }
+        model_time = sum(p["self"] for name, p in phases.items() if name in MODEL_PHASES)
+        harness_time = sum(p["self"] for name, p in phases.items() if name not in MODEL_PHASES)
+        measured = model_time + harness_time
+        summary = {
+            "phases": phases,
+            "model_time": round(model_time, 3),
+            "harness_time": round(harness_time, 3),
+            "harness_pct": round(harness_time / measured * 100, 2) if measured else 0.0,
+        }
+        if wall_time:
+            summary["wall_time"] = round(wall_time, 3)
+        return summary
+
+    # --- Trace-Export ---
+
+    def _thread_ids(self):
+        # Kleine, stabile Thread-Nummern statt der langen Python-Idents
+        ids = {}
+        for _, tid, _, _, _ in self.events:
+            ids.setdefault(tid, len(ids) + 1)
+        return ids
+
+    def chrome_trace(self, meta=None):
+        """Trace Event Format ("X"-Events, Mikrosekunden), lesbar in chrome://tracing und Perfetto."""
+        ids = self._thread_ids()
+        events = [
+            {"name": name, "ph": "X", "pid": 1, "tid": ids[tid],
+             "ts": (start - self.started_ns) / 1e3, "dur": duration / 1e3, **({"args": args} if args else {})}
+            for name, tid, start, duration, args in self.events
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": meta or {}}
+
+    def speedscope(self, name="run"):
+        """speedscope-Datei: ein "evented"-Profil pro Thread, Zeiten in Millisekunden."""
+        frames = {}
+        by_thread = {}
+        for span_name, tid, start, duration, _ in self.events:
+            frame = frames.setdefault(span_name, len(frames))
+            at, end = (start - self.started_ns) / 1e6, (start + duration - self.started_ns) / 1e6
+            by_thread.setdefault(tid, []).extend([(at, 1, -end, "O", frame), (end, 0, -at, "C", frame)])
+        profiles = []
+        for number, events in enumerate(by_thread.values(), 1):
+            # Bei gleicher Zeit erst schließen, dann öffnen; Äußere vor Inneren öffnen und nach ihnen schließen
+            events.sort(key=lambda e: e[:3])
+            profiles.append({
+                "type": "evented", "name": f"Thread {number}", "unit": "milliseconds",
+                "startValue": events[0][0], "endValue": max(e[0] for e in events),
+                "events": [{"type": kind, "frame": frame, "at": at} for at, _, _, kind, frame in events],
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "shared": {"frames": [{"name": n} for n in frames]},
+            "profiles": profiles,
+        }
+
+    def write_trace(self, path, fmt="chrome", meta=None):
+        if fmt not in TRACE_FORMATS:
+            raise ValueError(f"Unbekanntes Trace-Format {fmt} (möglich: {', '.join(TRACE_FORMATS)})")
+        with self._lock:
+            data = self.chrome_trace(meta) if fmt == "chrome" else self.speedscope((meta or {}).get("run_id", "run"))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        return path
+
+
+def span(name, **args):
+    """Misst den umschlossenen Block als Phase `name`, wenn gerade ein Profiler aktiv ist."""
+    profiler = _active
+    if profiler is None:
+        return _NULL_SPAN
+    return _Span(profiler, name, args)
+
+
+def timed_iter(name, iterable):
+    """Reicht die Elemente durch und misst jedes next() als Phase `name` (z.B. Dataset-Parsing)."""
+    iterator = iter(iterable)
+    while True:
+        with span(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def configure(**settings):
+    """Überschreibt app.profiling für diesen Prozess (trace, trace_dir, trace_format)."""
+    _overrides.update({k: v for k, v in settings.items() if v is not None})
+
+
+def trace_settings(config=None):
+    settings = dict((config.get_app_settings().get("profiling") or {}) if config else {})
+    settings.update(_overrides)
+    return {
+        "trace": bool(settings.get("trace", False)),
+        "trace_dir": settings.get("trace_dir", DEFAULT_TRACE_DIR),
+        "trace_format": settings.get("trace_format", "chrome"),
+    }
+
+
+@contextmanager
+def profiled(trace=False):
+    """Aktiviert einen Profiler für die Dauer des Blocks (ein Run zur Zeit; ein äußerer wird danach wiederhergestellt)."""
+    global _active
+    previous = _active
+    profiler = Profiler(trace=trace)
+    _active = profiler
+    try:
+        yield profiler
+    finally:
+        _active = previous
+
+
+def trace_path(run_id, settings):
+    suffix = ".speedscope.json" if settings["trace_format"] == "speedscope" else ".trace.json"
+    return os.path.join(settings["trace_dir"], f"{run_id or datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}")
@@ -0,0 +1,127 @@
+"""
+Fortschritt laufender Benchmarks, unabhängig von der Oberfläche.
+
+Die Worker-Threads melden jedes Item an einen ProgressTracker; der fasst
+die Ereignisse zusammen und ruft `on_update(snapshot)` höchstens alle
+`interval` Sekunden auf. Tausende schnelle Items erzeugen so nur wenige
+UI-Updates pro Sekunde.
+
+Wer einzelne Items sehen will, gibt `on_events(events)` an: im selben Takt
+kommen die seit der letzten Meldung gestarteten, fertigen und
+fehlgeschlagenen Items, gesammelt nach Art (EVENT_KINDS).
+"""
+import threading
+import time
+from collections import deque
+
+from core.metrics import percentile
+from core.profiling import span
+
+
+EVENT_KINDS = ("started", "finished", "failed")
+
+
+class RunCancelled(Exception):
+    """Der Run wurde über sein Cancel-Event abgebrochen; fertige Items bleiben gespeichert."""
+
+
+class ProgressTracker:
+    """
+    Thread-sichere Zählung von gestarteten, fertigen und fehlgeschlagenen Items.
+    Durchsatz und p95 beziehen sich auf die letzten `window` fertigen Items,
+    damit sie den aktuellen Zustand zeigen und nicht den Mittelwert seit Start.
+    """
+
+    def __init__(self, total, on_update=None, interval=0.25, window=200, already_done=0, on_events=None):
+        self.total = total
+        self.on_update = on_update
+        self.on_events = on_events
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._started_at = time.perf_counter()
+        self._last_emit = 0.0
+        self._started = 0
+        self._completed = 0
+        self._finished = already_done
+        self._failed = 0
+        self._recent_errors = deque(maxlen=5)
+        self._finish_times = deque(maxlen=window)
+        self._durations = deque(maxlen=window)
+        self._events = {kind: [] for kind in EVENT_KINDS}
+
+    def set_total(self, total):
+        """Gesamtzahl nachtragen, wenn sie erst während des Runs feststeht (bis dahin None)."""
+        with self._lock:
+            self.total = total
+
+    def item_started(self, item=None):
+        with self._lock:
+            self._started += 1
+            if self.on_events and item is not None:
+                self._events["started"].append({"id": item.get("id", "?")})
+        self._maybe_emit()
+
+    def item_finished(self, result):
+        with span("progress"):
+            self._item_finished(result)
+
+    def _item_finished(self, result):
+        now = time.perf_counter()
+        with self._lock:
+            self._finished += 1
+            self._completed += 1
+            self._finish_times.append(now)
+            duration = result.get("metrics", {}).get("duration")
+            if duration is not None:
+                self._durations.append(duration)
+            if result.get("error"):
+                self._failed += 1
+                self._recent_errors.append(f"{result.get('id', '?')}: {result['error']}")
+            if self.on_events:
+                event = {"id": result.get("id", "?"), "dataset": result.get("dataset")}
+                if result.get("error"):
+                    self._events["failed"].append({**event, "error": result["error"]})
+                else:
+                    self._events["finished"].append({**event, "score": result.get("score"), "duration": duration})
+        self._maybe_emit()
+
+    def snapshot(self):
+        with self._lock:
+            now = time.perf_counter()
+            times = self._finish_times
+            if len(times) >= 2 and times[-1] > times[0]:
+                rate = (len(times) - 1) / (now - times[0])
+            else:
+                elapsed = now - self._started_at
+                rate = len(times) / elapsed if elapsed > 0 else 0.0
+            remaining = max(self.total - self._finished, 0) if self.total else None
+            return {
+                "total": self.total,
+                "finished": self._finished,
+                "failed": self._failed,
+                "in_flight": self._started - self._completed,
+                "items_per_s": round(rate, 2),
+                "eta": round(remaining / rate, 1) if remaining is not None and rate > 0 else None,
+                "p95": round(percentile(list(self._durations), 95), 3) if self._durations else None,
+                "elapsed": round(now - self._started_at, 1),
+                "recent_errors": list(self._recent_errors),
+            }
+
+    def _maybe_emit(self, force=False):
+        if not self.on_update and not self.on_events:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if not force and now - self._last_emit < self.interval:
+                return
+            self._last_emit = now
+            events = {kind: items for kind, items in self._events.items() if items}
+            self._events = {kind: [] for kind in EVENT_KINDS}
+        if self.on_events and events:
+            self.on_events(events)
+        if self.on_update:
+            self.on_update(self.snapshot())
+
+    def flush(self):
+        """Letzten Stand sofort melden (am Ende des Runs)."""
+        self._maybe_emit(force=True)
@@ -0,0 +1,206 @@
+"""
+Regressions-Abfragen über den Item-Index der Run-Datenbank (Tabelle
+item_series, gepflegt von history_manager bei jedem gespeicherten Item).
+Alle Abfragen laufen über den Index (Modell, Item-ID, Dataset, Zeit) und
+lesen weder Antworttexte noch ganze Runs.
+"""
+import math
+import threading
+
+from core.history_manager import _connect
+from core.metrics import mean_std, paired_t_test
+
+# Default-Schwellen für einzelne Items
+MIN_SCORE_DELTA = 10        # Score-Punkte
+LATENCY_FACTOR = 1.5        # neue Dauer / alte Dauer
+HISTORY_WINDOW = 20         # frühere Messungen pro Item für die Streuung
+SIGMA = 2.0                 # Abweichung vom Verlauf in Standardabweichungen
+
+
+def _trend_query(model, item_id, dataset, limit):
+    sql = (
+        "SELECT run_id, dataset, created_at, score, duration, ttft, token_count, tps "
+        "FROM item_series WHERE model = ? AND item_id = ?"
+    )
+    params = [model, item_id]
+    if dataset is not None:
+        sql += " AND dataset = ?"
+        params.append(dataset)
+    sql += " ORDER BY created_at DESC, run_id DESC LIMIT ?"
+    params.append(limit)
+    return sql, params
+
+
+def item_trend(model, item_id, dataset=None, limit=30):
+    """Die letzten `limit` Messungen eines Items, älteste zuerst."""
+    conn = _connect()
+    try:
+        rows = conn.execute(*_trend_query(model, item_id, dataset, limit)).fetchall()
+    finally:
+        conn.close()
+    return [dict(row) for row in reversed(rows)]
+
+
+class TrendReader:
+    """
+    Liest Item-Verläufe über eine offene Verbindung, z.B. einzeln beim
+    Durchblättern einer Vergleichstabelle. Thread-sicher, damit die Abfragen
+    in Worker-Threads laufen können.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self._closed = False
+
+    def trend(self, model, item_id, dataset=None, limit=30):
+        with self._lock:
+            if self._closed:
+                return []
+            if self._conn is None:
+                self._conn = _connect(check_same_thread=False)
+            rows = self._conn.execute(*_trend_query(model, item_id, dataset, limit)).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _run_items(conn, run_id):
+    """(Modell, Dataset, Item-ID) -> erste Messung im Run."""
+    rows = conn.execute(
+        "SELECT model, dataset, item_id, score, duration, created_at FROM item_series "
+        "WHERE run_id = ? ORDER BY seq", (run_id,)
+    ).fetchall()
+    items = {}
+    for row in rows:
+        items.setdefault((row["model"], row["dataset"], row["item_id"]), dict(row))
+    return items
+
+
+def _histories(conn, run_id, before, window):
+    """
+    Frühere Scores/Dauern aller Items des Runs (je höchstens `window`) in einer
+    Abfrage: die Schlüssel kommen aus dem Run selbst, jede Historie wird über
+    den Index gelesen und per ROW_NUMBER auf das Fenster gekürzt.
+    """
+    rows = conn.execute("""
+        SELECT model, dataset, item_id, score, duration FROM (
+            SELECT s.model, s.dataset, s.item_id, s.score, s.duration, ROW_NUMBER() OVER (
+                PARTITION BY s.model, s.dataset, s.item_id ORDER BY s.created_at DESC
+            ) AS pos
+            FROM (SELECT DISTINCT model, dataset, item_id FROM item_series WHERE run_id = ?) k
+            JOIN item_series s ON s.model = k.model AND s.item_id = k.item_id AND s.dataset = k.dataset
+            WHERE s.created_at < ?
+        ) WHERE pos <= ?
+        ORDER BY model, dataset, item_id, pos
+    """, (run_id, before, window)).fetchall()
+    histories = {}
+    for row in rows:
+        history = histories.setdefault(
+            (row["model"], row["dataset"], row["item_id"]), {"score": [], "duration": []}
+        )
+        history["score"].append(row["score"])
+        if row["duration"] is not None:
+            history["duration"].append(row["duration"])
+    return histories
+
+
+def _outside_history(value, history):
+    """Liegt der Wert außerhalb der üblichen Streuung des Items? Ohne Verlauf: ja."""
+    if len(history) < 3:
+        return True
+    mean, std = mean_std(history)
+    return abs(value - mean) > SIGMA * std
+
+
+def _item_flags(old, new, history, min_score_delta, latency_factor):
+    flags = []
+    delta = new["score"] - old["score"]
+    if abs(delta) >= min_score_delta and _outside_history(new["score"], history["score"]):
+        flags.append("score_down" if delta < 0 else "score_up")
+    if old["duration"] and new["duration"]:
+        ratio = new["duration"] / old["duration"]
+        if (ratio >= latency_factor or ratio <= 1 / latency_factor) and _outside_history(new["duration"], history["duration"]):
+            flags.append("slower" if ratio > 1 else "faster")
+    return flags
+
+
+def compare_runs(base_run_id, new_run_id, alpha=0.05, min_score_delta=MIN_SCORE_DELTA,
+                 latency_factor=LATENCY_FACTOR, window=HISTORY_WINDOW):
+    """
+    Vergleicht zwei Runs über gemeinsame (Modell, Dataset, Item-ID).
+
+    Run-Ebene: gepaarter t-Test über Score-Differenzen und über log(Dauer neu / alt).
+    Item-Ebene: markiert, wenn sich Score bzw. Dauer über die Schwelle hinaus
+    ändert und der neue Wert außerhalb der bisherigen Streuung des Items liegt.
+    Items sind nach Schwere sortiert (markierte zuerst, dann größte Score-Änderung).
+    """
+    conn = _connect()
+    try:
+        base = _run_items(conn, base_run_id)
+        new = _run_items(conn, new_run_id)
+        before = max((row["created_at"] for row in new.values()), default="")
+        histories = _histories(conn, new_run_id, before, window)
+    finally:
+        conn.close()
+
+    items = []
+    score_deltas = []
+    log_ratios = []
+    # Ältere Runs mit mehreren Datasets kennen das Dataset eines Items nicht (""):
+    # dann über (Modell, Item-ID) zuordnen, sofern das eindeutig ist
+    by_item = {}
+    for model, dataset, item_id in base:
+        by_item.setdefault((model, item_id), []).append((model, dataset, item_id))
+
+    matched = set()
+    for key, new_row in new.items():
+        base_key = key if key in base else None
+        if base_key is None:
+            candidates = by_item.get((key[0], key[2]), [])
+            if len(candidates) == 1 and "" in (key[1], candidates[0][1]):
+                base_key = candidates[0]
+        if base_key is None:
+            continue
+        matched.add(base_key)
+        old_row = base[base_key]
+        history = histories.get(key, {"score": [], "duration": []})
+        score_deltas.append(new_row["score"] - old_row["score"])
+        if old_row["duration"] and new_row["duration"]:
+            log_ratios.append(math.log(new_row["duration"] / old_row["duration"]))
+        model, dataset, item_id = key
+        items.append({
+            "model": model,
+            "dataset": dataset,
+            "item_id": item_id,
+            "score_old": old_row["score"],
+            "score_new": new_row["score"],
+            "score_delta": new_row["score"] - old_row["score"],
+            "duration_old": old_row["duration"],
+            "duration_new": new_row["duration"],
+            "flags": _item_flags(old_row, new_row, history, min_score_delta, latency_factor),
+        })
+    items.sort(key=lambda i: (not i["flags"], -abs(i["score_delta"])))
+
+    score_test = paired_t_test(score_deltas)
+    score_test["significant"] = score_test["p"] < alpha
+    latency_test = paired_t_test(log_ratios)
+    latency_test["significant"] = latency_test["p"] < alpha
+    # Mittleres log-Verhältnis zurück in einen Faktor (geometrisches Mittel)
+    latency_test["factor"] = math.exp(latency_test["mean_delta"]) if log_ratios else 1.0
+
+    return {
+        "base": base_run_id,
+        "new": new_run_id,
+        "common_items": len(items),
+        "only_base": len(base) - len(matched),
+        "only_new": len(new) - len(items),
+        "score": score_test,
+        "latency": latency_test,
+        "items": items,
+    }
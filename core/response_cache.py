@@ -0,0 +1,177 @@
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_FILE = "config/response_cache.db"
+
+# Cache-Policies pro Run
+BYPASS = "bypass"
+READ_ONLY = "read-only"
+READ_WRITE = "read-write"
+POLICIES = (BYPASS, READ_ONLY, READ_WRITE)
+
+
+# Optionen, die nur die Ausführung steuern und die Antwort nicht verändern
+NON_KEY_OPTIONS = ("keep_alive",)
+# Gepufferte Zugriffszeiten spätestens ab so vielen Treffern schreiben
+ACCESS_FLUSH = 256
+# Verdrängen bis auf diesen Anteil beider Grenzen
+LOW_WATER = 0.9
+
+
+def make_key(provider, model, digest, prompt, options=None):
+    """Stabiler Cache-Key aus Provider, Modell, Modell-Digest, Prompt und Generierungs-Optionen."""
+    options = {k: v for k, v in (options or {}).items() if k not in NON_KEY_OPTIONS}
+    raw = json.dumps(
+        {"provider": provider, "model": model, "digest": digest, "prompt": prompt, "options": options},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistenter Antwort-Cache (SQLite) mit LRU-Verdrängung nach
+    Anzahl der Einträge und Gesamtgröße.
+
+    Anzahl und Größe stehen als laufende Summen in der Tabelle `stats`
+    (im selben Commit wie Einfügen und Verdrängen gepflegt), ein put zählt
+    also nie die ganze Tabelle. Zugriffszeiten von Treffern werden gepuffert
+    und gesammelt geschrieben (spätestens vor dem nächsten Verdrängen und
+    beim Beenden des Prozesses).
+    """
+
+    def __init__(self, path=CACHE_FILE, max_entries=50000, max_bytes=500 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> letzter Zugriff, noch nicht geschrieben
+        self._touched = {}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                provider TEXT,
+                model TEXT,
+                digest TEXT,
+                result TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        # Deckt das Verdrängen ab (Reihenfolge und Größe), ohne die Antworttexte zu lesen
+        self._conn.execute("DROP INDEX IF EXISTS idx_entries_access")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries(last_access, size)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS stats (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                entries INTEGER NOT NULL,
+                bytes INTEGER NOT NULL
+            )
+        """)
+        if self._conn.execute("SELECT 1 FROM stats WHERE id = 0").fetchone() is None:
+            # Einmalig für Cache-Dateien ohne stats-Tabelle
+            self._conn.execute("INSERT INTO stats SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+        self._conn.commit()
+        atexit.register(self.flush)
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= ACCESS_FLUSH:
+                self._write_access()
+                self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key, provider, model, digest, result):
+        payload = json.dumps(result, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            # Vorhandener Key: paralleler Fehlschlag auf denselben Prompt, der erste Eintrag bleibt
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, digest, payload, size, now, now)
+            ).rowcount
+            if inserted:
+                self._conn.execute("UPDATE stats SET entries = entries + 1, bytes = bytes + ? WHERE id = 0", (size,))
+                self._evict()
+            self._conn.commit()
+
+    def _write_access(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                [(at, key) for key, at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        count, total = self._conn.execute("SELECT entries, bytes FROM stats WHERE id = 0").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Bis unter LOW_WATER verdrängen, damit nicht jedes weitere put wieder verdrängt
+        self._write_access()
+        keep_entries, keep_bytes = int(self.max_entries * LOW_WATER), int(self.max_bytes * LOW_WATER)
+        victims = freed = 0
+        for (size,) in self._conn.execute("SELECT size FROM entries ORDER BY last_access"):
+            if count - victims <= keep_entries and total - freed <= keep_bytes:
+                break
+            victims += 1
+            freed += size
+        # Dieselbe Reihenfolge über denselben Index, also genau die gezählten Einträge
+        self._conn.execute(
+            "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries ORDER BY last_access LIMIT ?)",
+            (victims,)
+        )
+        self._conn.execute(
+            "UPDATE stats SET entries = entries - ?, bytes = bytes - ? WHERE id = 0", (victims, freed)
+        )
+
+    def flush(self):
+        """Gepufferte Zugriffszeiten schreiben."""
+        with self._lock:
+            self._write_access()
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            count, total = self._conn.execute("SELECT entries, bytes FROM stats WHERE id = 0").fetchone()
+        return {"entries": count, "bytes": total}
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("UPDATE stats SET entries = 0, bytes = 0 WHERE id = 0")
+            self._conn.commit()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(settings=None) -> ResponseCache:
+    """Prozessweit geteilte Cache-Instanz pro Datei."""
+    settings = settings or {}
+    path = settings.get("path", CACHE_FILE)
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = ResponseCache(
+                path,
+                max_entries=int(settings.get("max_entries", 50000)),
+                max_bytes=int(float(settings.get("max_mb", 500)) * 1024 * 1024)
+            )
+        return _caches[path]
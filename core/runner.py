@@ -0,0 +1,221 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from core.config_loader import ConfigLoader
+from core.datasets import iter_items
+from core.executor import BenchmarkExecutor, create_adapter, create_client
+from core.history_manager import STATUS_COMPLETE, STATUS_PARTIAL, load_run, reopen_run, start_run
+from core.inventory import get_inventory
+from core.profiling import profiled, span, timed_iter, trace_path, trace_settings
+from core.progress import RunCancelled
+from core.scheduler import plan_waves
+from core.tokens import get_counter
+
+# Felder eines Stichproben-Runs, die beim Erweitern zum vollen Run nach sampling.result wandern
+SAMPLE_RESULT_KEYS = ("estimate", "ci_low", "ci_high", "sample_size", "stop_reason")
+
+
+def load_config():
+    """Config laden; ohne config.yaml laufen Runs mit Defaults."""
+    try:
+        return ConfigLoader()
+    except FileNotFoundError:
+        return None
+
+
+def execute_suite(model, datasets, config=None, cache_policy=None, concurrency=None, on_result=None,
+                  keep_alive=None, skip=None, cancel=None, progress=None):
+    """
+    Führt alle Datasets gegen ein Modell aus und reicht jedes Ergebnis sofort an
+    `on_result(ds_name, result)` weiter, ohne die Ergebnisse zu sammeln.
+    `skip` enthält (dataset, item_index) bereits fertiger Items (Fortsetzen).
+    `cancel` (threading.Event) stoppt den Run nach den laufenden Requests mit
+    RunCancelled; `progress` (ProgressTracker) bekommt jedes Item gemeldet.
+    """
+    if concurrency is None:
+        concurrency = config.get_concurrency(model) if config else 1
+    skip = skip or set()
+
+    adapter = create_adapter(model, config, cache_policy, concurrency)
+    executor = BenchmarkExecutor(adapter, concurrency=concurrency, token_counter=get_counter(model, config))
+    on_start = progress.item_started if progress else None
+    for ds_name in datasets:
+        if cancel is not None and cancel.is_set():
+            break
+        options = config.get_dataset_options(ds_name) if config else {}
+        if keep_alive is not None:
+            options["keep_alive"] = keep_alive
+
+        # Ergebnisse kommen in Dataset-Reihenfolge, die Indizes also auch
+        indices = deque()
+
+        def pending_items():
+            for index, item in enumerate(timed_iter("dataset.parse", iter_items(ds_name))):
+                if (ds_name, index) not in skip:
+                    indices.append(index)
+                    yield item
+
+        for result in executor.iter_results(pending_items(), options, cancel, on_start):
+            result["dataset"] = ds_name
+            result["item_index"] = indices.popleft()
+            if progress:
+                progress.item_finished(result)
+            if on_result:
+                on_result(ds_name, result)
+
+    if cancel is not None and cancel.is_set():
+        raise RunCancelled()
+
+
+def _checkpointed(checkpoint, work, config=None):
+    """
+    Führt `work()` aus und schließt den Run ab. Bei Fehlern oder Abbruch
+    (auch Strg+C) bleibt er als "partial" mit allen fertigen Items stehen.
+    Ein gewollter Abbruch (RunCancelled) gibt den Teil-Run zurück, statt zu werfen.
+    `work` gibt optional Wanduhr-Zeiten pro Modell zurück.
+    Die Phasen-Zeiten landen als `profile` in der Summary (siehe core.profiling),
+    mit app.profiling.trace zusätzlich als Trace-Datei.
+    """
+    settings = trace_settings(config)
+    with profiled(trace=settings["trace"]) as profiler:
+        started = time.perf_counter()
+
+        def finish(status, model_wall_times=None):
+            wall_time = time.perf_counter() - started
+            checkpoint.run["profile"] = profiler.summary(wall_time)
+            if settings["trace"]:
+                checkpoint.run["trace_file"] = trace_path(checkpoint.run_id, settings)
+            with span("store.finish"):
+                run = checkpoint.finish(status, wall_time, model_wall_times)
+            if settings["trace"]:
+                profiler.write_trace(run["trace_file"], settings["trace_format"], {"run_id": run["id"], "model": run["model"]})
+            return run
+
+        try:
+            model_wall_times = work()
+        except RunCancelled:
+            return finish(STATUS_PARTIAL)
+        except BaseException:
+            finish(STATUS_PARTIAL)
+            raise
+        return finish(STATUS_COMPLETE, model_wall_times)
+
+
+def _run_suite(checkpoint, model, datasets, config, cache_policy, concurrency, on_result, cancel, progress):
+    skip = checkpoint.completed_items()
+
+    def record(ds_name, result):
+        checkpoint.add(result)
+        if on_result:
+            on_result(ds_name, result)
+
+    return _checkpointed(
+        checkpoint,
+        lambda: execute_suite(model, datasets, config, cache_policy, concurrency, record,
+                              skip=skip, cancel=cancel, progress=progress),
+        config
+    )
+
+
+def run_suite(model, datasets, config=None, cache_policy=None, concurrency=None, on_result=None,
+              cancel=None, progress=None):
+    """
+    Führt alle Datasets gegen ein Modell aus und speichert den Run in der Historie.
+    Gemeinsamer Kern für TUI und Headless-Runner (importiert kein Textual).
+    `on_result(ds_name, result)` wird nach jedem fertigen Item aufgerufen.
+    Jedes Item wird sofort gespeichert; der Speicherbedarf hängt nicht von der Suite-Größe ab.
+    Nach `cancel.set()` endet der Run als "partial" (siehe execute_suite).
+    """
+    if config is None:
+        config = load_config()
+    checkpoint = start_run(model, datasets)
+    return _run_suite(checkpoint, model, datasets, config, cache_policy, concurrency, on_result, cancel, progress)
+
+
+def _run_matrix(checkpoint, models, datasets, config, cache_policy, concurrency, on_result, cancel, progress):
+    ollama_config = config.get_ollama_config() if config else {}
+    keep_alive = ollama_config.get("keep_alive")
+    budget_gb = ollama_config.get("memory_budget_gb")
+
+    lock = threading.Lock()
+    wall_times = {}
+
+    def run_model(model):
+        skip = checkpoint.completed_items(model)
+
+        def forward(ds_name, result):
+            result["model"] = model
+            checkpoint.add(result)
+            if on_result:
+                with lock:
+                    on_result(model, ds_name, result)
+        started = time.perf_counter()
+        execute_suite(model, datasets, config, cache_policy, concurrency, forward, keep_alive, skip, cancel, progress)
+        wall_times[model] = time.perf_counter() - started
+
+    def work():
+        inventory = get_inventory(config)
+        # Ladezustand muss aktuell sein, sonst plant der Scheduler mit alten Daten
+        state = inventory.get(max_age=0)
+        loaded = [m["name"] for m in state["models"] if m["loaded"]]
+        sizes = {m["name"]: m["size"] for m in state["models"]}
+        waves = plan_waves(models, loaded, sizes, budget_gb * 1024 ** 3 if budget_gb else None)
+        checkpoint.run["schedule"] = waves
+
+        for index, wave in enumerate(waves):
+            with ThreadPoolExecutor(max_workers=len(wave)) as pool:
+                list(pool.map(run_model, wave))
+            # Speicher für die nächste Welle sofort freigeben statt auf keep_alive zu warten
+            if index + 1 < len(waves):
+                for model in wave:
+                    create_client(model, config).unload()
+                inventory.invalidate()
+        return wall_times
+
+    return _checkpointed(checkpoint, work, config)
+
+
+def run_matrix(models, datasets, config=None, cache_policy=None, concurrency=None, on_result=None,
+               cancel=None, progress=None):
+    """
+    Jedes Modell gegen jedes Dataset, gespeichert als ein gruppierter Vergleichs-Run.
+    Die Reihenfolge minimiert Lade-/Entladevorgänge: geladene Modelle zuerst,
+    Modelle, die gemeinsam in providers.ollama.memory_budget_gb passen, laufen
+    parallel. `on_result(model, ds_name, result)` kann aus mehreren Threads kommen,
+    wird aber serialisiert aufgerufen.
+    """
+    if config is None:
+        config = load_config()
+    checkpoint = start_run(", ".join(models), datasets, run_type="matrix", extra={"models": models})
+    return _run_matrix(checkpoint, models, datasets, config, cache_policy, concurrency, on_result, cancel, progress)
+
+
+def resume_run(run_id, config=None, cache_policy=None, concurrency=None, on_result=None,
+               cancel=None, progress=None):
+    """
+    Setzt einen unterbrochenen ("partial") Run fort. Bereits gespeicherte Items
+    werden übersprungen, die Summary umfasst danach alle Items des Runs.
+    Stichproben-Runs (auch abgeschlossene) werden dabei zum vollständigen Run;
+    ihre Schätzung bleibt unter `sampling.result` erhalten.
+    `on_result` hat dieselbe Signatur wie bei run_matrix: (model, ds_name, result).
+    """
+    if config is None:
+        config = load_config()
+    stored = load_run(run_id)
+    if stored is not None and stored.get("run_type") == "probe":
+        raise ValueError(f"Probe-Run {run_id} kann nicht fortgesetzt werden, bitte neu messen")
+    is_sample = stored is not None and stored.get("run_type") == "sample"
+    checkpoint = reopen_run(run_id, allow_complete=is_sample)
+    run = checkpoint.run
+    if is_sample:
+        run["sampling"]["result"] = {key: run.pop(key, None) for key in SAMPLE_RESULT_KEYS}
+        run["run_type"] = "single"
+    if run.get("run_type") == "matrix":
+        return _run_matrix(checkpoint, run["models"], run["datasets"], config, cache_policy, concurrency, on_result,
+                           cancel, progress)
+
+    model = run["model"]
+    forward = (lambda ds_name, result: on_result(model, ds_name, result)) if on_result else None
+    return _run_suite(checkpoint, model, run["datasets"], config, cache_policy, concurrency, forward, cancel, progress)
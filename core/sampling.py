@@ -0,0 +1,279 @@
+"""
+Stichproben-Runs: statt aller Items nur so viele, bis der gewichtete Score
+genau genug geschätzt ist.
+
+Die Items werden nach `category` geschichtet und proportional zur Größe
+jeder Schicht zufällig gezogen (fester Seed, im Run gespeichert). Geschätzt
+wird der gewichtete Score der ganzen Suite: pro Schicht das nach `weight`
+gewichtete Mittel, die Schichten nach ihrem Anteil am Gesamtgewicht. Der Run
+endet, sobald das Konfidenzintervall schmaler als `ci_width` Punkte ist, ein
+Zeit- oder Token-Budget aufgebraucht ist oder alle Items gelaufen sind.
+
+Gespeichert wird ein Run mit run_type "sample": Schätzwert, Intervall und
+Stichprobengröße stehen in `estimate`, `ci_low`/`ci_high` und `sample_size`.
+Fortsetzen (runner.resume_run) macht daraus einen vollständigen Run, der
+nur die noch fehlenden Items ausführt.
+"""
+import random
+import threading
+import time
+from collections import deque
+from statistics import NormalDist
+
+from core.datasets import item_weight, iter_items
+from core.executor import BenchmarkExecutor, create_adapter
+from core.history_manager import start_run
+from core.profiling import timed_iter
+from core.progress import RunCancelled
+from core.runner import _checkpointed, load_config
+from core.tokens import get_counter
+
+RUN_TYPE = "sample"
+DEFAULT_CI_WIDTH = 10.0        # Intervallbreite in Score-Punkten (±5)
+DEFAULT_CONFIDENCE = 0.95
+MIN_PER_STRATUM = 2            # vorher ist die Streuung einer Schicht nicht schätzbar
+MIN_SAMPLE = 20
+FIRST_ROUND = 32               # Items der ersten Ziehungsrunde, danach verdoppelnd ...
+MAX_ROUND = 1024               # ... bis höchstens so viele (so viele Items liegen gleichzeitig im Speicher)
+
+
+def build_strata(datasets):
+    """
+    Ein Durchlauf über die Datasets: Schicht (category) -> Liste von
+    (Dataset, Index, Gewicht). Die Items selbst bleiben auf der Platte.
+    Items mit Gewicht 0 zählen im gewichteten Score nicht und werden nicht
+    gezogen; negative Gewichte oder eine Suite ohne Gewicht sind ein ValueError.
+    """
+    strata = {}
+    for ds_name in datasets:
+        for index, item in enumerate(timed_iter("dataset.parse", iter_items(ds_name))):
+            weight = item_weight(item)
+            if weight < 0:
+                raise ValueError(f"{ds_name}, Item {index}: negatives Gewicht {weight}")
+            if weight > 0:
+                strata.setdefault(item.get("category", "Unbekannt"), []).append((ds_name, index, weight))
+    if not strata:
+        raise ValueError(f"Keine Items mit Gewicht > 0 in {', '.join(datasets) or '-'}, keine Stichprobe möglich")
+    return strata
+
+
+def draw_order(strata, seed):
+    """
+    Ziehungsreihenfolge über alle Items: jede Schicht zufällig gemischt, dann
+    immer aus der Schicht mit dem kleinsten bisher gezogenen Anteil. Jeder
+    Anfang der Folge ist so eine proportional geschichtete Stichprobe.
+    """
+    rng = random.Random(seed)
+    shuffled = {name: rng.sample(members, len(members)) for name, members in sorted(strata.items())}
+    taken = {name: 0 for name in shuffled}
+    order = []
+    remaining = sum(len(m) for m in shuffled.values())
+    while remaining:
+        name = min(
+            (n for n in shuffled if taken[n] < len(shuffled[n])),
+            key=lambda n: (taken[n] / len(shuffled[n]), -len(shuffled[n]), n)
+        )
+        ds_name, index, _ = shuffled[name][taken[name]]
+        order.append((ds_name, index))
+        taken[name] += 1
+        remaining -= 1
+    return order
+
+
+class StratifiedEstimate:
+    """
+    Gewichteter Score der Suite aus einer geschichteten Stichprobe. Pro Schicht
+    ein Verhältnisschätzer (Σ w·s / Σ w) mit Endlichkeitskorrektur; komplett
+    gezogene Schichten tragen keine Unsicherheit mehr bei. Pro Schicht stehen
+    nur laufende Summen im Speicher, ein neues Item kostet also O(1).
+    """
+
+    def __init__(self, strata, confidence=DEFAULT_CONFIDENCE):
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        total_weight = sum(w for members in strata.values() for _, _, w in members) or 1
+        self._stratum_of = {}
+        self._population = {}
+        self._share = {}
+        for name, members in strata.items():
+            self._population[name] = len(members)
+            self._share[name] = sum(w for _, _, w in members) / total_weight
+            for ds_name, index, weight in members:
+                self._stratum_of[(ds_name, index)] = (name, weight)
+        # n, Σw, Σws, Σw², Σw²s, Σw²s² je Schicht
+        self._sums = {name: [0, 0.0, 0.0, 0.0, 0.0, 0.0] for name in strata}
+        self.size = 0
+
+    @property
+    def population(self):
+        return sum(self._population.values())
+
+    def add(self, ds_name, index, score):
+        name, weight = self._stratum_of[(ds_name, index)]
+        sums = self._sums[name]
+        sums[0] += 1
+        sums[1] += weight
+        sums[2] += weight * score
+        sums[3] += weight ** 2
+        sums[4] += weight ** 2 * score
+        sums[5] += (weight * score) ** 2
+        self.size += 1
+
+    def _stratum(self, name):
+        """(gewichtetes Mittel, Varianz des Mittels) einer Schicht."""
+        n, w, ws, w2, w2s, w2s2 = self._sums[name]
+        population = self._population[name]
+        mean = ws / w
+        if n >= population:
+            return mean, 0.0
+        if n < 2:
+            return mean, None
+        mean_weight = w / n
+        # Σ (w·(s - mean))², ausmultipliziert über die laufenden Summen
+        residuals = max(w2s2 - 2 * mean * w2s + mean ** 2 * w2, 0.0) / (n - 1)
+        return mean, (1 - n / population) * residuals / (n * mean_weight ** 2)
+
+    def result(self):
+        """estimate, ci_low, ci_high (Score-Punkte) oder None, solange eine Schicht zu wenig Items hat."""
+        estimate = variance = 0.0
+        for name, sums in self._sums.items():
+            if sums[0] < min(MIN_PER_STRATUM, self._population[name]):
+                return None
+            mean, var = self._stratum(name)
+            if var is None:
+                return None
+            estimate += self._share[name] * mean
+            variance += self._share[name] ** 2 * var
+        half = self.z * variance ** 0.5
+        return {
+            "estimate": round(estimate, 2),
+            "ci_low": round(max(estimate - half, 0.0), 2),
+            "ci_high": round(min(estimate + half, 100.0), 2),
+        }
+
+
+class _Either:
+    """Gesetzt, sobald eines der Events gesetzt ist (der Executor fragt nur is_set)."""
+
+    def __init__(self, *events):
+        self.events = [e for e in events if e is not None]
+
+    def is_set(self):
+        return any(e.is_set() for e in self.events)
+
+
+def _fetch(order):
+    """
+    Items zu (Dataset, Index) in Ziehungsreihenfolge. Pro Dataset und Runde
+    wird nur bis zum höchsten gezogenen Index gelesen.
+    """
+    wanted = {}
+    for position, (ds_name, index) in enumerate(order):
+        wanted.setdefault(ds_name, {})[index] = position
+    items = [None] * len(order)
+    for ds_name, indices in wanted.items():
+        last = max(indices)
+        for index, item in enumerate(timed_iter("dataset.parse", iter_items(ds_name))):
+            if index in indices:
+                items[indices[index]] = item
+            if index >= last:
+                break
+    return items
+
+
+def run_sample(model, datasets, config=None, cache_policy=None, concurrency=None, ci_width=None,
+               confidence=None, max_seconds=None, max_tokens=None, seed=None, on_result=None,
+               on_estimate=None, cancel=None, progress=None):
+    """
+    Stichproben-Run eines Modells (Defaults aus dem Abschnitt `sampling` der
+    config.yaml). `on_estimate(state)` kommt nach jedem Item, sobald es eine
+    Schätzung gibt; `on_result(ds_name, result)` wie bei run_suite.
+    Nach `cancel.set()` endet der Run als "partial". Eine Suite ohne Items
+    mit Gewicht > 0 ist ein ValueError, bevor ein Run angelegt wird.
+    """
+    if config is None:
+        config = load_config()
+    defaults = config.get_sampling_settings() if config else {}
+    settings = {
+        "ci_width": float(ci_width or defaults.get("ci_width", DEFAULT_CI_WIDTH)),
+        "confidence": float(confidence or defaults.get("confidence", DEFAULT_CONFIDENCE)),
+        "max_seconds": max_seconds or defaults.get("max_seconds"),
+        "max_tokens": max_tokens or defaults.get("max_tokens"),
+        "seed": seed if seed is not None else defaults.get("seed", random.randrange(1 << 31)),
+    }
+    if concurrency is None:
+        concurrency = config.get_concurrency(model) if config else 1
+
+    strata = build_strata(datasets)
+    checkpoint = start_run(model, datasets, run_type=RUN_TYPE, extra={
+        "sampling": settings, "population": sum(len(m) for m in strata.values()),
+        "strata": {name: len(members) for name, members in strata.items()},
+    })
+    estimator = StratifiedEstimate(strata, settings["confidence"])
+    order = draw_order(strata, settings["seed"])
+
+    adapter = create_adapter(model, config, cache_policy, concurrency)
+    executor = BenchmarkExecutor(adapter, concurrency=concurrency, token_counter=get_counter(model, config))
+    on_start = progress.item_started if progress else None
+    enough = threading.Event()
+
+    def stop_reason(started, tokens):
+        state = estimator.result()
+        if state is not None:
+            checkpoint.run.update(state, sample_size=estimator.size)
+            if on_estimate:
+                on_estimate({**state, "sample_size": estimator.size, "population": estimator.population})
+            if estimator.size >= MIN_SAMPLE and state["ci_high"] - state["ci_low"] <= settings["ci_width"]:
+                return "ci"
+        if settings["max_seconds"] and time.perf_counter() - started >= settings["max_seconds"]:
+            return "time"
+        if settings["max_tokens"] and tokens >= settings["max_tokens"]:
+            return "tokens"
+        return None
+
+    def work():
+        started = time.perf_counter()
+        tokens = 0
+        drawn = 0
+        round_size = FIRST_ROUND
+        # Optionen pro Dataset wie in execute_suite
+        options = {ds_name: config.get_dataset_options(ds_name) if config else {} for ds_name in datasets}
+        while drawn < len(order) and not enough.is_set():
+            batch = order[drawn:drawn + round_size]
+            drawn += len(batch)
+            round_size = min(round_size * 2, MAX_ROUND)
+            fetched = list(zip(batch, _fetch(batch)))
+            # Die ganze Runde als ein Strom in Ziehungsreihenfolge, Optionen je nach Dataset des Items
+            dataset_of = {id(item): ds_name for (ds_name, _), item in fetched}
+            positions = deque()
+
+            def pending_items(fetched=fetched, positions=positions):
+                for position, item in fetched:
+                    positions.append(position)
+                    yield item
+
+            results = executor.iter_results(
+                pending_items(), cancel=_Either(enough, cancel), on_start=on_start,
+                options_for=lambda item, dataset_of=dataset_of: options[dataset_of[id(item)]]
+            )
+            for result in results:
+                ds_name, result["item_index"] = positions.popleft()
+                result["dataset"] = ds_name
+                checkpoint.add(result)
+                estimator.add(ds_name, result["item_index"], result["score"])
+                metrics = result["metrics"]
+                tokens += metrics.get("token_count", 0) + metrics.get("prompt_tokens", 0)
+                if progress:
+                    progress.item_finished(result)
+                if on_result:
+                    on_result(ds_name, result)
+                reason = stop_reason(started, tokens)
+                if reason and not enough.is_set():
+                    checkpoint.run["stop_reason"] = reason
+                    enough.set()
+            if cancel is not None and cancel.is_set():
+                raise RunCancelled()
+        checkpoint.run.setdefault("stop_reason", "exhausted")
+        checkpoint.run.update(estimator.result() or {}, sample_size=estimator.size)
+        return None
+
+    return _checkpointed(checkpoint, work, config)
@@ -0,0 +1,33 @@
+def base_name(name):
+    """'llama3:latest' und 'llama3' bezeichnen dasselbe Modell."""
+    return name[:-len(":latest")] if name.endswith(":latest") else name
+
+
+def plan_waves(models, loaded=(), sizes=None, memory_budget=None):
+    """
+    Teilt die Modelle einer Matrix in Wellen auf. Modelle einer Welle laufen
+    gleichzeitig, zwischen den Wellen wird entladen.
+    - Bereits geladene Modelle kommen zuerst (kein Ladevorgang nötig).
+    - Mit Speicherbudget (Bytes) und bekannten Größen werden Modelle
+      zusammengelegt, solange sie gemeinsam in den Speicher passen.
+    - Ohne Budget oder Größen: ein Modell pro Welle.
+    """
+    loaded = {base_name(m) for m in loaded}
+    sizes = {base_name(k): v for k, v in (sizes or {}).items()}
+    ordered = [m for m in models if base_name(m) in loaded] + [m for m in models if base_name(m) not in loaded]
+
+    if not memory_budget or any(base_name(m) not in sizes for m in ordered):
+        return [[m] for m in ordered]
+
+    waves = []
+    current, used = [], 0
+    for model in ordered:
+        size = sizes[base_name(model)]
+        if current and used + size > memory_budget:
+            waves.append(current)
+            current, used = [], 0
+        current.append(model)
+        used += size
+    if current:
+        waves.append(current)
+    return waves
\ No newline at end of file
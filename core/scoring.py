@@ -1,4 +1,81 @@
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+# Ab dieser Batch-Größe lohnt sich ein Prozess-Pool (Start-Overhead der Worker)
+PARALLEL_THRESHOLD = 20000
+
+
+class KeywordMatcher:
+    """
+    Vorkompilierte Keyword-Liste eines Items.
+    Kandidaten werden per str.find (C-Geschwindigkeit) gesucht und nur an
+    Fundstellen mit dem kompilierten Wortgrenzen-Muster bestätigt. Das ist
+    exakt äquivalent zu re.search(rf"\b{kw}\b", ...), aber ohne Regex-Scan
+    über den ganzen Text.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        # Doppelte Keywords (auch in anderer Schreibweise) nur einmal suchen
+        self.unique = list(dict.fromkeys(kw.lower() for kw in self.keywords))
+        self.patterns = [re.compile(rf"\b{re.escape(kw)}\b") for kw in self.unique]
+
+    def _contains(self, clean_response, kw, pattern):
+        pos = clean_response.find(kw)
+        while pos != -1:
+            # match() mit pos sieht das Zeichen davor, \b wird also korrekt geprüft
+            if pattern.match(clean_response, pos):
+                return True
+            pos = clean_response.find(kw, pos + 1)
+        return False
+
+    def find(self, clean_response):
+        """Menge der gefundenen (kleingeschriebenen) Keywords."""
+        return {
+            kw for kw, pattern in zip(self.unique, self.patterns)
+            if self._contains(clean_response, kw, pattern)
+        }
+
+
+class KeywordStream:
+    """
+    Keyword-Suche über eine gestreamte Antwort (frühes Stoppen): jeder Chunk
+    wird nur zusammen mit einem Rest der vorigen Chunks (längstes Keyword plus
+    ein Zeichen) durchsucht, bereits gefundene Keywords nicht mehr. Ein Treffer
+    zählt erst, wenn das Zeichen dahinter da ist, denn vorher steht die
+    Wortgrenze nicht fest ("foo" ist in "foob" kein Treffer).
+    """
+
+    def __init__(self, keywords):
+        matcher = compile_keywords(tuple(keywords))
+        self.missing = dict(zip(matcher.unique, matcher.patterns))
+        self._keep = max((len(kw) for kw in matcher.unique), default=0) + 1
+        self._tail = ""
+
+    def feed(self, piece):
+        """Nimmt den nächsten Chunk auf; True, sobald alle Keywords gefunden sind."""
+        text = self._tail + piece
+        window = text.lower()
+        # Neu bestätigbar sind nur Treffer, die hinter dem alten Rest enden
+        new_from = len(self._tail.lower())
+        for kw, pattern in list(self.missing.items()):
+            pos = window.find(kw, max(new_from - len(kw), 0))
+            while pos != -1 and pos + len(kw) < len(window):
+                if pattern.match(window, pos):
+                    del self.missing[kw]
+                    break
+                pos = window.find(kw, pos + 1)
+        self._tail = text[-self._keep:]
+        return not self.missing
+
+
+@lru_cache(maxsize=4096)
+def compile_keywords(keywords: tuple) -> KeywordMatcher:
+    """Kompiliert eine Keyword-Liste einmal und cached sie pro Keyword-Set."""
+    return KeywordMatcher(keywords)
+
 
 def score_response(response: str, expected_keywords: list) -> dict:
     """
@@ -14,7 +91,7 @@ def score_response(response: str, expected_keywords: list) -> dict:
             "status": "No response provided"
         }
 
-    # Falls keine Keywords definiert sind, betrachten wir die Antwort als 100% 
+    # Falls keine Keywords definiert sind, betrachten wir die Antwort als 100%
     # (oder man könnte 0 setzen, je nach Test-Philosophie)
     if not expected_keywords:
         return {
@@ -24,15 +101,16 @@ def score_response(response: str, expected_keywords: list) -> dict:
             "status": "No keywords to evaluate"
         }
 
+    matcher = compile_keywords(tuple(expected_keywords))
+
+    # Normalisierung für fairen Vergleich (Lowercase und Wortgrenzen beachten).
+    # Bewusst lower() statt re.IGNORECASE: nur so bleiben Sonderfälle wie 'ß' identisch.
+    found = matcher.find(response.lower())
+
     matches = []
     missing = []
-    
-    # Normalisierung für fairen Vergleich (Lowercase und Wortgrenzen beachten)
-    clean_response = response.lower()
-    
     for kw in expected_keywords:
-        # Wir suchen mit RegEx nach dem Wort, um Teil-Treffer (wie 'Baum' in 'Baumhaus') zu finden
-        if re.search(rf"\b{re.escape(kw.lower())}\b", clean_response):
+        if kw.lower() in found:
             matches.append(kw)
         else:
             missing.append(kw)
@@ -40,7 +118,7 @@ def score_response(response: str, expected_keywords: list) -> dict:
     # Score-Berechnung (Prozentualer Anteil der gefundenen Wörter)
     match_count = len(matches)
     total_count = len(expected_keywords)
-    
+
     # Sicherstellen, dass das Ergebnis ein Integer zwischen 0 und 100 ist
     final_score = int((match_count / total_count) * 100) if total_count > 0 else 0
 
@@ -49,4 +127,29 @@ def score_response(response: str, expected_keywords: list) -> dict:
         "matches": matches,
         "missing": missing,
         "status": f"Found {match_count} of {total_count} keywords"
-    }
\ No newline at end of file
+    }
+
+
+def _score_chunk(pairs):
+    return [score_response(response, keywords) for response, keywords in pairs]
+
+
+def score_batch(responses, keyword_sets, workers=None) -> list:
+    """
+    Bewertet viele Antworten auf einmal (z.B. Re-Scoring einer ganzen Historie).
+    Große Batches laufen über einen Prozess-Pool; workers=1 erzwingt seriell.
+    Ergebnis-Reihenfolge entspricht der Eingabe.
+    """
+    pairs = list(zip(responses, keyword_sets))
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(pairs) >= PARALLEL_THRESHOLD else 1
+    if workers <= 1 or len(pairs) < 2:
+        return _score_chunk(pairs)
+
+    chunk_size = max(1, len(pairs) // (workers * 4))
+    chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_result in pool.map(_score_chunk, chunks):
+            results.extend(chunk_result)
+    return results
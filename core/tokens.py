@@ -0,0 +1,218 @@
+"""
+Token-Zählung für Prompts und Antworten, wenn der Server selbst keine liefert.
+
+Gezählt wird mit einem lokalen Tokenizer pro Modellfamilie (tiktoken-Encoding,
+siehe `tokenizer` in der config.yaml). Ist tiktoken nicht installiert oder das
+Encoding nicht rechtzeitig ladbar (tiktoken lädt es beim ersten Mal aus dem
+Netz; das passiert in einem eigenen Thread, nie im Run), greift eine
+Heuristik. Jede Zahl trägt ihre Herkunft: "server-reported" oder
+"estimated", lokal gezählte zusätzlich den Tokenizer ("heuristic" bei der Schätzung).
+
+Prompts werden nur gezählt, wenn der Server ihre Länge nicht meldet (Ollama
+meldet sie bei jeder vollständigen Antwort). Die Zählungen werden pro Inhalt
+(SHA-256 über Encoding und Text) in SQLite gecacht, so dass wiederholte Runs
+über dieselben Datasets nichts neu tokenisieren.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+
+from core.profiling import span
+
+try:
+    import tiktoken
+except ImportError:  # optional: ohne tiktoken nur Heuristik
+    tiktoken = None
+
+SERVER_REPORTED = "server-reported"
+ESTIMATED = "estimated"
+
+DEFAULT_ENCODING = "cl100k_base"
+HEURISTIC = "heuristic"
+TOKEN_CACHE_FILE = "config/token_cache.db"
+# So lange wartet ein Zähler höchstens auf das Laden seines Encodings
+LOAD_WAIT = 2.0
+
+_PIECE_RE = re.compile(r"\d+|\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """
+    Grobe Schätzung ohne Tokenizer, angelehnt an BPE: Satzzeichen je ein Token,
+    Zahlen in Dreiergruppen, Wörter ein Token plus eins je weitere sechs Zeichen
+    (lange Komposita und Bezeichner zerfallen in mehrere Tokens).
+    """
+    count = 0
+    for piece in _PIECE_RE.findall(text or ""):
+        if piece.isdigit():
+            count += (len(piece) + 2) // 3
+        else:
+            count += 1 + (len(piece) - 1) // 6
+    return count
+
+
+_encodings = {}
+# Encoding-Name -> Event, gesetzt sobald sein Lade-Thread fertig ist
+_loaders = {}
+# Schützt nur die beiden Dicts; geladen wird ohne diesen Lock
+_encodings_lock = threading.Lock()
+
+
+def _load_in_background(name, done):
+    try:
+        encoding = tiktoken.get_encoding(name)
+    except Exception:
+        encoding = None
+    with _encodings_lock:
+        _encodings[name] = encoding
+    done.set()
+
+
+def _load_encoding(name, wait=None):
+    """
+    tiktoken-Encoding oder None. Jedes Encoding lädt einmal in einem eigenen
+    Thread (ein möglicher Download blockiert also weder andere Encodings noch
+    den Run); gewartet wird höchstens `wait` Sekunden (Default LOAD_WAIT). Auch ein Fehlschlag
+    wird gemerkt (kein erneuter Download-Versuch).
+    """
+    if name == HEURISTIC or tiktoken is None:
+        return None
+    with _encodings_lock:
+        if name in _encodings:
+            return _encodings[name]
+        done = _loaders.get(name)
+        if done is None:
+            done = _loaders[name] = threading.Event()
+            threading.Thread(target=_load_in_background, args=(name, done), daemon=True).start()
+    done.wait(LOAD_WAIT if wait is None else wait)
+    with _encodings_lock:
+        return _encodings.get(name)
+
+
+class TokenCache:
+    """Persistente Prompt-Zählungen (SQLite): Inhalts-Hash -> Anzahl Tokens."""
+
+    def __init__(self, path=TOKEN_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS prompt_tokens (key TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+        self._conn.commit()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            # SQLite erlaubt nur begrenzt viele Parameter pro Abfrage
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, count FROM prompt_tokens WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                )
+                found.update(rows)
+        return found
+
+    def put_many(self, counts):
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO prompt_tokens VALUES (?, ?)", counts.items())
+            self._conn.commit()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_token_cache(path=TOKEN_CACHE_FILE) -> TokenCache:
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = TokenCache(path)
+        return _caches[path]
+
+
+class TokenCounter:
+    """
+    Zählt Tokens mit einem Encoding; `name` ist "heuristic", wenn es nicht
+    verfügbar ist. Das Encoding wird beim ersten Zählen einmal aufgelöst und
+    gilt dann für die ganze Lebensdauer des Zählers (einen Run): lädt es erst
+    später fertig, zählt erst der nächste Run damit.
+    """
+
+    def __init__(self, encoding_name=DEFAULT_ENCODING, workers=4, cache_path=TOKEN_CACHE_FILE):
+        self.encoding_name = encoding_name
+        self.workers = max(1, int(workers))
+        self.cache_path = cache_path
+        self._resolved = False
+        self._encoding = None
+        self._resolve_lock = threading.Lock()
+
+    @property
+    def encoding(self):
+        if not self._resolved:
+            with self._resolve_lock:
+                if not self._resolved:
+                    self._encoding = _load_encoding(self.encoding_name)
+                    self._resolved = True
+        return self._encoding
+
+    @property
+    def name(self):
+        return self.encoding_name if self.encoding is not None else HEURISTIC
+
+    def count(self, text):
+        encoding = self.encoding
+        if encoding is None:
+            return estimate_tokens(text)
+        return len(encoding.encode_ordinary(text or ""))
+
+    def count_batch(self, texts):
+        encoding = self.encoding
+        if encoding is None:
+            return [estimate_tokens(t) for t in texts]
+        # tiktoken verteilt den Batch auf einen Thread-Pool (gibt dabei den GIL frei)
+        return [len(tokens) for tokens in encoding.encode_ordinary_batch(list(texts), num_threads=self.workers)]
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self.name}\0{text}".encode("utf-8")).hexdigest()
+
+    def prompt_count(self, prompt):
+        """Tokens eines Prompts (gecacht pro Inhalt)."""
+        return self.prompt_counts([prompt])[0]
+
+    def prompt_counts(self, prompts):
+        """Tokens pro Prompt; bekannte Inhalte aus dem Cache, der Rest in einem Batch."""
+        with span("tokens.prompt", prompts=len(prompts)):
+            return self._prompt_counts(prompts)
+
+    def _prompt_counts(self, prompts):
+        keys = [self._key(p) for p in prompts]
+        cache = get_token_cache(self.cache_path)
+        known = cache.get_many(keys)
+        missing = {key: prompt for key, prompt in zip(keys, prompts) if key not in known}
+        if missing:
+            counted = dict(zip(missing, self.count_batch(missing.values())))
+            cache.put_many(counted)
+            known.update(counted)
+        return [known[key] for key in keys]
+
+
+def family_encoding(model, settings=None):
+    """Encoding für ein Modell: längster passender Familien-Präfix aus tokenizer.families, sonst Default."""
+    settings = settings or {}
+    families = settings.get("families") or {}
+    name = (model or "").lower()
+    matches = [prefix for prefix in families if name.startswith(prefix.lower())]
+    if matches:
+        return families[max(matches, key=len)]
+    return settings.get("default", DEFAULT_ENCODING)
+
+
+def get_counter(model, config=None) -> TokenCounter:
+    settings = config.get_tokenizer_settings() if config else {}
+    return TokenCounter(
+        family_encoding(model, settings),
+        workers=settings.get("workers", 4),
+        cache_path=settings.get("cache_path", TOKEN_CACHE_FILE),
+    )
@@ -0,0 +1,428 @@
+"""
+Lokaler Ollama-Ersatz für Last- und Durchsatztests des Harness ohne GPU.
+
+    python -m devtools.fake_ollama --port 11500 --model llama3 --tps normal:40,5 --max-concurrency 2
+
+Bedient /api/chat (mit und ohne Streaming), /api/tags, /api/ps und das
+Entladen über /api/generate (keep_alive 0). In der config.yaml reicht dann
+`providers.ollama.host: "http://127.0.0.1:11500"`.
+
+Latenzen werden als Verteilung angegeben:
+    0.05 | const:0.05 | uniform:0.02,0.1 | normal:0.1,0.02 | lognormal:mu,sigma | exp:0.1
+
+Antworten sind pro Prompt deterministisch: aus --responses (JSON-Objekt
+Prompt -> Antwort), aus --datasets (Antwort enthält die expected_keywords,
+ergibt also 100 %) oder als Füllwörter, abgeleitet aus dem Prompt-Hash.
+GET /fake/stats liefert Zähler (Requests, Fehler, maximale Parallelität).
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FILLER_WORDS = (
+    "die", "Antwort", "ist", "eine", "Testausgabe", "des", "Servers", "mit", "festen",
+    "Wörtern", "für", "reproduzierbare", "Messungen", "ohne", "echtes", "Modell", "und", "GPU",
+)
+
+
+def parse_distribution(spec):
+    """'normal:0.1,0.02' -> Funktion rng -> Sekunden (nie negativ)."""
+    spec = str(spec).strip()
+    kind, _, args = spec.partition(":")
+    if not args:
+        kind, args = "const", spec
+    try:
+        values = [float(v) for v in args.split(",")]
+        if kind == "const":
+            (value,) = values
+            sample = lambda rng: value
+        elif kind == "uniform":
+            low, high = values
+            sample = lambda rng: rng.uniform(low, high)
+        elif kind == "normal":
+            mu, sigma = values
+            sample = lambda rng: rng.gauss(mu, sigma)
+        elif kind == "lognormal":
+            mu, sigma = values
+            sample = lambda rng: rng.lognormvariate(mu, sigma)
+        elif kind == "exp":
+            (mean,) = values
+            sample = lambda rng: rng.expovariate(1 / mean) if mean > 0 else 0.0
+        else:
+            raise ValueError(kind)
+    except ValueError:
+        raise ValueError(f"Ungültige Verteilung: {spec!r}") from None
+    return lambda rng: max(sample(rng), 0.0)
+
+
+def _keyword_answers(dataset_dir):
+    """Prompt -> Antwort mit allen expected_keywords aus den Datasets."""
+    from core.datasets import iter_items, list_datasets
+
+    answers = {}
+    for ds_name in list_datasets(dataset_dir):
+        for item in iter_items(ds_name, dataset_dir):
+            keywords = item.get("expected_keywords") or []
+            answers[item["prompt"]] = "Antwort: " + ", ".join(keywords) + "."
+    return answers
+
+
+class FakeOllama:
+    """
+    Simulierter Ollama-Server. Alle Zeiten sind Sekunden; `latency` ist die
+    Zeit bis zum ersten Token (Prompt-Verarbeitung), `tps` die
+    Generierungsgeschwindigkeit, beides als Verteilung (siehe parse_distribution).
+    """
+
+    def __init__(self, models=("fake-model",), responses=None, latency="0.02", tps="200", tokens=64,
+                 load_time=0.0, max_concurrency=None, reject_over_limit=False, error_rate=0.0,
+                 error_status=503, retry_after=None, timeout_rate=0.0, hang_time=300.0, seed=0):
+        self.models = list(models)
+        self.responses = dict(responses or {})
+        self.latency = parse_distribution(latency)
+        self.tps = parse_distribution(tps)
+        self.tokens = tokens
+        self.load_time = load_time
+        self.reject_over_limit = reject_over_limit
+        self.error_rate = error_rate
+        self.error_status = error_status
+        # Retry-After-Header (Sekunden) bei injizierten Fehlern und 503 über dem Limit
+        self.retry_after = retry_after
+        self.timeout_rate = timeout_rate
+        self.hang_time = hang_time
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._loaded = set()
+        self._stats = {
+            "requests": 0, "chat_requests": 0, "errors": 0, "timeouts": 0, "rejected": 0,
+            "in_flight": 0, "max_in_flight": 0, "waiting": 0, "max_waiting": 0,
+        }
+        self._server = None
+        self._thread = None
+
+    # --- Zustand ---
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "loaded": sorted(self._loaded)}
+
+    def _count(self, key, delta=1):
+        with self._lock:
+            self._stats[key] += delta
+            peak = "max_" + key
+            if peak in self._stats:
+                self._stats[peak] = max(self._stats[peak], self._stats[key])
+
+    def _draw(self):
+        """Zufallswerte eines Requests unter Lock (reproduzierbar pro Seed und Reihenfolge)."""
+        with self._lock:
+            roll = self._rng.random()
+            return {
+                "error": roll < self.error_rate,
+                "timeout": self.error_rate <= roll < self.error_rate + self.timeout_rate,
+                "latency": self.latency(self._rng),
+                "tps": max(self.tps(self._rng), 1e-3),
+            }
+
+    def _has_model(self, name):
+        return name in self.models or (":" not in name and f"{name}:latest" in self.models)
+
+    def answer(self, prompt, max_tokens=None):
+        """Deterministische Antwort als Token-Liste (ein Token = ein Wort plus Leerzeichen)."""
+        if prompt in self.responses:
+            words = self.responses[prompt].split()
+        else:
+            seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16], 16)
+            rng = random.Random(seed)
+            words = [rng.choice(FILLER_WORDS) for _ in range(self.tokens)]
+        tokens = [w + " " for w in words[:-1]] + words[-1:]
+        if max_tokens:
+            return tokens[:max_tokens], len(tokens) > max_tokens
+        return tokens, False
+
+    # --- Endpunkte ---
+
+    def tags(self):
+        models = []
+        for name in self.models:
+            digest = hashlib.sha256(name.encode("utf-8")).hexdigest()
+            models.append({"name": name, "model": name, "digest": digest, "size": 4 * 1024 ** 3})
+        return {"models": models}
+
+    def ps(self):
+        with self._lock:
+            loaded = sorted(self._loaded)
+        return {"models": [m for m in self.tags()["models"] if m["name"] in loaded]}
+
+    def unload(self, name):
+        with self._lock:
+            self._loaded.discard(name)
+
+    def _load(self, name):
+        """Erster Request nach dem (Ent-)Laden zahlt die Ladezeit."""
+        with self._lock:
+            if name in self._loaded:
+                return 0.0
+            self._loaded.add(name)
+        return self.load_time
+
+    def _acquire_slot(self):
+        if self._slots is None:
+            return True
+        if self.reject_over_limit:
+            return self._slots.acquire(blocking=False)
+        self._count("waiting")
+        try:
+            self._slots.acquire()
+        finally:
+            self._count("waiting", -1)
+        return True
+
+    def _retry_headers(self):
+        return {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+
+    def handle_chat(self, handler, body):
+        model = body.get("model", "")
+        if not self._has_model(model):
+            return handler.send_json(404, {"error": f"model '{model}' not found"})
+
+        draw = self._draw()
+        if draw["error"]:
+            self._count("errors")
+            return handler.send_json(self.error_status, {"error": "injected failure"}, self._retry_headers())
+        if draw["timeout"]:
+            # Verbindung offen halten, bis der Client per read_timeout aufgibt
+            self._count("timeouts")
+            time.sleep(self.hang_time)
+            handler.close_connection = True
+            return None
+
+        if not self._acquire_slot():
+            self._count("rejected")
+            return handler.send_json(503, {"error": "server busy"}, self._retry_headers())
+        self._count("in_flight")
+        try:
+            return self._generate(handler, body, model, draw)
+        finally:
+            self._count("in_flight", -1)
+            if self._slots is not None:
+                self._slots.release()
+
+    def _generate(self, handler, body, model, draw):
+        started = time.perf_counter()
+        messages = body.get("messages") or [{}]
+        prompt = messages[-1].get("content", "")
+        max_tokens = (body.get("options") or {}).get("num_predict")
+        tokens, truncated = self.answer(prompt, max_tokens)
+
+        load_time = self._load(model)
+        time.sleep(load_time + draw["latency"])
+        token_delay = 1 / draw["tps"]
+
+        def timings(count):
+            total = time.perf_counter() - started
+            return {
+                "done": True,
+                "done_reason": "length" if truncated else "stop",
+                "total_duration": int(total * 1e9),
+                "load_duration": int(load_time * 1e9),
+                "prompt_eval_count": len(prompt.split()),
+                "prompt_eval_duration": int(draw["latency"] * 1e9),
+                "eval_count": count,
+                "eval_duration": max(int((total - load_time - draw["latency"]) * 1e9), 1),
+            }
+
+        base = {"model": model, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+        if not body.get("stream", True):
+            time.sleep(token_delay * len(tokens))
+            message = {"role": "assistant", "content": "".join(tokens)}
+            return handler.send_json(200, {**base, "message": message, **timings(len(tokens))})
+
+        handler.start_stream()
+        sent = 0
+        try:
+            for token in tokens:
+                time.sleep(token_delay)
+                handler.write_line({**base, "message": {"role": "assistant", "content": token}, "done": False})
+                sent += 1
+            handler.write_line({**base, "message": {"role": "assistant", "content": ""}, **timings(sent)})
+        except (BrokenPipeError, ConnectionResetError):
+            # Client hat abgebrochen (max_tokens, Deadline, Keywords): Generierung stoppt wie bei Ollama
+            handler.close_connection = True
+
+    # --- Server ---
+
+    def _make_server(self, host, port):
+        fake = self
+
+        class Handler(_Handler):
+            server_version = "FakeOllama/1.0"
+            backend = fake
+
+        return _Server((host, port), Handler)
+
+    def start(self, host="127.0.0.1", port=0):
+        """Startet den Server in einem Hintergrund-Thread und gibt die Basis-URL zurück."""
+        self._server = self._make_server(host, port)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def serve_forever(self, host="127.0.0.1", port=11434):
+        self._server = self._make_server(host, port)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Standard-Backlog ist 5: bei vielen gleichzeitigen Verbindungsaufbauten gingen
+    # SYNs verloren und der Client wartete eine Sekunde auf die Wiederholung
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # Abgebrochene Client-Verbindungen sind hier normal (Timeouts, Stream-Abbruch)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Header und Body gehen getrennt raus; ohne TCP_NODELAY bremst Nagle jede Antwort aus
+    disable_nagle_algorithm = True
+    backend = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def start_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._streaming = True
+
+    def write_line(self, payload):
+        data = (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw or b"{}")
+        except ValueError:
+            return None
+
+    def do_GET(self):
+        self.backend._count("requests")
+        if self.path == "/api/tags":
+            self.send_json(200, self.backend.tags())
+        elif self.path == "/api/ps":
+            self.send_json(200, self.backend.ps())
+        elif self.path == "/fake/stats":
+            self.send_json(200, self.backend.stats())
+        elif self.path in ("/", "/api/version"):
+            self.send_json(200, {"version": "0.0.0-fake"})
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        self.backend._count("requests")
+        body = self._read_body()
+        if body is None:
+            return self.send_json(400, {"error": "invalid JSON"})
+        self._streaming = False
+
+        if self.path == "/api/chat":
+            self.backend._count("chat_requests")
+            self.backend.handle_chat(self, body)
+            if self._streaming and not self.close_connection:
+                self.wfile.write(b"0\r\n\r\n")
+        elif self.path == "/api/generate" and body.get("keep_alive") in (0, "0", "0s"):
+            self.backend.unload(body.get("model", ""))
+            self.send_json(200, {"model": body.get("model", ""), "done": True, "done_reason": "unload"})
+        else:
+            self.send_json(404, {"error": "not found"})
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m devtools.fake_ollama", description="Lokaler Ollama-Ersatz für Lasttests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("-m", "--model", action="append", help="Angebotenes Modell (mehrfach möglich, Default: fake-model)")
+    parser.add_argument("--latency", default="0.02", help="Zeit bis zum ersten Token (Verteilung)")
+    parser.add_argument("--tps", default="200", help="Tokens pro Sekunde (Verteilung)")
+    parser.add_argument("--tokens", type=int, default=64, help="Länge der Füllwort-Antworten in Tokens")
+    parser.add_argument("--load-time", type=float, default=0.0, help="Ladezeit beim ersten Request pro Modell")
+    parser.add_argument("--max-concurrency", type=int, help="Parallel bearbeitete Requests (wie OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--reject-over-limit", action="store_true", help="Über dem Limit 503 statt Warteschlange")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Anteil Requests mit HTTP-Fehler")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=int, help="Retry-After-Header (Sekunden) bei Fehlern und Überlast")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Anteil Requests, die hängen bleiben")
+    parser.add_argument("--hang-time", type=float, default=300.0, help="Wie lange hängende Requests offen bleiben")
+    parser.add_argument("--responses", help="JSON-Datei: Prompt -> Antwort")
+    parser.add_argument("--datasets", help="Dataset-Ordner: Antworten enthalten die expected_keywords")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        parse_distribution(args.latency)
+        parse_distribution(args.tps)
+    except ValueError as e:
+        sys.stderr.write(f"{e}\n")
+        return 2
+
+    responses = {}
+    if args.datasets:
+        responses.update(_keyword_answers(args.datasets))
+    if args.responses:
+        with open(args.responses, "r", encoding="utf-8") as f:
+            responses.update(json.load(f))
+
+    fake = FakeOllama(
+        models=args.model or ["fake-model"], responses=responses, latency=args.latency, tps=args.tps,
+        tokens=args.tokens, load_time=args.load_time, max_concurrency=args.max_concurrency,
+        reject_over_limit=args.reject_over_limit, error_rate=args.error_rate, error_status=args.error_status,
+        retry_after=args.retry_after, timeout_rate=args.timeout_rate, hang_time=args.hang_time, seed=args.seed,
+    )
+    sys.stderr.write(f"Fake-Ollama auf http://{args.host}:{args.port} (Modelle: {', '.join(fake.models)})\n")
+    try:
+        fake.serve_forever(args.host, args.port)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
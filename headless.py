@@ -0,0 +1,268 @@
+"""
+Headless-Runner für Cron/CI, ohne Textual oder Rich.
+
+    python -m headless --model llama3 --dataset logic_tests.json --concurrency 4
+    python -m headless --resume 20260101_120000
+    python -m headless --model llama3 --probe --probe-max 16
+    python -m headless --model llama3 --sample --ci-width 6 --max-seconds 900
+    python -m headless --export runs.csv --model llama3 --since 2026-01-01
+
+Fortschritt wird als NDJSON ausgegeben (ein JSON-Objekt pro Zeile). Der
+Exit-Code ist 1, wenn ein Run unter app.default_threshold aus der
+config.yaml liegt, sonst 0. Kapazitätsmessungen (--probe) haben keine
+Schwelle und enden immer mit 0. Stichproben-Runs (--sample) messen die
+Schwelle am geschätzten gewichteten Score; --resume erweitert sie zum vollen Run.
+
+Mit --export startet kein Run: die Items gespeicherter Runs (--run, sonst
+alle zu --model/--dataset/--since/--until passenden) werden nach CSV, NDJSON
+oder Parquet geschrieben; --model und --dataset sind dann Teilstring-Filter.
+"""
+import argparse
+import json
+import sys
+import time
+
+from core.datasets import list_datasets, load_manifests
+from core.export import FORMATS, ExportError, export_items
+from core.response_cache import POLICIES
+from core.history_manager import STATUS_PARTIAL, STATUS_RUNNING, load_run
+from core.probe import DEFAULT_ITEMS_PER_LEVEL, DEFAULT_MAX_CONCURRENCY, run_probe
+from core.profiling import TRACE_FORMATS, configure as configure_profiling
+from core.runner import load_config, resume_run, run_matrix, run_suite
+from core.sampling import run_sample
+
+EXIT_OK = 0
+EXIT_BELOW_THRESHOLD = 1
+EXIT_USAGE = 2
+
+
+def emit(stream, event, **fields):
+    stream.write(json.dumps({"event": event, "ts": round(time.time(), 3), **fields}, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m headless", description="LLM Quality Evolution – Headless Runner")
+    parser.add_argument("-m", "--model", action="append", help="Modellname (mehrfach möglich)")
+    parser.add_argument("-d", "--dataset", action="append", help="Dataset-Datei (mehrfach möglich, Default: alle)")
+    parser.add_argument("-c", "--concurrency", type=int, help="Parallele Requests pro Modell (Default: config.yaml)")
+    parser.add_argument("--cache", choices=POLICIES, help="Cache-Policy für diesen Run (Default: config.yaml)")
+    parser.add_argument("--threshold", type=float, help="Mindest-Score (Default: app.default_threshold)")
+    parser.add_argument(
+        "-f", "--format", choices=("ndjson", "json", "text"), default="ndjson",
+        help="ndjson: Fortschritt + Ergebnis auf stdout; json/text: nur Ergebnis auf stdout, Fortschritt auf stderr"
+    )
+    parser.add_argument("--matrix", action="store_true", help="Alle Modelle als einen gruppierten Vergleichs-Run speichern")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Unterbrochenen Run fortsetzen (Modelle/Datasets aus dem Run)")
+    parser.add_argument("--probe", action="store_true", help="Kapazitätsmessung eines Modells statt Qualitäts-Run: Concurrency hochfahren bis zum Knick")
+    parser.add_argument("--probe-max", type=int, default=DEFAULT_MAX_CONCURRENCY, help="Höchste Concurrency-Stufe der Messung")
+    parser.add_argument("--probe-items", type=int, default=DEFAULT_ITEMS_PER_LEVEL, help="Mindestanzahl Items pro Stufe")
+    parser.add_argument("--sample", action="store_true", help="Stichprobe nach category statt aller Items, bis das Konfidenzintervall schmal genug ist")
+    parser.add_argument("--ci-width", type=float, help="Stichprobe: Ziel-Breite des Intervalls in Score-Punkten (Default: sampling.ci_width)")
+    parser.add_argument("--confidence", type=float, help="Stichprobe: Konfidenzniveau, z.B. 0.95 (Default: sampling.confidence)")
+    parser.add_argument("--max-seconds", type=float, help="Stichprobe: Zeit-Budget in Sekunden")
+    parser.add_argument("--max-tokens", type=int, help="Stichprobe: Token-Budget (Prompt + Antwort)")
+    parser.add_argument("--seed", type=int, help="Stichprobe: Zufalls-Seed für die Ziehung")
+    parser.add_argument("--export", metavar="PATH", help="Gespeicherte Items exportieren statt einen Run zu starten")
+    parser.add_argument("--export-format", choices=FORMATS, help="Export-Format (Default: aus der Dateiendung)")
+    parser.add_argument("--columns", help="Kommagetrennte Export-Spalten (Default: alle außer prompt/response)")
+    parser.add_argument("--run", action="append", metavar="RUN_ID", help="Nur diesen Run exportieren (mehrfach möglich)")
+    parser.add_argument("--since", help="Export: Runs ab diesem Datum (ISO)")
+    parser.add_argument("--until", help="Export: Runs bis einschließlich diesem Datum (ISO)")
+    parser.add_argument("--trace", action="store_true", help="Phasen-Spans jedes Runs als Trace-Datei speichern (app.profiling.trace_dir)")
+    parser.add_argument("--trace-format", choices=TRACE_FORMATS, help="Trace-Format (Default: app.profiling.trace_format)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Keine Fortschritts-Events")
+    return parser
+
+
+def _summary(run, threshold):
+    keys = ("id", "model", "datasets", "status", "avg_score", "avg_duration", "avg_tps", "item_count", "cache_hits", "total_retries")
+    summary = {k: run.get(k) for k in keys}
+    summary["harness_pct"] = run.get("profile", {}).get("harness_pct")
+    if run.get("trace_file"):
+        summary["trace_file"] = run["trace_file"]
+    summary["passed"] = run["avg_score"] >= threshold
+    if run.get("run_type") == "sample":
+        summary.update({k: run.get(k) for k in ("estimate", "ci_low", "ci_high", "sample_size", "population", "stop_reason")})
+        summary["passed"] = run.get("estimate") is not None and run["estimate"] >= threshold
+    if run.get("run_type") == "matrix":
+        # Ein Matrix-Run besteht nur, wenn jedes Modell die Schwelle erreicht
+        summary["model_summaries"] = run["model_summaries"]
+        summary["passed"] = all(s["avg_score"] >= threshold for s in run["model_summaries"].values())
+    return summary
+
+
+def _probe(args, config, datasets, progress):
+    """Kapazitätsmessung eines Modells; jede Stufe wird als Event gemeldet."""
+    model = args.model[0]
+    if progress:
+        emit(progress, "probe_started", model=model, datasets=datasets, max_concurrency=args.probe_max)
+
+    def on_level(stats):
+        if progress:
+            emit(progress, "probe_level", model=model, **stats)
+
+    run = run_probe(model, datasets, config=config, max_concurrency=args.probe_max,
+                    items_per_level=args.probe_items, on_level=on_level)
+    summary = {k: run.get(k) for k in ("id", "model", "status", "knee", "stop_reason", "levels")}
+    if args.format == "ndjson":
+        emit(sys.stdout, "probe_finished", **summary)
+    elif args.format == "json":
+        print(json.dumps({"probes": [summary]}, ensure_ascii=False, indent=2))
+    elif args.format == "text":
+        print(f"{summary['model']:<24} Knick bei Concurrency {summary['knee']}  Run {summary['id']}")
+        for level in summary["levels"]:
+            print(f"  {level['concurrency']:>4}  {level['items_per_s']:>8.2f} Items/s  p95 {level['duration_p95']}s")
+    return EXIT_OK
+
+
+def _export(args, progress):
+    """Streamt die Items gespeicherter Runs in eine Datei; Fortschritt als Events."""
+    if len(args.model or []) > 1 or len(args.dataset or []) > 1:
+        sys.stderr.write("Beim Export sind --model und --dataset einfache Filter (je höchstens einmal)\n")
+        return EXIT_USAGE
+    filters = {
+        "model": (args.model or [None])[0], "dataset": (args.dataset or [None])[0],
+        "since": args.since, "until": args.until,
+    }
+
+    def on_progress(done, total):
+        if progress:
+            emit(progress, "export_progress", path=args.export, done=done, total=total)
+
+    started = time.perf_counter()
+    try:
+        count = export_items(args.export, fmt=args.export_format, columns=args.columns,
+                             run_ids=args.run, on_progress=on_progress, **filters)
+    except ExportError as e:
+        sys.stderr.write(f"{e}\n")
+        return EXIT_USAGE
+    result = {"path": args.export, "records": count, "seconds": round(time.perf_counter() - started, 3)}
+    if args.format == "ndjson":
+        emit(sys.stdout, "export_finished", **result)
+    elif args.format == "json":
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"{count} Items nach {args.export} exportiert")
+    return EXIT_OK
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.probe and (args.matrix or len(args.model or []) > 1):
+        parser.error("--probe misst genau ein Modell (kein --matrix, --model nur einmal)")
+    if args.export:
+        return _export(args, None if args.quiet else (sys.stdout if args.format == "ndjson" else sys.stderr))
+    if not args.model and not args.resume:
+        parser.print_usage(sys.stderr)
+        sys.stderr.write("--model oder --resume ist erforderlich\n")
+        return EXIT_USAGE
+    if args.probe and (args.resume or not args.model):
+        sys.stderr.write("--probe braucht --model und lässt sich nicht mit --resume kombinieren\n")
+        return EXIT_USAGE
+    if args.sample and (args.resume or args.matrix or args.probe):
+        sys.stderr.write("--sample lässt sich nicht mit --resume, --matrix oder --probe kombinieren\n")
+        return EXIT_USAGE
+    if args.trace or args.trace_format:
+        configure_profiling(trace=True, trace_format=args.trace_format)
+    config = load_config()
+    app_settings = config.get_app_settings() if config else {}
+    threshold = args.threshold if args.threshold is not None else app_settings.get("default_threshold", 0)
+
+    resumed = None
+    if args.resume:
+        resumed = load_run(args.resume)
+        # Stichproben lassen sich auch abgeschlossen zum vollen Run erweitern
+        expandable = resumed is not None and resumed.get("run_type") == "sample" and resumed.get("status") != STATUS_RUNNING
+        if resumed is None or (resumed.get("status") != STATUS_PARTIAL and not expandable):
+            sys.stderr.write(f"Kein unterbrochener Run mit ID {args.resume}\n")
+            return EXIT_USAGE
+
+    available = list_datasets()
+    datasets = resumed["datasets"] if resumed else (args.dataset or available)
+    unknown = [d for d in datasets if d not in available]
+    if unknown or not datasets:
+        sys.stderr.write(f"Unbekannte oder keine Datasets: {', '.join(unknown) or '-'}\n")
+        return EXIT_USAGE
+
+    progress = None if args.quiet else (sys.stdout if args.format == "ndjson" else sys.stderr)
+    if args.probe:
+        return _probe(args, config, datasets, progress)
+    manifests = load_manifests()
+    total_items = sum(manifests[d]["count"] for d in datasets)
+
+    # Im Matrix-Modus ein gemeinsamer Run über alle Modelle, sonst ein Run pro Modell
+    if resumed:
+        groups = [resumed.get("models") or [resumed["model"]]]
+    else:
+        groups = [args.model] if args.matrix and len(args.model) > 1 else [[m] for m in args.model]
+
+    summaries = []
+    for models in groups:
+        label = ", ".join(models)
+        group_total = total_items * len(models)
+        if progress:
+            emit(progress, "run_started", model=label, datasets=datasets, items=group_total,
+                 resumed=resumed["id"] if resumed else None)
+        # Beim Fortsetzen zählen die schon gespeicherten Items mit
+        done = {"n": resumed["item_count"] if resumed else 0}
+        already_done = done["n"]
+        started = time.perf_counter()
+
+        def on_result(model, ds_name, result):
+            done["n"] += 1
+            if progress:
+                elapsed = time.perf_counter() - started
+                emit(
+                    progress, "item_finished", model=model, dataset=ds_name, id=result["id"],
+                    score=result["score"], duration=result["metrics"].get("duration"),
+                    done=done["n"], total=group_total, items_per_sec=round((done["n"] - already_done) / max(elapsed, 1e-6), 2)
+                )
+
+        def on_estimate(state):
+            if progress:
+                emit(progress, "estimate", model=label, **state)
+
+        if resumed:
+            run = resume_run(resumed["id"], config=config, cache_policy=args.cache,
+                             concurrency=args.concurrency, on_result=on_result)
+        elif args.sample:
+            try:
+                run = run_sample(models[0], datasets, config=config, cache_policy=args.cache, concurrency=args.concurrency,
+                                 ci_width=args.ci_width, confidence=args.confidence, max_seconds=args.max_seconds,
+                                 max_tokens=args.max_tokens, seed=args.seed, on_estimate=on_estimate,
+                                 on_result=lambda ds, r: on_result(models[0], ds, r))
+            except ValueError as e:
+                sys.stderr.write(f"{e}\n")
+                return EXIT_USAGE
+        elif len(models) > 1:
+            run = run_matrix(models, datasets, config=config, cache_policy=args.cache,
+                             concurrency=args.concurrency, on_result=on_result)
+        else:
+            run = run_suite(models[0], datasets, config=config, cache_policy=args.cache,
+                            concurrency=args.concurrency, on_result=lambda ds, r: on_result(models[0], ds, r))
+        summary = _summary(run, threshold)
+        summaries.append(summary)
+        if args.format == "ndjson":
+            emit(sys.stdout, "run_finished", threshold=threshold, **summary)
+        elif progress:
+            emit(progress, "run_finished", run_id=run["id"], model=label)
+
+    if args.format == "json":
+        print(json.dumps({"threshold": threshold, "runs": summaries}, ensure_ascii=False, indent=2))
+    elif args.format == "text":
+        for s in summaries:
+            state = "OK  " if s["passed"] else "FAIL"
+            print(f"{state} {s['model']:<24} Ø Score {s['avg_score']:>5}% (Schwelle {threshold}%)  Harness {s['harness_pct']}%  Run {s['id']}")
+            if s.get("cache_hits"):
+                print(f"     Antwort-Cache: {s['cache_hits']} von {s['item_count']} Items nicht neu gemessen")
+            if "estimate" in s:
+                print(f"     Stichprobe: {s['estimate']}% [{s['ci_low']}, {s['ci_high']}] aus {s['sample_size']}/{s['population']} Items"
+                      f" (Ende: {s['stop_reason']})")
+
+    return EXIT_OK if all(s["passed"] for s in summaries) else EXIT_BELOW_THRESHOLD
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,6 +30,8 @@ class EvaluationApp(App):
     #model-title, #dataset-title, #config-title { color: #28d483; text-style: bold; margin-bottom: 1; }
 
     #active-run-indicator { color: #ffff00; padding: 0 1; margin-bottom: 1; display: none; border: solid #e89f46; }
+    #run-progress { margin-bottom: 1; display: none; }
+    #export-status { color: #e89f46; padding: 0 1; margin-bottom: 1; display: none; }
 
     #modal-container { background: #1e1e1e; border: thick #28d483; padding: 2; margin: 4 10; height: auto; }
     .modal-text { margin-bottom: 1; color: #cccccc; }
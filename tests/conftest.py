@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from devtools.fake_ollama import FakeOllama
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Leeres Arbeitsverzeichnis mit datasets/ und config/ (Run-Store, Caches und Config liegen relativ dazu)."""
+    (tmp_path / "datasets").mkdir()
+    (tmp_path / "config").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write_dataset(workdir, name, items):
+    (workdir / "datasets" / name).write_text(json.dumps(items), encoding="utf-8")
+
+
+def write_config(workdir, text):
+    (workdir / "config" / "config.yaml").write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def fake_ollama():
+    """Startet FakeOllama-Server; fake_ollama(**kwargs) -> (Server, URL)."""
+    servers = []
+
+    def start(**kwargs):
+        server = FakeOllama(**kwargs)
+        servers.append(server)
+        return server, server.start()
+
+    yield start
+    for server in servers:
+        server.stop()
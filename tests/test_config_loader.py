@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from core import config_loader
+from core.config_loader import ConfigError, ConfigLoader, parse_config
+from tests.conftest import write_config
+
+VALID = 'app:\n  default_threshold: 85\nproviders:\n  ollama:\n    host: "http://localhost:11434"\n    concurrency: 2\n'
+
+
+@pytest.fixture
+def loader(workdir, monkeypatch):
+    # Jede Änderung sofort sehen, ohne auf das Prüfintervall zu warten
+    monkeypatch.setattr(config_loader, "RELOAD_CHECK_INTERVAL", 0)
+    write_config(workdir, VALID)
+    return ConfigLoader()
+
+
+@pytest.mark.parametrize("text, problem", [
+    ("providers: [unclosed\n", "Ungültiges YAML"),
+    ("providers:\n  ollama:\n    concurrency: zwei\n", "providers.ollama.concurrency: erwartet int"),
+    ("providers:\n  ollama:\n    concurrency: 0\n", "ganze Zahl >= 1"),
+    ("app:\n  default_threshold: 120\n", "zwischen 0 und 100"),
+    ("providers:\n  ollama:\n    hosts: [\"ftp://box\"]\n", "hosts[0].url"),
+    ("- nur\n- eine Liste\n", "Mapping"),
+])
+def test_broken_edit_keeps_last_good_config_and_reports_error(workdir, loader, text, problem):
+    assert loader.get_ollama_config()["concurrency"] == 2 and loader.error is None
+    version = loader.version
+    write_config(workdir, text)
+    # Automatisch neu geladen (mtime/Größe geändert), aber ungültig: alter Stand bleibt
+    assert loader.get_ollama_config()["concurrency"] == 2
+    assert problem in loader.error
+    assert loader.version == version
+
+    write_config(workdir, VALID.replace("concurrency: 2", "concurrency: 7"))
+    assert loader.get_ollama_config()["concurrency"] == 7
+    assert loader.error is None and loader.version == version + 1
+
+
+def test_instances_share_the_reloaded_state(workdir, loader):
+    other = ConfigLoader()
+    write_config(workdir, VALID.replace("concurrency: 2", "concurrency: 11"))
+    assert loader.reload().get_ollama_config()["concurrency"] == 11
+    assert other.get_ollama_config()["concurrency"] == 11
+
+
+def test_invalid_file_at_startup_raises(workdir):
+    write_config(workdir, "app:\n  default_threshold: -1\n")
+    with pytest.raises(ConfigError):
+        ConfigLoader()
+
+
+def test_save_text_rejects_invalid_config_without_touching_the_file(workdir, loader):
+    path = workdir / "config" / "config.yaml"
+    before = path.read_bytes()
+    with pytest.raises(ConfigError):
+        loader.save_text("providers:\n  ollama:\n    concurrency: -3\n")
+    assert path.read_bytes() == before
+    assert not os.path.exists(str(path) + ".tmp")
+    assert loader.get_ollama_config()["concurrency"] == 2 and loader.error is None
+
+
+def test_save_text_writes_and_reloads(workdir, loader):
+    text = VALID.replace("concurrency: 2", "concurrency: 5")
+    assert loader.save_text(text).get_ollama_config()["concurrency"] == 5
+    assert (workdir / "config" / "config.yaml").read_text(encoding="utf-8") == text
+    assert not os.path.exists(str(workdir / "config" / "config.yaml") + ".tmp")
+
+
+def test_bool_is_not_accepted_as_number():
+    with pytest.raises(ConfigError, match="max_failures"):
+        parse_config("providers:\n  ollama:\n    max_failures: true\n")
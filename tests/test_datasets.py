@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from core import datasets
+from core.datasets import build_manifest_entry, item_weight, iter_items
+from tests.conftest import write_dataset
+
+ITEMS = [
+    {"id": "a", "prompt": "Was ist 12345678 + 1?", "expected_keywords": ["12345679"], "weight": 2.5},
+    {"id": "b", "prompt": "Klammern ] und [ im Text, \"Zitate\" und \\ Backslash", "category": "X"},
+    {"id": "c", "prompt": "Ümlaute und Emoji 🚀", "nested": {"list": [1, 2, [3, {"x": None}]], "ok": True}},
+    {"id": "d", "prompt": "", "weight": None},
+]
+
+
+def _write_raw(workdir, name, text):
+    (workdir / "datasets" / name).write_text(text, encoding="utf-8")
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_every_chunk_size_yields_the_same_items_as_json_load(workdir, monkeypatch, indent):
+    text = json.dumps(ITEMS, ensure_ascii=False, indent=indent)
+    _write_raw(workdir, "d.json", text)
+    for chunk in range(1, len(text) + 2):
+        monkeypatch.setattr(datasets, "_READ_CHUNK", chunk)
+        assert list(iter_items("d.json")) == json.loads(text), chunk
+
+
+def test_empty_array_and_jsonl(workdir):
+    _write_raw(workdir, "empty.json", " [ \n ] \n")
+    _write_raw(workdir, "d.jsonl", "\n".join(json.dumps(item) for item in ITEMS) + "\n\n")
+    assert list(iter_items("empty.json")) == []
+    assert list(iter_items("d.jsonl")) == ITEMS
+
+
+@pytest.mark.parametrize("text", [
+    "[12345678, 2]",                        # Skalare statt Objekte
+    '[{"id": "a"}, "b"]',
+    '[{"id": "a"} {"id": "b"}]',            # fehlendes Komma
+    '[{"id": "a"},, {"id": "b"}]',
+    '[{"id": "a"},]',                       # Komma am Ende
+    '[{"id": "a"}] {"id": "b"}',            # Daten nach dem Array
+    '[{"id": "a"}, {"id": "b"',             # abgeschnittene Datei
+    '[{"id": "a"}, {"id": b}]',
+    '[{"id": "a"}',
+])
+def test_malformed_arrays_are_rejected_for_every_chunk_size(workdir, monkeypatch, text):
+    _write_raw(workdir, "bad.json", text)
+    for chunk in (1, 3, 7, 1 << 16):
+        monkeypatch.setattr(datasets, "_READ_CHUNK", chunk)
+        with pytest.raises(ValueError):
+            list(iter_items("bad.json"))
+
+
+def test_jsonl_rejects_non_object_lines(workdir):
+    _write_raw(workdir, "bad.jsonl", '{"id": "a"}\n42\n')
+    with pytest.raises(ValueError):
+        list(iter_items("bad.jsonl"))
+
+
+def test_weight_null_counts_as_default():
+    assert item_weight({"weight": None}) == 1.0
+    assert item_weight({}) == 1.0
+    assert item_weight({"weight": "2"}) == 2.0
+    with pytest.raises(ValueError, match="x7"):
+        item_weight({"id": "x7", "weight": [1]})
+
+
+def test_manifest_reports_bad_weights_and_items(workdir):
+    write_dataset(workdir, "ok.json", ITEMS)
+    write_dataset(workdir, "weights.json", [{"id": "x7", "prompt": "p", "weight": {"a": 1}}])
+    _write_raw(workdir, "scalars.json", "[1, 2]")
+    ok = build_manifest_entry("ok.json")
+    assert (ok["count"], ok["total_weight"], ok["error"]) == (4, 5.5, None)
+    assert "x7" in build_manifest_entry("weights.json")["error"]
+    assert "kein JSON-Objekt" in build_manifest_entry("scalars.json")["error"]
@@ -0,0 +1,98 @@
+import csv
+import json
+import threading
+
+import pytest
+
+from core import export
+from core.export import DEFAULT_COLUMNS, ExportError, export_items, format_for, parse_columns
+from core.history_manager import save_run
+from core.progress import RunCancelled
+
+
+def _item(item_id, dataset, score, prompt="Frage", response='Antwort, mit "Zitat"\nund Zeilenumbruch'):
+    return {"id": item_id, "dataset": dataset, "score": score, "prompt": prompt, "response": response,
+            "metrics": {"duration": 0.5, "tps": 12.5, "response_length": len(response), "token_count": 7}}
+
+
+@pytest.fixture
+def runs(workdir):
+    llama = save_run("llama3", ["a.json", "b.json"], [_item("a1", "a.json", 100), _item("b1", "b.json", 0)])
+    mistral = save_run("mistral", ["a.json"], [_item("a1", "a.json", 50, prompt="Ümlaut")])
+    return llama, mistral
+
+
+def _exports(workdir):
+    return sorted(p.name for p in (workdir / "exports").iterdir())
+
+
+def test_csv_round_trip_with_filter_and_columns(workdir, runs):
+    path = str(workdir / "exports" / "out.csv")
+    count = export_items(path, columns="run_id,model,dataset,item_id,score,prompt,response", model="llama", dataset="b.json")
+    assert count == 1
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows == [{
+        "run_id": runs[0]["id"], "model": "llama3", "dataset": "b.json", "item_id": "b1", "score": "0",
+        "prompt": "Frage", "response": "Antwort, mit \"Zitat\"\nund Zeilenumbruch",
+    }]
+    assert _exports(workdir) == ["out.csv"]
+
+
+def test_ndjson_round_trip_with_run_selection(workdir, runs):
+    path = str(workdir / "exports" / "out.ndjson")
+    progress = []
+    count = export_items(path, columns=["model", "item_id", "duration", "token_count", "prompt"],
+                         run_ids=[runs[1]["id"]], on_progress=lambda done, total: progress.append((done, total)))
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert count == 1 and progress == [(1, 1)]
+    assert records == [{"model": "mistral", "item_id": "a1", "duration": 0.5, "token_count": 7, "prompt": "Ümlaut"}]
+
+
+def test_default_columns_leave_out_texts(workdir, runs):
+    path = str(workdir / "exports" / "all.ndjson")
+    assert export_items(path) == 3
+    with open(path, encoding="utf-8") as f:
+        first = json.loads(f.readline())
+    assert list(first) == DEFAULT_COLUMNS
+    assert "prompt" not in first and "response" not in first
+
+
+def test_failed_export_leaves_no_partial_file(workdir, runs, monkeypatch):
+    path = workdir / "exports" / "out.csv"
+    written = []
+
+    def failing_record(item, columns):
+        if written:
+            raise RuntimeError("Platte voll")
+        written.append(item)
+        return {c: None for c in columns}
+
+    monkeypatch.setattr(export, "_record", failing_record)
+    with pytest.raises(RuntimeError):
+        export_items(str(path))
+    assert _exports(workdir) == []
+
+
+def test_cancelled_export_keeps_previous_file(workdir, runs):
+    (workdir / "exports").mkdir()
+    path = workdir / "exports" / "out.ndjson"
+    path.write_text("alter Export\n", encoding="utf-8")
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(RunCancelled):
+        export_items(str(path), cancel=cancel)
+    assert path.read_text(encoding="utf-8") == "alter Export\n"
+    assert _exports(workdir) == ["out.ndjson"]
+
+
+def test_invalid_requests_raise_export_error(workdir, runs, monkeypatch):
+    with pytest.raises(ExportError):
+        parse_columns("score,gibtsnicht")
+    with pytest.raises(ExportError):
+        format_for("out.xlsx")
+    monkeypatch.setattr(export, "pyarrow", None)
+    with pytest.raises(ExportError, match="pyarrow"):
+        export_items(str(workdir / "exports" / "out.parquet"))
+    assert not (workdir / "exports").exists()
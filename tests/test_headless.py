@@ -0,0 +1,14 @@
+import pytest
+
+import headless
+
+
+@pytest.mark.parametrize("argv", [
+    ["--probe", "--model", "a", "--model", "b"],
+    ["--probe", "--matrix", "--model", "a"],
+])
+def test_probe_rejects_more_than_one_model(workdir, capsys, argv):
+    with pytest.raises(SystemExit) as exit_info:
+        headless.main(argv)
+    assert exit_info.value.code == headless.EXIT_USAGE
+    assert "--probe" in capsys.readouterr().err
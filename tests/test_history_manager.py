@@ -0,0 +1,238 @@
+import json
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from core import history_manager
+from core.history_manager import (
+    BLOB_VERSION, STATUS_COMPLETE, STATUS_PARTIAL, STATUS_RUNNING, _collect_blobs, _connect, _text_hash, delete_run,
+    load_all_runs, load_run, load_run_details, load_texts, save_run, start_run,
+)
+from core.runner import resume_run, run_suite
+from core.sampling import run_sample
+from tests.conftest import write_config, write_dataset
+
+
+def _legacy_run(run_id, model, score):
+    return {
+        "id": run_id, "timestamp": "12:00 - 01.01.25", "model": model, "datasets": ["d.json"],
+        "avg_score": score, "details": [{"id": "a", "score": score, "metrics": {"duration": 1.0}}],
+    }
+
+
+def _write_legacy(workdir, runs):
+    (workdir / "config" / "history.json").write_text(json.dumps(runs), encoding="utf-8")
+
+
+def test_legacy_runs_of_the_same_second_are_all_migrated(workdir):
+    _write_legacy(workdir, [
+        _legacy_run("20250101_120000", "m1", 10),
+        _legacy_run("20250101_120000", "m2", 20),
+        _legacy_run("20250101_120000", "m3", 30),
+    ])
+    runs = {run["model"]: run for run in load_all_runs()}
+    assert {model: run["id"] for model, run in runs.items()} == {
+        "m1": "20250101_120000", "m2": "20250101_120000_2", "m3": "20250101_120000_3",
+    }
+    assert runs["m2"]["legacy_id"] == "20250101_120000"
+    assert [d["score"] for d in load_run_details(runs["m3"]["id"])] == [30]
+    assert (workdir / "config" / "history.json.migrated").exists()
+
+
+def test_repeated_migration_does_not_duplicate_runs(workdir, monkeypatch):
+    runs = [_legacy_run("20250101_120000", "m1", 10), _legacy_run("20250101_120000", "m2", 20)]
+    _write_legacy(workdir, runs)
+    assert len(load_all_runs()) == 2
+    # Abbruch nach dem Commit, aber vor dem Umbenennen: die Datei liegt noch da
+    _write_legacy(workdir, runs)
+    monkeypatch.setattr(history_manager, "_initialized", set())
+    assert sorted(run["id"] for run in load_all_runs()) == ["20250101_120000", "20250101_120000_2"]
+
+
+def _suite(workdir, fake_ollama, count=30, **dataset_fields):
+    _, url = fake_ollama(models=["m"], latency="0", tps="100000", tokens=3)
+    write_config(workdir, f'providers:\n  ollama:\n    host: "{url}"\n    concurrency: 3\n')
+    write_dataset(workdir, "a.json", [{"id": f"a{i}", "prompt": f"a {i}", **dataset_fields} for i in range(count)])
+    write_dataset(workdir, "b.json", [{"id": f"b{i}", "prompt": f"b {i}", **dataset_fields} for i in range(count)])
+    return [f"a{i}" for i in range(count)] + [f"b{i}" for i in range(count)]
+
+
+def _stored_keys(run_id):
+    return [(d["dataset"], d["item_index"]) for d in load_run_details(run_id, with_text=False)]
+
+
+def _assert_complete(run_id, expected_ids):
+    keys = _stored_keys(run_id)
+    assert len(keys) == len(set(keys)), "doppelte Items"
+    assert sorted(d["id"] for d in load_run_details(run_id, with_text=False)) == sorted(expected_ids)
+
+
+def test_cancelled_run_resumes_without_duplicates_or_gaps(workdir, fake_ollama):
+    expected = _suite(workdir, fake_ollama)
+    cancel = threading.Event()
+    seen = []
+
+    def stop_after_some(ds_name, result):
+        seen.append(result["id"])
+        if len(seen) == 12:
+            cancel.set()
+
+    partial = run_suite("m", ["a.json", "b.json"], cache_policy="bypass", on_result=stop_after_some, cancel=cancel)
+    assert partial["status"] == STATUS_PARTIAL
+    assert 12 <= partial["item_count"] < len(expected)
+    done_before = set(_stored_keys(partial["id"]))
+
+    resumed_ids = []
+    run = resume_run(partial["id"], cache_policy="bypass", on_result=lambda model, ds, r: resumed_ids.append(r["id"]))
+    assert run["status"] == STATUS_COMPLETE and run["item_count"] == len(expected)
+    # Fortgesetzt wird nur, was noch fehlte
+    assert len(resumed_ids) == len(expected) - len(done_before)
+    _assert_complete(run["id"], expected)
+
+
+def test_crashed_run_is_partial_and_resumable(workdir, fake_ollama):
+    expected = _suite(workdir, fake_ollama)
+
+    def crash(ds_name, result):
+        if result["id"] == "a20":
+            raise RuntimeError("Absturz")
+
+    with pytest.raises(RuntimeError):
+        run_suite("m", ["a.json", "b.json"], cache_policy="bypass", on_result=crash)
+    run_id = load_all_runs()[0]["id"]
+    assert load_run(run_id)["status"] == STATUS_PARTIAL
+    run = resume_run(run_id, cache_policy="bypass")
+    assert run["status"] == STATUS_COMPLETE
+    _assert_complete(run_id, expected)
+    with pytest.raises(ValueError):
+        resume_run(run_id, cache_policy="bypass")
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def _abandon(checkpoint, **fields):
+    """Simuliert einen Prozess, der mitten im Run verschwunden ist."""
+    checkpoint._conn.close()
+    conn = _connect()
+    with conn:
+        for key, value in fields.items():
+            conn.execute("UPDATE runs SET summary = json_set(summary, ?, ?) WHERE id = ?",
+                         (f"$.{key}", value, checkpoint.run_id))
+    conn.close()
+
+
+def test_interrupted_runs_are_recovered_only_for_dead_local_processes(workdir, monkeypatch):
+    result = {"id": "x", "score": 100, "metrics": {"duration": 1.0, "tps": 1.0, "response_length": 1}}
+    dead, foreign, alive = (start_run(model, ["a.json"]) for model in ("dead", "foreign", "alive"))
+    for checkpoint in (dead, foreign, alive):
+        checkpoint.add({**result, "dataset": "a.json", "item_index": 0})
+    pid = _dead_pid()
+    _abandon(dead, pid=pid)
+    _abandon(foreign, pid=pid, host=f"nicht-{socket.gethostname()}")
+    _abandon(alive)
+
+    # Nächster Prozess: Initialisierung (und damit die Wiederherstellung) läuft erneut
+    monkeypatch.setattr(history_manager, "_initialized", set())
+    runs = {run["model"]: run for run in load_all_runs()}
+    assert runs["dead"]["status"] == STATUS_PARTIAL and runs["dead"]["item_count"] == 1
+    assert runs["foreign"]["status"] == STATUS_RUNNING
+    assert runs["alive"]["status"] == STATUS_RUNNING
+
+
+def test_sample_run_expands_to_full_run(workdir, fake_ollama):
+    expected = _suite(workdir, fake_ollama, count=60, category="X", expected_keywords=[])
+    sample = run_sample("m", ["a.json", "b.json"], cache_policy="bypass", ci_width=50, seed=1)
+    assert sample["run_type"] == "sample" and sample["item_count"] < len(expected)
+    estimate = sample["estimate"]
+
+    run = resume_run(sample["id"], cache_policy="bypass")
+    assert run["run_type"] == "single" and run["status"] == STATUS_COMPLETE
+    assert run["item_count"] == len(expected)
+    assert run["sampling"]["result"]["estimate"] == estimate
+    assert "estimate" not in run
+    _assert_complete(run["id"], expected)
+
+
+def _item(item_id, prompt, response):
+    return {"id": item_id, "prompt": prompt, "response": response, "score": 50,
+            "metrics": {"duration": 1.0, "tps": 1.0, "response_length": len(response)}}
+
+
+def _blob_count():
+    conn = _connect()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_deleting_a_run_keeps_blobs_shared_with_other_runs(workdir):
+    first = save_run("m", ["d.json"], [_item("a", "gemeinsamer Prompt", "Antwort eins"), _item("b", "nur eins", "x")])
+    second = save_run("m", ["d.json"], [_item("a", "gemeinsamer Prompt", "Antwort zwei")])
+    shared = _text_hash("gemeinsamer Prompt")
+    assert _blob_count() == 5
+
+    # Entfernt: "Antwort eins", "nur eins", "x"; der gemeinsame Prompt bleibt
+    assert delete_run(first["id"]) == 3
+    assert load_texts([shared]) == {shared: "gemeinsamer Prompt"}
+    assert [d["prompt"] for d in load_run_details(second["id"])] == ["gemeinsamer Prompt"]
+
+    assert delete_run(second["id"]) == 2
+    assert _blob_count() == 0
+
+
+def test_orphaned_blobs_are_collected(workdir):
+    run = save_run("m", ["d.json"], [_item("a", "p", "r")])
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("INSERT INTO blobs (hash, data, size) VALUES ('verwaist', x'00', 1)")
+            assert _collect_blobs(conn) == 1
+    finally:
+        conn.close()
+    assert _blob_count() == 2
+    assert [d["response"] for d in load_run_details(run["id"])] == ["r"]
+
+
+def test_v1_database_moves_texts_into_blob_store(workdir):
+    details = [_item("a", "Prompt ä", "Antwort 1"), _item("b", "Prompt ä", "Antwort 2"), _item("c", "Ohne", "")]
+    details[2].pop("response")
+    # Stand vor dem Blob-Store: Texte stecken im JSON der Items, user_version 1
+    conn = sqlite3.connect(workdir / "config" / "history.db")
+    conn.executescript("""
+        CREATE TABLE runs (id TEXT PRIMARY KEY, created_at TEXT NOT NULL, model TEXT NOT NULL, datasets TEXT NOT NULL,
+                           avg_score REAL, avg_duration REAL, avg_tps REAL, item_count INTEGER, summary TEXT NOT NULL);
+        CREATE TABLE run_items (run_id TEXT NOT NULL, seq INTEGER NOT NULL, item_id TEXT, score REAL,
+                                data TEXT NOT NULL, PRIMARY KEY (run_id, seq));
+        PRAGMA user_version = 1;
+    """)
+    summary = {"id": "20250101_120000", "model": "m", "datasets": ["d.json"], "created_at": "2025-01-01T12:00:00"}
+    conn.execute("INSERT INTO runs VALUES (?, ?, 'm', '[\"d.json\"]', 50, 1, 1, 3, ?)",
+                 (summary["id"], summary["created_at"], json.dumps(summary)))
+    conn.executemany("INSERT INTO run_items VALUES (?, ?, ?, 50, ?)",
+                     [(summary["id"], seq, d["id"], json.dumps(d)) for seq, d in enumerate(details)])
+    conn.commit()
+    conn.close()
+
+    loaded = load_run_details(summary["id"])
+    assert [{k: v for k, v in d.items() if not k.endswith("_hash")} for d in loaded] == details
+    hashes = [h for d in loaded for h in (d["prompt_hash"], d["response_hash"]) if h]
+    assert load_texts(hashes) == {_text_hash(t): t for t in ("Prompt ä", "Antwort 1", "Antwort 2", "Ohne")}
+    assert loaded[2]["response_hash"] is None
+
+    conn = _connect()
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == BLOB_VERSION
+        assert not any('"prompt"' in row[0] for row in conn.execute("SELECT data FROM run_items"))
+        # Gleicher Prompt zweimal: ein Blob
+        assert conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 4
+    finally:
+        conn.close()
@@ -0,0 +1,59 @@
+import math
+
+import pytest
+
+from core.metrics import _betai, mean_std, paired_t_test, percentile, t_test_p
+
+
+@pytest.mark.parametrize("a, b, x, expected", [
+    (1, 1, 0.3, 0.3),                       # I_x(1, 1) = x
+    (2.5, 1, 0.4, 0.4 ** 2.5),              # I_x(a, 1) = x^a
+    (1, 3.5, 0.2, 1 - 0.8 ** 3.5),          # I_x(1, b) = 1 - (1-x)^b
+    (0.5, 0.5, 0.25, 2 / math.pi * math.asin(0.5)),
+])
+def test_betai_closed_forms(a, b, x, expected):
+    assert _betai(a, b, x) == pytest.approx(expected, rel=1e-10)
+
+
+def test_betai_symmetry_and_bounds():
+    for a, b, x in [(3, 7, 0.1), (3, 7, 0.6), (40, 0.5, 0.97), (0.5, 12, 0.02)]:
+        assert _betai(a, b, x) + _betai(b, a, 1 - x) == pytest.approx(1, abs=1e-12)
+    assert _betai(2, 3, 0) == 0.0
+    assert _betai(2, 3, 1) == 1.0
+
+
+@pytest.mark.parametrize("t, dof, expected", [
+    (1.0, 1, 0.5),                          # Cauchy: P(|T| > 1) = 1/2
+    (2.228138852, 10, 0.05),                # Tabellenwert t(0.975, 10)
+    (0.0, 5, 1.0),
+])
+def test_t_test_p_known_values(t, dof, expected):
+    assert t_test_p(t, dof) == pytest.approx(expected, abs=1e-9)
+
+
+def test_t_test_p_closed_form_for_two_degrees_of_freedom():
+    for t in (0.3, 1.7, 4.0, -2.5):
+        assert t_test_p(t, 2) == pytest.approx(1 - abs(t) / math.sqrt(2 + t * t), rel=1e-10)
+
+
+def test_paired_t_test_matches_reference():
+    result = paired_t_test([1, 2, 3, 4, 5])
+    assert result["n"] == 5
+    assert result["mean_delta"] == 3.0
+    assert result["t"] == pytest.approx(3 * math.sqrt(2), rel=1e-12)
+    assert result["p"] == pytest.approx(0.0132356, abs=1e-6)
+
+
+def test_paired_t_test_degenerate_inputs():
+    assert paired_t_test([])["p"] == 1.0
+    assert paired_t_test([4.0])["p"] == 1.0
+    assert paired_t_test([0, 0, 0])["p"] == 1.0
+    systematic = paired_t_test([2, 2, 2])
+    assert (systematic["t"], systematic["p"]) == (math.inf, 0.0)
+
+
+def test_mean_std_and_percentile():
+    assert mean_std([2, 4, 4, 4, 5, 5, 7, 9]) == pytest.approx((5.0, math.sqrt(32 / 7)))
+    assert mean_std([3]) == (3, 0.0)
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([], 95) == 0
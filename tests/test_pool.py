@@ -0,0 +1,62 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from adapters.pool import NO_HOST_ERROR, OllamaPoolAdapter
+
+TRANSPORT = {"max_retries": 0, "backoff_base": 0.01, "connect_timeout": 0.5}
+
+
+def _unreachable():
+    # Der Fake-Server bricht die Verbindung ab, /api/tags schlägt also fehl
+    raise ConnectionResetError("Host weg")
+
+
+def test_failing_host_is_ejected_and_items_retried_elsewhere(fake_ollama):
+    _, good = fake_ollama(models=["m"], latency="0.005", tps="100000")
+    _, bad = fake_ollama(models=["m"], error_rate=1.0, error_status=500)
+    _, no_model = fake_ollama(models=["other"])
+    pool = OllamaPoolAdapter("m", [{"url": good}, {"url": bad}, {"url": no_model}], TRANSPORT,
+                             max_failures=2, health_interval=60)
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda i: pool.send(f"p{i}"), range(30)))
+    assert not any("error" in r for r in results)
+    stats = pool.stats()
+    assert stats[bad]["ejections"] == 1 and not stats[bad]["healthy"]
+    # Nach max_failures kommen nur noch Items hinzu, die schon unterwegs waren
+    assert 2 <= stats[bad]["sent"] <= 4
+    assert stats[no_model]["sent"] == 0
+    assert {r["metrics"]["host"] for r in results} == {good}
+
+
+def test_items_wait_for_recovery_when_every_host_is_ejected(fake_ollama):
+    server, url = fake_ollama(models=["m"], error_rate=1.0, error_status=500)
+    pool = OllamaPoolAdapter("m", [{"url": url}, {"url": "http://127.0.0.1:1"}], TRANSPORT,
+                             max_failures=1, health_interval=0.3, outage_timeout=5)
+    assert "error" in pool.send("p")
+    assert not pool.stats()[url]["healthy"]
+    server.error_rate = 0.0
+    started = time.monotonic()
+    res = pool.send("p")
+    assert "error" not in res and res["metrics"]["host"] == url
+    assert 0.1 < time.monotonic() - started < 3
+
+
+def test_outage_gives_up_after_timeout(fake_ollama):
+    server, url = fake_ollama(models=["m"])
+    pool = OllamaPoolAdapter("m", [{"url": url}, {"url": "http://127.0.0.1:1"}], TRANSPORT,
+                             max_failures=1, health_interval=0.2, outage_timeout=0.6)
+    assert "error" not in pool.send("p")
+    server.error_rate = 1.0
+    server.tags = _unreachable
+    assert "error" in pool.send("p")
+    started = time.monotonic()
+    assert pool.send("p")["error"] == NO_HOST_ERROR
+    assert 0.4 < time.monotonic() - started < 3
+
+
+def test_digest_only_when_all_hosts_agree(fake_ollama):
+    _, a = fake_ollama(models=["m"])
+    other, b = fake_ollama(models=["m"])
+    assert OllamaPoolAdapter("m", [{"url": a}, {"url": b}], TRANSPORT).model_digest()
+    other.tags = lambda: {"models": [{"name": "m", "digest": "anderer-build"}]}
+    assert OllamaPoolAdapter("m", [{"url": a}, {"url": b}], TRANSPORT).model_digest() is None
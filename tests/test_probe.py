@@ -0,0 +1,25 @@
+from core.probe import find_knee, probe_levels, run_probe
+from core.runner import load_config
+from tests.conftest import write_config, write_dataset
+
+
+def test_probe_levels_double_up_to_the_maximum():
+    assert probe_levels(1) == [1]
+    assert probe_levels(12) == [1, 2, 4, 8, 12]
+    assert probe_levels(16) == [1, 2, 4, 8, 16]
+
+
+def test_knee_is_where_throughput_stops_scaling():
+    levels = [{"concurrency": c, "items_per_s": r} for c, r in [(1, 10), (2, 19), (4, 35), (8, 38), (16, 39)]]
+    assert find_knee(levels) == 4
+
+
+def test_probe_reaches_the_highest_level_on_the_server(workdir, fake_ollama):
+    server, url = fake_ollama(models=["m"], latency="0.1", tps="100000", tokens=3)
+    write_config(workdir, f'providers:\n  ollama:\n    host: "{url}"\n')
+    write_dataset(workdir, "d.json", [{"id": f"i{i}", "prompt": f"p{i}"} for i in range(20)])
+    run = run_probe("m", ["d.json"], config=load_config(), max_concurrency=16, items_per_level=1, adaptive=False)
+    assert [level["concurrency"] for level in run["levels"]] == [1, 2, 4, 8, 16]
+    assert server.stats()["max_in_flight"] == 16
+    # Ohne Warten auf Verbindungen bleibt die Dauer auch auf der höchsten Stufe bei der Server-Latenz
+    assert run["levels"][-1]["duration_p95"] < 0.3
@@ -0,0 +1,35 @@
+from core.progress import ProgressTracker
+
+
+def _result(i, error=None):
+    result = {"id": f"i{i}", "dataset": "d.json", "score": 100, "metrics": {"duration": 0.1}}
+    if error:
+        result["error"] = error
+    return result
+
+
+def test_item_events_are_coalesced_and_complete():
+    batches, snapshots = [], []
+    tracker = ProgressTracker(1000, on_update=snapshots.append, interval=60, on_events=batches.append)
+    for i in range(1000):
+        tracker.item_started({"id": f"i{i}"})
+        tracker.item_finished(_result(i, error="timeout" if i % 100 == 0 else None))
+    tracker.flush()
+
+    # Erste Meldung sofort, danach erst wieder beim flush
+    assert len(batches) == 2 and len(snapshots) == 2
+    merged = {kind: [e for batch in batches for e in batch.get(kind, [])] for kind in ("started", "finished", "failed")}
+    assert len(merged["started"]) == 1000
+    assert len(merged["finished"]) == 990
+    assert [e["id"] for e in merged["failed"]] == [f"i{i}" for i in range(0, 1000, 100)]
+    assert merged["failed"][0] == {"id": "i0", "dataset": "d.json", "error": "timeout"}
+    assert snapshots[-1]["finished"] == 1000 and snapshots[-1]["failed"] == 10
+
+
+def test_snapshot_without_total_and_late_total():
+    tracker = ProgressTracker(None, already_done=5)
+    tracker.item_finished(_result(1))
+    snap = tracker.snapshot()
+    assert snap["total"] is None and snap["eta"] is None and snap["finished"] == 6
+    tracker.set_total(20)
+    assert tracker.snapshot()["total"] == 20
@@ -0,0 +1,84 @@
+from core.history_manager import _connect, save_run
+from core.regression import TrendReader, _histories, _item_flags, compare_runs, item_trend
+
+
+def _item(item_id, score, duration, dataset="d.json"):
+    return {"id": item_id, "dataset": dataset, "score": score, "metrics": {"duration": duration, "tps": 10.0, "response_length": 5}}
+
+
+def _save(items, model="m"):
+    return save_run(model, ["d.json"], items)["id"]
+
+
+def _history(scores=(), durations=()):
+    return {"score": list(scores), "duration": list(durations)}
+
+
+def test_score_change_without_history_is_flagged():
+    flags = _item_flags({"score": 80, "duration": 1.0}, {"score": 60, "duration": 1.0}, _history(), 10, 1.5)
+    assert flags == ["score_down"]
+
+
+def test_score_change_below_threshold_is_ignored():
+    flags = _item_flags({"score": 80, "duration": 1.0}, {"score": 75, "duration": 1.0}, _history(), 10, 1.5)
+    assert flags == []
+
+
+def test_score_change_within_usual_spread_is_ignored():
+    # Das Item schwankt ohnehin zwischen 40 und 100
+    history = _history(scores=[40, 100, 45, 95, 50, 90])
+    flags = _item_flags({"score": 90, "duration": 1.0}, {"score": 60, "duration": 1.0}, history, 10, 1.5)
+    assert flags == []
+
+
+def test_score_change_outside_stable_history_is_flagged():
+    history = _history(scores=[80, 81, 79, 80])
+    flags = _item_flags({"score": 80, "duration": 1.0}, {"score": 95, "duration": 1.0}, history, 10, 1.5)
+    assert flags == ["score_up"]
+
+
+def test_latency_flags_need_factor_and_history():
+    old, stable = {"score": 50, "duration": 1.0}, _history(scores=[50] * 4, durations=[1.0, 1.1, 0.9, 1.0])
+    assert _item_flags(old, {"score": 50, "duration": 2.0}, stable, 10, 1.5) == ["slower"]
+    assert _item_flags(old, {"score": 50, "duration": 0.5}, stable, 10, 1.5) == ["faster"]
+    assert _item_flags(old, {"score": 50, "duration": 1.2}, stable, 10, 1.5) == []
+    assert _item_flags({"score": 50, "duration": None}, {"score": 50, "duration": 5.0}, stable, 10, 1.5) == []
+
+
+def test_histories_are_windowed_and_exclude_the_run(workdir):
+    for score in (10, 20, 30, 40):
+        _save([_item("a", score, 1.0), _item("b", score + 1, score / 10)])
+    new_id = _save([_item("a", 50, 1.0), _item("b", 51, 5.0)])
+    conn = _connect()
+    try:
+        before = conn.execute("SELECT created_at FROM runs WHERE id = ?", (new_id,)).fetchone()[0]
+        histories = _histories(conn, new_id, before, 3)
+    finally:
+        conn.close()
+    assert histories[("m", "d.json", "a")] == {"score": [40, 30, 20], "duration": [1.0, 1.0, 1.0]}
+    assert histories[("m", "d.json", "b")] == {"score": [41, 31, 21], "duration": [4.0, 3.0, 2.0]}
+
+
+def test_compare_runs_flags_and_sorts_items(workdir):
+    for _ in range(3):
+        _save([_item("stable", 80, 1.0), _item("drop", 80, 1.0), _item("slow", 50, 1.0)])
+    base = _save([_item("stable", 80, 1.0), _item("drop", 80, 1.0), _item("slow", 50, 1.0), _item("old", 10, 1.0)])
+    new = _save([_item("stable", 82, 1.0), _item("drop", 40, 1.0), _item("slow", 50, 3.0), _item("fresh", 10, 1.0)])
+
+    result = compare_runs(base, new)
+    flags = {item["item_id"]: item["flags"] for item in result["items"]}
+    assert flags == {"drop": ["score_down"], "slow": ["slower"], "stable": []}
+    assert [item["item_id"] for item in result["items"]] == ["drop", "slow", "stable"]
+    assert (result["common_items"], result["only_base"], result["only_new"]) == (3, 1, 1)
+
+
+def test_trend_reader_matches_item_trend(workdir):
+    for score in (10, 20, 30):
+        _save([_item("a", score, 1.0)])
+    reader = TrendReader()
+    try:
+        assert reader.trend("m", "a", "d.json", limit=2) == item_trend("m", "a", "d.json", limit=2)
+        assert [p["score"] for p in reader.trend("m", "a", limit=2)] == [20, 30]
+    finally:
+        reader.close()
+    assert reader.trend("m", "a") == []
@@ -0,0 +1,50 @@
+from core.response_cache import ResponseCache, make_key
+
+
+def _cache(tmp_path, **limits):
+    return ResponseCache(str(tmp_path / "cache.db"), **limits)
+
+
+def test_roundtrip_and_key_ignores_keep_alive():
+    assert make_key("ollama", "m", "d", "p", {"keep_alive": "5m"}) == make_key("ollama", "m", "d", "p", {})
+    assert make_key("ollama", "m", "d", "p", {"temperature": 0}) != make_key("ollama", "m", "d", "p", {})
+
+
+def test_put_get_and_running_stats(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("a", "ollama", "m", "d", {"response": "x"})
+    cache.put("a", "ollama", "m", "d", {"response": "y"})
+    assert cache.get("a") == {"response": "x"}
+    assert cache.get("missing") is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_evicts_least_recently_used_below_limit(tmp_path):
+    cache = _cache(tmp_path, max_entries=10)
+    for i in range(10):
+        cache.put(f"k{i}", "ollama", "m", "d", {"i": i})
+    cache.get("k0")
+    cache.put("k10", "ollama", "m", "d", {"i": 10})
+    assert cache.stats()["entries"] == 9
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None and cache.get("k2") is None
+
+
+def test_evicts_by_bytes(tmp_path):
+    cache = _cache(tmp_path, max_bytes=1000)
+    for i in range(20):
+        cache.put(f"k{i}", "ollama", "m", "d", {"response": "x" * 90})
+    stats = cache.stats()
+    assert stats["bytes"] <= 1000
+    assert stats["entries"] < 20
+
+
+def test_stats_survive_reopen_and_clear(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("a", "ollama", "m", "d", {"response": "x"})
+    cache.get("a")
+    cache.flush()
+    reopened = _cache(tmp_path)
+    assert reopened.stats() == cache.stats()
+    reopened.clear()
+    assert reopened.stats() == {"entries": 0, "bytes": 0}
@@ -0,0 +1,156 @@
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from core.sampling import StratifiedEstimate, build_strata, draw_order, run_sample
+from tests.conftest import write_config, write_dataset
+
+
+def _strata(sizes, weight=1.0):
+    return {
+        name: [("d.json", f"{name}{i}", weight) for i in range(size)]
+        for name, size in sizes.items()
+    }
+
+
+def _reference(strata, samples, confidence=0.95):
+    """Dieselbe Schätzung direkt aus den Einzelwerten."""
+    total = sum(w for members in strata.values() for _, _, w in members)
+    z = {0.95: 1.959963984540054}[confidence]
+    estimate = variance = 0.0
+    for name, members in strata.items():
+        drawn = samples[name]
+        n, population = len(drawn), len(members)
+        share = sum(w for _, _, w in members) / total
+        weight_sum = sum(w for w, _ in drawn)
+        mean = sum(w * s for w, s in drawn) / weight_sum
+        residuals = sum((w * (s - mean)) ** 2 for w, s in drawn) / (n - 1)
+        var = (1 - n / population) * residuals / (n * (weight_sum / n) ** 2)
+        estimate += share * mean
+        variance += share ** 2 * var
+    half = z * math.sqrt(variance)
+    return estimate, max(estimate - half, 0), min(estimate + half, 100)
+
+
+def test_estimate_matches_direct_formula():
+    rng = random.Random(3)
+    strata = {
+        name: [("d.json", f"{name}{i}", rng.choice([0.5, 1.0, 2.0])) for i in range(size)]
+        for name, size in {"A": 40, "B": 25, "C": 10}.items()
+    }
+    estimator = StratifiedEstimate(strata)
+    samples = {name: [] for name in strata}
+    for name, members in strata.items():
+        for ds_name, index, weight in members[: len(members) // 2]:
+            score = rng.choice([0, 50, 100])
+            estimator.add(ds_name, index, score)
+            samples[name].append((weight, score))
+    result = estimator.result()
+    expected = _reference(strata, samples)
+    assert result["estimate"] == pytest.approx(expected[0], abs=0.01)
+    assert result["ci_low"] == pytest.approx(expected[1], abs=0.01)
+    assert result["ci_high"] == pytest.approx(expected[2], abs=0.01)
+    assert estimator.size == sum(len(s) for s in samples.values())
+
+
+def test_full_population_has_no_uncertainty():
+    strata = _strata({"A": 3, "B": 2})
+    estimator = StratifiedEstimate(strata)
+    scores = {"A": [100, 0, 100], "B": [0, 0]}
+    for name, members in strata.items():
+        for (ds_name, index, _), score in zip(members, scores[name]):
+            estimator.add(ds_name, index, score)
+    result = estimator.result()
+    # Anteile 3/5 und 2/5, Mittel 66.67 und 0
+    assert result == {"estimate": 40.0, "ci_low": 40.0, "ci_high": 40.0}
+
+
+def test_finite_population_correction_narrows_interval():
+    small, large = _strata({"A": 12}), _strata({"A": 10000})
+    intervals = []
+    for strata in (small, large):
+        estimator = StratifiedEstimate(strata)
+        for i, (ds_name, index, _) in enumerate(strata["A"][:10]):
+            estimator.add(ds_name, index, 100 if i % 2 else 0)
+        result = estimator.result()
+        intervals.append(result["ci_high"] - result["ci_low"])
+    assert intervals[0] < intervals[1] * 0.5
+
+
+def test_no_estimate_until_every_stratum_has_two_items():
+    strata = _strata({"A": 10, "B": 10})
+    estimator = StratifiedEstimate(strata)
+    for ds_name, index, _ in strata["A"][:5]:
+        estimator.add(ds_name, index, 100)
+    estimator.add(*strata["B"][0][:2], 0)
+    assert estimator.result() is None
+    estimator.add(*strata["B"][1][:2], 100)
+    assert estimator.result() is not None
+
+
+def test_interval_covers_true_score_most_of_the_time():
+    rng = random.Random(11)
+    strata = _strata({"A": 300, "B": 200, "C": 100})
+    truth = {key[:2]: (100 if rng.random() < p else 0)
+             for name, p in (("A", 0.9), ("B", 0.5), ("C", 0.2)) for key in strata[name]}
+    true_score = sum(truth.values()) / len(truth)
+    covered = 0
+    for seed in range(200):
+        estimator = StratifiedEstimate(strata)
+        for ds_name, index in draw_order(strata, seed)[:80]:
+            estimator.add(ds_name, index, truth[(ds_name, index)])
+        result = estimator.result()
+        covered += result["ci_low"] <= true_score <= result["ci_high"]
+    assert covered >= 180
+
+
+def test_draw_order_prefixes_are_proportional():
+    strata = _strata({"A": 60, "B": 30, "C": 10})
+    order = draw_order(strata, seed=1)
+    assert sorted(order) == sorted(key[:2] for members in strata.values() for key in members)
+    counts = Counter(index[0] for _, index in order[:50])
+    assert counts == {"A": 30, "B": 15, "C": 5}
+    assert order == draw_order(strata, seed=1)
+
+
+def test_build_strata_skips_zero_weights_and_rejects_empty_suites(workdir):
+    write_dataset(workdir, "a.json", [
+        {"prompt": "p1", "category": "X", "weight": 0},
+        {"prompt": "p2", "category": "Y"},
+    ])
+    write_dataset(workdir, "zero.json", [{"prompt": "p", "weight": 0}])
+    write_dataset(workdir, "neg.json", [{"prompt": "p", "weight": -1}])
+    assert build_strata(["a.json"]) == {"Y": [("a.json", 1, 1.0)]}
+    for name in ("zero.json", "neg.json"):
+        with pytest.raises(ValueError):
+            build_strata([name])
+
+
+def test_run_sample_stops_on_ci_and_stores_estimate(workdir, fake_ollama):
+    items = [
+        {"id": f"i{i}", "category": "AB"[i % 2], "prompt": f"frage {i}", "expected_keywords": ["ja"]}
+        for i in range(400)
+    ]
+    write_dataset(workdir, "a.json", items[:200])
+    write_dataset(workdir, "b.json", items[200:])
+    responses = {it["prompt"]: "ja" if it["category"] == "A" else "nein" for it in items}
+    _, url = fake_ollama(models=["m"], responses=responses, latency="0", tps="100000", tokens=5)
+    write_config(workdir, f'providers:\n  ollama:\n    host: "{url}"\n    concurrency: 4\n')
+
+    estimates = []
+    run = run_sample("m", ["a.json", "b.json"], cache_policy="bypass", ci_width=5, seed=3,
+                     on_estimate=estimates.append)
+    assert run["run_type"] == "sample" and run["status"] == "complete"
+    # Innerhalb der Schichten streut nichts: nach der Mindeststichprobe ist das Intervall 0 breit
+    assert run["stop_reason"] == "ci"
+    assert run["estimate"] == 50.0 and run["ci_low"] == run["ci_high"] == 50.0
+    assert run["sample_size"] == run["item_count"] < 400
+    assert estimates[-1]["sample_size"] == run["sample_size"]
+
+
+def test_run_sample_rejects_suite_without_weight(workdir):
+    write_dataset(workdir, "zero.json", [{"prompt": "p", "weight": 0}])
+    with pytest.raises(ValueError):
+        run_sample("m", ["zero.json"], cache_policy="bypass")
@@ -0,0 +1,80 @@
+import random
+import re
+
+from core.scoring import KeywordMatcher, KeywordStream, score_batch, score_response
+
+
+def _reference_matches(response, keywords):
+    """Das ursprüngliche Scoring: ein Regex-Scan pro Keyword über den ganzen Text."""
+    low = response.lower()
+    return [kw for kw in keywords if re.search(rf"\b{re.escape(kw.lower())}\b", low)]
+
+
+# Keywords mit Regex-Sonderzeichen, Nicht-Wortzeichen am Rand, Groß/Klein-Dubletten
+# und Zeichen, die lower() verlängert (İ) oder nicht faltet (ß)
+TRICKY_KEYWORDS = [
+    "baum", "Baum", "baumhaus", "c++", "c", "a.b", "x-y", "-", "(", "Straße", "ß",
+    "İstanbul", "über", "_id", "a b", "3.5", "",
+]
+TRICKY_WORDS = TRICKY_KEYWORDS + ["Baumhaus.", "C++11", "axb", "x-yz", "istanbul", "uber", "id", " ", "\n", "...", "ss"]
+
+
+def test_matcher_is_equivalent_to_regex_search():
+    rng = random.Random(11)
+    for _ in range(2000):
+        keywords = rng.sample(TRICKY_KEYWORDS, rng.randint(1, 5))
+        response = rng.choice(["", " "]).join(rng.choice(TRICKY_WORDS) for _ in range(rng.randint(0, 12)))
+        expected = _reference_matches(response, keywords)
+        found = KeywordMatcher(keywords).find(response.lower())
+        assert [kw for kw in keywords if kw.lower() in found] == expected, (keywords, response)
+        assert score_response(response or " ", keywords)["matches"] == _reference_matches(response or " ", keywords)
+
+
+def test_score_batch_matches_single_scoring():
+    rng = random.Random(5)
+    keyword_sets = [rng.sample(TRICKY_KEYWORDS, 3) for _ in range(50)]
+    responses = [" ".join(rng.choice(TRICKY_WORDS) for _ in range(8)) for _ in range(50)]
+    expected = [score_response(r, k) for r, k in zip(responses, keyword_sets)]
+    assert score_batch(responses, keyword_sets, workers=1) == expected
+    assert score_batch(responses, keyword_sets, workers=2) == expected
+
+
+def _confirmed(text, keywords):
+    """Referenz: jedes Keyword hat einen Wortgrenzen-Treffer, hinter dem noch ein Zeichen steht."""
+    low = text.lower()
+    return all(
+        any(m.end() < len(low) for m in re.finditer(rf"\b{re.escape(kw.lower())}\b", low))
+        for kw in keywords
+    )
+
+
+def test_stream_needs_the_character_after_a_match():
+    stream = KeywordStream(["foo"])
+    assert not stream.feed("a foo")
+    assert not stream.feed("b")        # "foob": kein Treffer
+    assert not stream.feed(" foo")
+    assert stream.feed(".")
+
+
+def test_stream_matches_across_chunk_boundaries():
+    stream = KeywordStream(["Quantenmechanik", "ß"])
+    for piece in ["Die Quanten", "mech", "anik und ", "ß", " "]:
+        complete = stream.feed(piece)
+    assert complete
+
+
+def test_stream_agrees_with_full_rescan_for_random_chunking():
+    rng = random.Random(7)
+    words = ["alpha", "beta", "alphabet", "gamma", "Delta", "ßtraße", "x"]
+    for _ in range(300):
+        keywords = rng.sample(words, rng.randint(1, 3))
+        text = " ".join(rng.choice(words + ["foo", "-", "."]) for _ in range(rng.randint(1, 15)))
+        stream = KeywordStream(keywords)
+        pos = 0
+        while pos < len(text):
+            step = rng.randint(1, 6)
+            complete = stream.feed(text[pos:pos + step])
+            pos += step
+            assert complete == _confirmed(text[:pos], keywords), (keywords, text[:pos])
+        if stream.feed(" "):
+            assert score_response(text, keywords)["score"] == 100
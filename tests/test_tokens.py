@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from core import tokens
+from core.executor import evaluate_item
+from core.tokens import ESTIMATED, HEURISTIC, SERVER_REPORTED, TokenCounter, estimate_tokens
+
+
+class _FakeEncoding:
+    def encode_ordinary(self, text):
+        return text.split()
+
+    def encode_ordinary_batch(self, texts, num_threads=1):
+        return [t.split() for t in texts]
+
+
+@pytest.fixture
+def fake_tiktoken(monkeypatch):
+    """tiktoken-Ersatz: "slow" lädt (wie ein Download) erst nach dem Setzen von `release`."""
+    release = threading.Event()
+
+    class FakeTiktoken:
+        @staticmethod
+        def get_encoding(name):
+            if name == "slow":
+                release.wait(5)
+            if name == "broken":
+                raise ValueError("kein Netz")
+            return _FakeEncoding()
+
+    monkeypatch.setattr(tokens, "tiktoken", FakeTiktoken)
+    monkeypatch.setattr(tokens, "_encodings", {})
+    monkeypatch.setattr(tokens, "_loaders", {})
+    monkeypatch.setattr(tokens, "LOAD_WAIT", 0.2)
+    yield release
+    release.set()
+
+
+def test_heuristic_splits_long_words_digits_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Hallo, Welt!") == 4
+    assert estimate_tokens("1234567") == 3
+    assert estimate_tokens("Donaudampfschifffahrt") == 4
+
+
+def test_slow_encoding_falls_back_without_blocking_others(fake_tiktoken, tmp_path):
+    started = time.monotonic()
+    slow = TokenCounter("slow", cache_path=str(tmp_path / "t.db"))
+    assert slow.name == HEURISTIC
+    assert slow.count("eins zwei drei") == estimate_tokens("eins zwei drei")
+    fast = TokenCounter("fast", cache_path=str(tmp_path / "t.db"))
+    assert fast.name == "fast"
+    assert time.monotonic() - started < 1.5
+
+    # Fertig geladen: erst ein neuer Zähler (nächster Run) benutzt das Encoding
+    fake_tiktoken.set()
+    tokens._loaders["slow"].wait(2)
+    assert slow.name == HEURISTIC
+    assert TokenCounter("slow").name == "slow"
+
+
+def test_failed_encoding_is_remembered_as_heuristic(fake_tiktoken):
+    assert TokenCounter("broken").name == HEURISTIC
+    assert tokens._encodings["broken"] is None
+
+
+class _SpyCounter(TokenCounter):
+    def __init__(self, **kwargs):
+        super().__init__("fast", **kwargs)
+        self.prompts = []
+
+    def prompt_count(self, prompt):
+        self.prompts.append(prompt)
+        return super().prompt_count(prompt)
+
+
+def test_prompts_are_counted_only_without_server_counts(fake_tiktoken, tmp_path):
+    counter = _SpyCounter(cache_path=str(tmp_path / "t.db"))
+    item = {"id": "a", "prompt": "eins zwei drei", "expected_keywords": []}
+    reported = {"response": "vier", "metrics": {"token_count": 1, "prompt_tokens": 9}}
+    result = evaluate_item(item, reported, 0, 0.1, counter)
+    assert counter.prompts == []
+    assert result["metrics"]["prompt_tokens"] == 9
+    assert result["metrics"]["prompt_token_source"] == SERVER_REPORTED
+
+    result = evaluate_item(item, {"response": "vier", "metrics": {"token_count": 1}}, 0, 0.1, counter)
+    assert counter.prompts == ["eins zwei drei"]
+    assert result["metrics"]["prompt_tokens"] == 3
+    assert result["metrics"]["prompt_token_source"] == ESTIMATED
+    assert result["metrics"]["tokenizer"] == "fast"
+
+
+def test_prompt_counts_are_cached_by_content(fake_tiktoken, tmp_path):
+    cache_path = str(tmp_path / "t.db")
+    assert TokenCounter("fast", cache_path=cache_path).prompt_count("a b c") == 3
+
+    class NoEncoding(TokenCounter):
+        def count_batch(self, texts):
+            raise AssertionError("sollte aus dem Cache kommen")
+
+    assert NoEncoding("fast", cache_path=cache_path).prompt_count("a b c") == 3
@@ -0,0 +1,104 @@
+import pytest
+
+from adapters.transport import HttpTransport, TransportError
+from core.executor import create_client
+from core.runner import execute_suite, load_config
+from devtools.fake_ollama import FakeOllama
+from tests.conftest import write_config, write_dataset
+
+
+class FlakyOllama(FakeOllama):
+    """Die ersten `failures` Chat-Requests schlagen fehl, danach antwortet der Server normal."""
+
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    def _draw(self):
+        draw = super()._draw()
+        with self._lock:
+            if self.failures > 0:
+                self.failures -= 1
+                draw["error"] = True
+        return draw
+
+
+@pytest.fixture
+def flaky_ollama():
+    servers = []
+
+    def start(failures, **kwargs):
+        server = FlakyOllama(failures, models=["m"], **kwargs)
+        servers.append(server)
+        return server, server.start()
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def _chat(url):
+    return f"{url}/api/chat", {"model": "m", "messages": [{"role": "user", "content": "p"}], "stream": False}
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retry_after_is_honored_and_retries_counted(flaky_ollama, status):
+    server, url = flaky_ollama(2, error_status=status, retry_after=0)
+    # Ohne Retry-After läge der Backoff zufällig zwischen 0 und mehreren Sekunden
+    transport = HttpTransport(max_retries=3, backoff_base=5.0)
+    response, call = transport.post(*_chat(url))
+    assert response.status_code == 200
+    assert call["retries"] == 2 and call["backoff_time"] == 0.0
+    assert transport.stats["retries"] == 2
+    assert server.stats()["chat_requests"] == 3
+
+
+def test_retry_after_is_capped_by_backoff_max(flaky_ollama):
+    _, url = flaky_ollama(1, error_status=503, retry_after=30)
+    transport = HttpTransport(max_retries=1, backoff_max=0.05)
+    _, call = transport.post(*_chat(url))
+    assert call["retries"] == 1 and call["backoff_time"] == pytest.approx(0.05)
+
+
+def test_retries_are_exhausted_then_reported(fake_ollama):
+    server, url = fake_ollama(models=["m"], error_rate=1.0, error_status=429, retry_after=0)
+    transport = HttpTransport(max_retries=2)
+    with pytest.raises(TransportError) as error:
+        transport.post(*_chat(url))
+    assert error.value.retries == 2
+    assert server.stats()["errors"] == 3
+
+
+def test_non_retryable_status_fails_immediately(fake_ollama):
+    server, url = fake_ollama(models=["m"], error_rate=1.0, error_status=500)
+    transport = HttpTransport(max_retries=3, backoff_base=5.0)
+    with pytest.raises(TransportError) as error:
+        transport.post(*_chat(url))
+    assert error.value.retries == 0
+    assert server.stats()["errors"] == 1
+
+
+def test_keep_alive_connections_are_reused(fake_ollama):
+    _, url = fake_ollama(models=["m"])
+    transport = HttpTransport()
+    reused = [transport.post(*_chat(url))[1]["connection_reused"] for _ in range(3)]
+    assert reused == [False, True, True]
+    assert transport.stats["new_connections"] == 1 and transport.stats["reused_connections"] == 2
+
+
+def test_http_pool_grows_with_run_concurrency(workdir):
+    write_config(workdir, 'providers:\n  ollama:\n    host: "http://127.0.0.1:1"\n    transport:\n      pool_size: 4\n')
+    config = load_config()
+    assert create_client("m", config, concurrency=16).transport.settings["pool_size"] == 16
+    assert create_client("m", config, concurrency=2).transport.settings["pool_size"] == 4
+
+
+def test_run_reaches_configured_concurrency_on_the_server(workdir, fake_ollama):
+    server, url = fake_ollama(models=["m"], latency="0.3", tps="100000", tokens=3)
+    write_config(workdir, f'providers:\n  ollama:\n    host: "{url}"\n    concurrency: 16\n')
+    write_dataset(workdir, "d.json", [{"id": f"i{i}", "prompt": f"p{i}"} for i in range(32)])
+    results = []
+    execute_suite("m", ["d.json"], load_config(), cache_policy="bypass",
+                  on_result=lambda ds_name, result: results.append(result))
+    assert len(results) == 32 and not any(r.get("error") for r in results)
+    assert server.stats()["max_in_flight"] == 16
@@ -1,9 +1,10 @@
-import yaml
 from textual.app import ComposeResult
 from textual.screen import Screen
 from textual.widgets import Header, Footer, TextArea, Label, Button
 from textual.containers import Container, Horizontal
 
+from core.config_loader import ConfigError, ConfigLoader
+
 class ConfigScreen(Screen):
     """Ein einfacher YAML-Editor für die config.yaml."""
     BINDINGS = [("escape", "app.pop_screen", "Abbrechen"), ("ctrl+s", "save_config", "Speichern")]
@@ -30,14 +31,15 @@ class ConfigScreen(Screen):
     def action_save_config(self):
         text = self.query_one(TextArea).text
         try:
-            # Validierung: Ist es gültiges YAML?
-            yaml.safe_load(text)
-            with open("config/config.yaml", "w", encoding="utf-8") as f:
-                f.write(text)
+            # Validiert gegen das Schema, schreibt atomar und lädt die Config
+            # prozessweit neu; laufende Screens sehen den neuen Stand sofort
+            ConfigLoader().save_text(text)
             self.app.notify("Konfiguration erfolgreich gespeichert!", title="Erfolg")
             self.app.pop_screen()
+        except ConfigError as e:
+            self.app.notify("\n".join(e.problems), title="Ungültige Konfiguration", severity="error")
         except Exception as e:
-            self.app.notify(f"Ungültiges YAML: {e}", title="Fehler", severity="error")
+            self.app.notify(f"Speichern fehlgeschlagen: {e}", title="Fehler", severity="error")
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "save-btn":
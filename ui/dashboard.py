@@ -3,9 +3,9 @@ from textual.screen import Screen
 from textual.widgets import Header, Footer, Label
 from textual.containers import Grid, Container
 from textual import work
-import requests
 
-from core.scoring import score_response
+from core.inventory import get_inventory
+from core.runner import load_config
 from ui.config_editor import ConfigScreen
 from ui.datasets import DatasetScreen
 from ui.models import ModelScreen
@@ -43,24 +43,39 @@ class WelcomeScreen(Screen):
         yield Footer()
 
     def on_mount(self) -> None:
+        self.refresh_provider_status()
+
+    def on_screen_resume(self) -> None:
+        # Zurück aus dem Config-Editor: Host kann sich geändert haben
+        self.refresh_provider_status()
+
+    def refresh_provider_status(self):
+        self.inventory = get_inventory(load_config())
+        # Sofort den bekannten Stand zeigen, aktualisiert wird im Hintergrund
+        self.show_provider_status(self.inventory.snapshot())
         self.check_provider_status()
 
-    @work(exclusive=True, thread=True)
-    def check_provider_status(self):
+    def show_provider_status(self, state):
         status_lines = []
-        try:
-            requests.get("http://localhost:11434/api/tags", timeout=1)
-            status_lines.append("Ollama: [#14baba]online[/]")
-            self.ollama_online = True
-        except:
+        if state["online"] is None:
+            status_lines.append("Ollama: [#e89f46]checking...[/]")
+        elif state["online"]:
+            loaded = sum(1 for m in state["models"] if m["loaded"])
+            status_lines.append(f"Ollama: [#14baba]online[/] ({len(state['models'])} Modelle, {loaded} geladen)")
+        else:
             status_lines.append("Ollama: [#ff4b4b]offline[/]")
-            self.ollama_online = False
+        self.ollama_online = bool(state["online"])
 
-        status_lines.append("OpenAI: [#e89f46]configured[/]") 
+        status_lines.append("OpenAI: [#e89f46]configured[/]")
 
         status_label = self.query_one("#status-label")
         status_label.update("\n".join(status_lines))
 
+    @work(exclusive=True, thread=True)
+    def check_provider_status(self):
+        state = self.inventory.get()
+        self.app.call_from_thread(self.show_provider_status, state)
+
     async def action_show_tests(self):
         self.app.push_screen(ResultArchiveScreen())
 
@@ -1,10 +1,10 @@
-import json
-import os
 from textual.app import ComposeResult
 from textual.screen import Screen 
 from textual.widgets import Header, Footer, Label, DataTable
 from textual.containers import Container 
 from textual import work
+from core.datasets import DATASET_DIR, load_manifests
+import os
 
 
 class DatasetScreen(Screen):
@@ -20,26 +20,25 @@ class DatasetScreen(Screen):
 
     def on_mount(self) -> None:
         table = self.query_one("#dataset-table")
-        table.add_columns("DATEI", "PROMPTS", "VORSCHAU")
+        table.add_columns("DATEI", "PROMPTS", "KATEGORIEN", "GEWICHT", "VORSCHAU")
         table.cursor_type = "row"
         self.load_datasets()
 
     @work(exclusive=True, thread=True)
     def load_datasets(self):
         table = self.query_one(DataTable)
-        dataset_dir = "datasets"
         
-        if not os.path.exists(dataset_dir):
+        if not os.path.exists(DATASET_DIR):
             self.app.notify("Ordner /datasets nicht gefunden!", severity="error")
             return
 
-        for file in os.listdir(dataset_dir):
-            if file.endswith(".json"):
-                try:
-                    with open(os.path.join(dataset_dir, file), "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                        count = len(data)
-                        preview = data[0].get("prompt", "")[:40] + "..." if data else "Leer"
-                        table.add_row(file, str(count), preview)
-                except Exception:
-                    table.add_row(file, "Fehler", "Datei konnte nicht gelesen werden")
+        # Manifest-Cache: nur geänderte Dateien werden neu gelesen; die Tabelle wird am Ende in einem Schritt gefüllt
+        rows = []
+        for file, entry in load_manifests().items():
+            if entry.get("error"):
+                rows.append((file, "Fehler", "-", "-", "Datei konnte nicht gelesen werden"))
+                continue
+            categories = ", ".join(f"{name} ({n})" for name, n in entry["categories"].items())
+            preview = entry["preview"] + "..." if entry["count"] else "Leer"
+            rows.append((file, str(entry["count"]), categories or "-", f"{entry['total_weight']}", preview))
+        self.app.call_from_thread(table.add_rows, rows)
@@ -1,4 +1,55 @@
 from textual.message import Message
 
+class BenchmarkProgress(Message):
+    """Gedrosselter Zwischenstand eines laufenden Benchmarks: Zähler, Durchsatz, ETA, p95 (siehe core.progress)."""
+
+    def __init__(self, snapshot):
+        super().__init__()
+        self.snapshot = snapshot
+
+# Einzelne Items, im Takt von BenchmarkProgress gesammelt (eine Meldung pro Art und Intervall)
+class ItemsStarted(Message):
+    def __init__(self, items):
+        super().__init__()
+        self.items = items
+
+class ItemsFinished(Message):
+    def __init__(self, items):
+        super().__init__()
+        self.items = items
+
+class ItemsFailed(Message):
+    def __init__(self, items):
+        super().__init__()
+        self.items = items
+
+ITEM_MESSAGES = {"started": ItemsStarted, "finished": ItemsFinished, "failed": ItemsFailed}
+
 class BenchmarkFinished(Message):
-    pass
\ No newline at end of file
+    """Run ist abgeschlossen oder nach Abbruch als "partial" gespeichert."""
+
+    def __init__(self, run):
+        super().__init__()
+        self.run = run
+
+class BenchmarkFailed(Message):
+    def __init__(self, error):
+        super().__init__()
+        self.error = error
+
+class ExportProgress(Message):
+    def __init__(self, done, total):
+        super().__init__()
+        self.done = done
+        self.total = total
+
+class ExportFinished(Message):
+    def __init__(self, path, count):
+        super().__init__()
+        self.path = path
+        self.count = count
+
+class ExportFailed(Message):
+    def __init__(self, error):
+        super().__init__()
+        self.error = error
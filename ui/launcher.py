@@ -1,9 +1,12 @@
-import os
-import subprocess
+from textual import work
 from textual.screen import Screen
-from textual.widgets import Header, Footer, SelectionList, Label, Button
+from textual.widgets import Header, Footer, SelectionList, Label, Button, Select
 from textual.widgets.selection_list import Selection
 from textual.containers import Container, Horizontal
+from core.datasets import load_manifests
+from core.inventory import get_inventory
+from core.response_cache import BYPASS, POLICIES, READ_ONLY, READ_WRITE
+from core.runner import load_config
 
 class LauncherScreen(Screen):
     BINDINGS = [("escape", "app.pop_screen", "Abbrechen")]
@@ -17,11 +20,23 @@ class LauncherScreen(Screen):
         with Container(classes="main-container"):
             yield Label("TEST KONFIGURIEREN", classes="panel-title-text")
             
-            yield Label("1. Modell (Ollama):", classes="stat-line")
+            yield Label("1. Modell(e) (Ollama, mehrere = Matrix-Vergleich):", classes="stat-line")
             yield SelectionList(id="select-model")
             
             yield Label("\n2. Datasets:", classes="stat-line")
             yield SelectionList(id="select-datasets")
+
+            yield Label("\n3. Antwort-Cache:", classes="stat-line")
+            yield Select(
+                [("Umgehen (jede Antwort neu messen)", BYPASS), ("Nur lesen", READ_ONLY), ("Lesen & Schreiben", READ_WRITE)],
+                value=BYPASS, allow_blank=False, id="select-cache"
+            )
+
+            yield Label("\n4. Umfang:", classes="stat-line")
+            yield Select(
+                [("Alle Items", "full"), ("Stichprobe bis zum Konfidenzintervall (sampling in config.yaml)", "sample")],
+                value="full", allow_blank=False, id="select-mode"
+            )
             
             with Horizontal(classes="button-bar"):
                 yield Button("TEST STARTEN", variant="success", id="start-btn")
@@ -29,23 +44,48 @@ class LauncherScreen(Screen):
         yield Footer()
 
     def on_mount(self):
-        # Modelle laden
-        m_list = self.query_one("#select-model")
-        try:
-            res = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
-            for line in res.stdout.strip().split('\n')[1:]:
-                if line:
-                    name = line.split()[0]
-                    m_list.add_option(Selection(name, name))
-        except:
-            m_list.add_option(Selection("Ollama offline", "none"))
-
-        # Datasets laden
+        config = load_config()
+        # Modelle aus dem geteilten Bestand (blockiert nie, lädt notfalls im Hintergrund nach)
+        self.inventory = get_inventory(config)
+        state = self.inventory.snapshot()
+        if state["online"] is None:
+            self.load_models()
+        else:
+            self.show_models(state)
+
+        # Cache-Policy aus der Config vorbelegen
+        policy = (config.get_app_settings().get("cache") or {}).get("policy") if config else None
+        if policy in POLICIES:
+            self.query_one("#select-cache").value = policy
+
+        # Datasets im Hintergrund laden: geänderte Dateien werden dabei neu gelesen
+        self.query_one("#select-datasets").add_option(Selection("Datasets werden gelesen...", "none", disabled=True))
+        self.load_datasets()
+
+    def show_datasets(self, manifests):
         d_list = self.query_one("#select-datasets")
-        if os.path.exists("datasets"):
-            for f in os.listdir("datasets"):
-                if f.endswith(".json"):
-                    d_list.add_option(Selection(f, f))
+        d_list.clear_options()
+        for f, entry in manifests.items():
+            d_list.add_option(Selection(f"{f} ({entry['count']} Prompts)", f))
+
+    @work(exclusive=True, thread=True, group="datasets")
+    def load_datasets(self):
+        manifests = load_manifests()
+        self.app.call_from_thread(self.show_datasets, manifests)
+
+    def show_models(self, state):
+        m_list = self.query_one("#select-model")
+        m_list.clear_options()
+        if not state["online"]:
+            m_list.add_option(Selection("Ollama offline", "none", disabled=True))
+            return
+        for m in state["models"]:
+            m_list.add_option(Selection(m["name"], m["name"]))
+
+    @work(exclusive=True, thread=True)
+    def load_models(self):
+        state = self.inventory.get()
+        self.app.call_from_thread(self.show_models, state)
 
     def on_button_pressed(self, event):
         if event.button.id == "cancel-btn":
@@ -57,24 +97,30 @@ class LauncherScreen(Screen):
         
         models = self.query_one("#select-model").selected
         datasets = self.query_one("#select-datasets").selected
+        cache_policy = self.query_one("#select-cache").value
+        sample = self.query_one("#select-mode").value == "sample"
         
         if not models or not datasets:
             self.app.notify("Bitte Modell und Dataset auswählen.", severity="warning")
             return
+
+        if sample and len(models) > 1:
+            self.app.notify("Stichproben-Runs gibt es nur für ein Modell.", severity="warning")
+            return
         
-        model_name = models[0]
+        model_names = ", ".join(models)
         dataset_names = ", ".join(datasets)
 
         from ui.results import ResultArchiveScreen
         for screen in self.app.screen_stack:
             if isinstance(screen, ResultArchiveScreen):
-                screen.show_loading_state()
-                screen.run_benchmark(model_name, datasets)
+                screen.start_benchmark(list(models), datasets, cache_policy, sample=sample)
                 break
 
+        title = f"Matrix-Run mit {model_names} gestartet" if len(models) > 1 else f"Benchmark mit {model_names} gestartet"
         self.app.notify(
             f"Test von: {dataset_names}", 
-            title=f"Benchmark mit {model_name} gestartet", 
+            title=title, 
             severity="warning"
         )
 
@@ -1,36 +1,387 @@
+from textual import work
 from textual.screen import ModalScreen
-from textual.widgets import DataTable, Label, Button
+from datetime import datetime
+
+from textual.widgets import DataTable, Label, Button, TextArea, Select, Input
 from textual.containers import Container, Horizontal
+from core.export import DEFAULT_COLUMNS, FORMATS, ExportError, format_for, parse_columns
+from core.history_manager import load_run_details, load_texts
+from core.profiling import MODEL_PHASES
+from core.regression import TrendReader, compare_runs
+from core.tokens import ESTIMATED
+
+DETAIL_PAGE_SIZE = 200
+# Spalten-Key -> Sortierschlüssel in history_manager (nur sortierbare Spalten)
+DETAIL_SORT_KEYS = {"id": "id", "score": "score"}
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+FLAG_LABELS = {"score_down": "Score ↓", "score_up": "Score ↑", "slower": "langsamer", "faster": "schneller"}
+
+def _seconds(value):
+    return "-" if value is None else f"{value:.2f}"
+
+def _sparkline(values):
+    """Score-Verlauf (0-100) als Blockzeichen."""
+    return "".join(SPARK_CHARS[min(int(v / 100 * len(SPARK_CHARS)), len(SPARK_CHARS) - 1)] for v in values)
+
+BAR_EIGHTHS = " ▏▎▍▌▋▊▉"
+STOP_LABELS = {"plateau": "kein Durchsatzgewinn mehr", "latency": "p95 zu hoch", "errors": "zu viele Fehler"}
+SAMPLE_STOP_LABELS = {
+    "ci": "Intervall schmal genug", "time": "Zeit-Budget", "tokens": "Token-Budget", "exhausted": "alle Items gelaufen",
+}
+
+def _bar(value, maximum, width):
+    """Horizontaler Balken mit Achtel-Auflösung."""
+    if not value or not maximum:
+        return ""
+    eighths = round(value / maximum * width * 8)
+    return "█" * (eighths // 8) + BAR_EIGHTHS[eighths % 8].strip()
 
 class RunDetailModal(ModalScreen):
     def __init__(self, run_data):
         super().__init__()
         self.run_data = run_data
+        self.sort_key = "seq"
+        self.sort_desc = False
+        # Zeilen-Key -> (prompt_hash, response_hash); Texte werden erst beim Aufklappen geladen
+        self._text_refs = {}
+        self._expanded = None
 
     def compose(self):
         with Container(classes="main-container", id="modal-container"):
             yield Label(f"DETAILS: {self.run_data['model']} ({self.run_data['timestamp']})", classes="panel-title-text")
+            yield Label(self._latency_summary(), classes="modal-text")
+            if self.run_data.get("run_type") == "matrix":
+                yield Label(self._matrix_summary(), classes="modal-text")
+            if self.run_data.get("run_type") == "probe":
+                yield Label(self._probe_chart(), classes="modal-text")
+            if "sampling" in self.run_data:
+                yield Label(self._sample_summary(), classes="modal-text")
             yield DataTable(id="detail-table")
+            yield TextArea(read_only=True, id="detail-text", classes="modal-text-area")
             with Horizontal(classes="button-bar"):
                 yield Button("Schließen", variant="primary", id="close-btn")
 
+    def _latency_summary(self):
+        r = self.run_data
+        lines = [
+            f"Dauer p50/p90/p99: {r.get('duration_p50', '-')} / {r.get('duration_p90', '-')} / {r.get('duration_p99', '-')} s"
+        ]
+        if "ttft_p50" in r:
+            lines.append(f"TTFT p50/p90/p99: {r['ttft_p50']} / {r['ttft_p90']} / {r['ttft_p99']} s")
+        if "avg_gen_time" in r:
+            lines.append(
+                f"Ø Laden {r.get('avg_load_time', 0)}s | Ø Prompt {r.get('avg_prompt_time', 0)}s | "
+                f"Ø Generierung {r.get('avg_gen_time', 0)}s | Ø Netzwerk/Harness {r.get('avg_overhead', 0)}s"
+            )
+        if "throughput_items_per_s" in r:
+            lines.append(
+                f"Durchsatz: {r['throughput_items_per_s']} Items/s | {r['throughput_tokens_per_s']} Tokens/s "
+                f"(Wanduhr {r['wall_time']}s)"
+            )
+        if r.get("cache_hits"):
+            lines.append(f"Antwort-Cache: {r['cache_hits']} von {r.get('item_count', '?')} Items nicht neu gemessen")
+        if "profile" in r:
+            lines.append(self._profile_line(r["profile"]))
+        for host, stats in r.get("hosts", {}).items():
+            lines.append(
+                f"{host}: {stats['items']} Items | {stats['errors']} Fehler | Ø Dauer {stats['avg_duration']}s"
+                + (f" | {stats['items_per_s']} Items/s" if "items_per_s" in stats else "")
+            )
+        return "\n".join(lines)
+
+    @staticmethod
+    def _profile_line(profile):
+        """Harness-Anteil und die drei teuersten Harness-Phasen (Eigenzeit)."""
+        harness = sorted(
+            ((name, p["self"]) for name, p in profile["phases"].items() if name not in MODEL_PHASES),
+            key=lambda entry: entry[1], reverse=True
+        )[:3]
+        top = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in harness if round(seconds, 2))
+        return (
+            f"Harness-Anteil: {profile['harness_pct']}% (Modell {profile['model_time']}s, "
+            f"Harness {profile['harness_time']}s)" + (f" | größte Posten: {top}" if top else "")
+        )
+
+    def _sample_summary(self):
+        """Schätzung der Stichprobe; bei einem erweiterten Run die ursprüngliche Schätzung."""
+        r = self.run_data
+        result = r["sampling"].get("result") or r
+        if result.get("estimate") is None:
+            return "Stichprobe: noch keine Schätzung (zu wenige Items pro Kategorie)."
+        confidence = round(r["sampling"]["confidence"] * 100)
+        line = (
+            f"Stichprobe: gewichteter Score ≈ {result['estimate']}% ({confidence}%-Intervall "
+            f"{result['ci_low']} – {result['ci_high']}) aus {result['sample_size']} von {r.get('population', '?')} Items"
+            f" | Ende: {SAMPLE_STOP_LABELS.get(result.get('stop_reason'), result.get('stop_reason') or '-')}"
+        )
+        if "result" in r["sampling"]:
+            line += f"\nZum vollständigen Run erweitert: Ø Score {r['avg_score']}% über {r['item_count']} Items"
+        return line
+
+    def _matrix_summary(self):
+        lines = []
+        for model, summary in self.run_data.get("model_summaries", {}).items():
+            lines.append(
+                f"{model}: Ø Score {summary['avg_score']}% | Ø Dauer {summary['avg_duration']}s | Ø TPS {summary['avg_tps']}"
+            )
+        return "\n".join(lines)
+
+    def _probe_chart(self):
+        """Durchsatz und p95 je Concurrency-Stufe als Balken, der Knick markiert."""
+        levels = self.run_data.get("levels", [])
+        if not levels:
+            return "Keine abgeschlossene Messstufe."
+        max_rate = max(l["items_per_s"] for l in levels)
+        max_p95 = max(l["duration_p95"] or 0 for l in levels)
+        lines = [f"{'Par.':>4}  {'Durchsatz (Items/s)':<34} {'p95 Dauer (s)':<22} TTFT p95"]
+        for l in levels:
+            knee = "  ◀ Knick" if l["concurrency"] == self.run_data.get("knee") else ""
+            lines.append(
+                f"{l['concurrency']:>4}  [#14baba]{_bar(l['items_per_s'], max_rate, 24):<24}[/] {l['items_per_s']:>9.2f} "
+                f"[#e89f46]{_bar(l['duration_p95'], max_p95, 14):<14}[/] {_seconds(l['duration_p95']):>7} "
+                f"{_seconds(l['ttft_p95']):>8}{knee}"
+            )
+        if self.run_data.get("stop_reason"):
+            lines.append(f"Rampe beendet: {STOP_LABELS.get(self.run_data['stop_reason'], self.run_data['stop_reason'])}")
+        return "\n".join(lines)
+
     def on_mount(self):
         table = self.query_one("#detail-table")
-        table.add_columns(
-            "ID", "Score", "Status", "Duration(s)", "Tokens", "TPS", "RespLen", "Prompt-Vorschau"
+        self.is_matrix = self.run_data.get("run_type") == "matrix"
+        columns = [
+            ("ID", "id"), ("Score", "score"), ("Status", "status"), ("Duration(s)", "duration"),
+            ("Load", "load"), ("Prompt", "prompt_time"), ("Gen", "gen"), ("Overhead", "overhead"), ("TTFT", "ttft"),
+            ("Tokens", "tokens"), ("TPS", "tps"), ("RespLen", "resp_len")
+        ]
+        if self.is_matrix:
+            columns.insert(0, ("Modell", "model"))
+        for label, key in columns:
+            table.add_column(label, key=key)
+        table.cursor_type = "row"
+        self.query_one("#detail-text").display = False
+        self.reload_details()
+
+    def reload_details(self):
+        table = self.query_one("#detail-table")
+        table.clear()
+        self._text_refs = {}
+        self._collapse_text()
+        self._loaded = 0
+        self._exhausted = False
+        self.load_next_page()
+
+    def load_next_page(self):
+        """Lädt die nächste Seite Items aus dem Run-Store (sortiert in der Datenbank)."""
+        if self._exhausted:
+            return
+        page = load_run_details(
+            self.run_data["id"], offset=self._loaded, limit=DETAIL_PAGE_SIZE,
+            sort=self.sort_key, descending=self.sort_desc, with_text=False
         )
-        for d in self.run_data["details"]:
+        self._loaded += len(page)
+        self._exhausted = len(page) < DETAIL_PAGE_SIZE
+
+        table = self.query_one("#detail-table")
+        for d in page:
             m = d.get("metrics", {})
-            table.add_row(
+            cells = [d.get("model", "-")] if self.is_matrix else []
+            row_key = table.add_row(
+                *cells,
                 d["id"],
                 f"{d['score']}%",
                 d.get("status", "⚠️"),
                 f"{round(m.get('duration',0),1)}",
-                f"{m.get('token_count',0)}",
+                *(_seconds(m.get(key)) for key in ("load_time", "prompt_time", "gen_time", "overhead", "ttft")),
+                # "~": lokal gezählt statt vom Server gemeldet
+                f"{'~' if m.get('token_source') == ESTIMATED else ''}{m.get('token_count',0)}",
                 f"{round(m.get('tps',0),1)}",
-                f"{m.get('response_length',0)}",
-                d["prompt"][:50] + "..."
+                f"{m.get('response_length',0)}"
+            )
+            self._text_refs[row_key] = (d.get("prompt_hash"), d.get("response_hash"))
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted):
+        if event.cursor_row >= event.data_table.row_count - 10:
+            self.load_next_page()
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected):
+        """Enter klappt Prompt und Antwort des Items auf (erneut Enter: zu)."""
+        if event.row_key == self._expanded:
+            self._collapse_text()
+            return
+        prompt_hash, response_hash = self._text_refs.get(event.row_key, (None, None))
+        texts = load_texts([prompt_hash, response_hash])
+        text_area = self.query_one("#detail-text")
+        text_area.load_text(
+            f"PROMPT:\n{texts.get(prompt_hash, '-')}\n\nANTWORT:\n{texts.get(response_hash, '-')}"
+        )
+        text_area.display = True
+        self._expanded = event.row_key
+
+    def _collapse_text(self):
+        self._expanded = None
+        text_area = self.query_one("#detail-text")
+        text_area.display = False
+        text_area.load_text("")
+
+    def on_data_table_header_selected(self, event: DataTable.HeaderSelected):
+        sort_key = DETAIL_SORT_KEYS.get(event.column_key.value)
+        if sort_key is None:
+            return
+        if sort_key == self.sort_key:
+            self.sort_desc = not self.sort_desc
+        else:
+            self.sort_key, self.sort_desc = sort_key, False
+        self.reload_details()
+
+    def on_button_pressed(self):
+        self.app.pop_screen()
+
+
+class RegressionModal(ModalScreen):
+    """Vergleich zweier Runs über den Item-Index: Signifikanz-Tests und auffällige Items."""
+
+    def __init__(self, base_run, new_run):
+        super().__init__()
+        self.base_run = base_run
+        self.new_run = new_run
+        self.result = None
+        # Verläufe werden erst für die markierte Zeile gelesen
+        self._items = {}
+        self._trends = TrendReader()
+
+    def compose(self):
+        with Container(classes="main-container", id="modal-container"):
+            yield Label(
+                f"VERGLEICH: {self.base_run['model']} ({self.base_run['timestamp']}) → "
+                f"{self.new_run['model']} ({self.new_run['timestamp']})",
+                classes="panel-title-text"
+            )
+            yield Label("Vergleiche Runs...", classes="modal-text", id="regression-summary")
+            yield DataTable(id="regression-table")
+            with Horizontal(classes="button-bar"):
+                yield Button("Schließen", variant="primary", id="close-btn")
+
+    def _test_summary(self):
+        r = self.result
+        score, latency = r["score"], r["latency"]
+        flagged = sum(1 for i in r["items"] if i["flags"])
+        return "\n".join([
+            f"Gemeinsame Items: {r['common_items']} (nur alt: {r['only_base']}, nur neu: {r['only_new']}) | "
+            f"auffällig: {flagged}",
+            f"Score: Ø {score['mean_delta']:+.1f} Punkte, p = {score['p']:.3f}"
+            + (" [b]signifikant[/]" if score["significant"] else ""),
+            f"Dauer: Faktor {latency['factor']:.2f}x, p = {latency['p']:.3f}"
+            + (" [b]signifikant[/]" if latency["significant"] else ""),
+        ])
+
+    def on_mount(self):
+        table = self.query_one("#regression-table")
+        for label in ("Modell", "Dataset", "ID", "Score alt", "Score neu", "Δ", "Dauer alt", "Dauer neu", "Auffällig"):
+            table.add_column(label)
+        table.add_column("Verlauf", key="trend")
+        table.cursor_type = "row"
+        self.compare()
+
+    @work(exclusive=True, thread=True, group="compare")
+    def compare(self):
+        result = compare_runs(self.base_run["id"], self.new_run["id"])
+        self.app.call_from_thread(self.show_result, result)
+
+    def show_result(self, result):
+        self.result = result
+        self.query_one("#regression-summary").update(self._test_summary())
+        table = self.query_one("#regression-table")
+        for item in result["items"]:
+            row_key = table.add_row(
+                item["model"], item["dataset"], item["item_id"],
+                f"{item['score_old']:.0f}%", f"{item['score_new']:.0f}%", f"{item['score_delta']:+.0f}",
+                _seconds(item["duration_old"]), _seconds(item["duration_new"]),
+                ", ".join(FLAG_LABELS[f] for f in item["flags"]) or "-",
+                ""
             )
+            self._items[row_key] = item
+        # Der Cursor steht schon auf der ersten Zeile, ohne dass ein Highlight-Event kam
+        if result["items"]:
+            self.load_trend(table.coordinate_to_cell_key((0, 0)).row_key)
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted):
+        self.load_trend(event.row_key)
+
+    @work(exclusive=True, thread=True, group="trend")
+    def load_trend(self, row_key):
+        item = self._items.get(row_key)
+        if item is None:
+            return
+        trend = self._trends.trend(item["model"], item["item_id"], item["dataset"], limit=20)
+        self.app.call_from_thread(self.show_trend, row_key, _sparkline([p["score"] for p in trend]))
+
+    def show_trend(self, row_key, sparkline):
+        self._items.pop(row_key, None)
+        self.query_one("#regression-table").update_cell(row_key, "trend", sparkline)
+
+    def on_unmount(self):
+        self._trends.close()
 
     def on_button_pressed(self):
-        self.app.pop_screen()
\ No newline at end of file
+        self.app.pop_screen()
+
+
+class ExportModal(ModalScreen):
+    """Fragt Format, Umfang, Spalten und Zieldatei ab; gibt die Export-Optionen oder None zurück."""
+
+    def __init__(self, selected_run, filters):
+        super().__init__()
+        self.selected_run = selected_run
+        self.filters = filters
+
+    def compose(self):
+        scopes = [("Alle Runs zum aktuellen Filter", "filtered")]
+        if self.selected_run is not None:
+            scopes.insert(0, (f"Gewählter Run: {self.selected_run['model']} ({self.selected_run['timestamp']})", "selected"))
+        with Container(classes="main-container", id="modal-container"):
+            yield Label("EXPORT", classes="panel-title-text")
+            yield Label("Format:", classes="stat-line")
+            yield Select([(f.upper(), f) for f in FORMATS], value="csv", allow_blank=False, id="export-format")
+            yield Label("Umfang:", classes="stat-line")
+            yield Select(scopes, value=scopes[0][1], allow_blank=False, id="export-scope")
+            yield Label("Spalten (leer = Standard, prompt/response zusätzlich möglich):", classes="stat-line")
+            yield Input(placeholder=",".join(DEFAULT_COLUMNS), id="export-columns")
+            yield Label("Datei:", classes="stat-line")
+            yield Input(value=self._default_path("csv"), id="export-path")
+            with Horizontal(classes="button-bar"):
+                yield Button("EXPORTIEREN", variant="success", id="export-btn")
+                yield Button("Abbrechen", variant="error", id="cancel-btn")
+
+    @staticmethod
+    def _default_path(fmt):
+        return f"exports/export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+
+    def on_select_changed(self, event: Select.Changed):
+        # Dateiendung dem Format anpassen, solange der Pfad noch der Vorschlag ist
+        if event.select.id == "export-format":
+            path = self.query_one("#export-path")
+            if path.value.startswith("exports/export_"):
+                path.value = f"{path.value.rsplit('.', 1)[0]}.{event.value}"
+
+    def on_button_pressed(self, event):
+        if event.button.id != "export-btn":
+            self.dismiss(None)
+            return
+        fmt = self.query_one("#export-format").value
+        path = self.query_one("#export-path").value.strip()
+        try:
+            format_for(path, fmt)
+            columns = parse_columns(self.query_one("#export-columns").value)
+        except ExportError as e:
+            self.app.notify(str(e), severity="error")
+            return
+        if not path:
+            self.app.notify("Bitte eine Zieldatei angeben.", severity="warning")
+            return
+        selected = self.query_one("#export-scope").value == "selected"
+        self.dismiss({
+            "path": path, "fmt": fmt, "columns": columns,
+            "run_ids": [self.selected_run["id"]] if selected else None,
+            "filters": {} if selected else self.filters,
+        })
@@ -3,7 +3,9 @@ from textual.screen import Screen
 from textual.widgets import Header, Footer, Label, DataTable
 from textual.containers import Container
 from textual import work
-import subprocess
+
+from core.inventory import format_size, get_inventory
+from core.runner import load_config
 
 
 class ModelScreen(Screen):
@@ -19,24 +21,26 @@ class ModelScreen(Screen):
 
     def on_mount(self) -> None:
         table = self.query_one(DataTable)
-        table.add_columns("NAME", "ID", "GRÖSSE", "STATUS")
+        table.add_columns("NAME", "ID", "GRÖSSE", "PARAMETER", "QUANT.", "STATUS")
         table.cursor_type = "row"
+        self.inventory = get_inventory(load_config())
+        self.show_models(self.inventory.snapshot())
         self.load_models()
 
+    def show_models(self, state):
+        table = self.query_one(DataTable)
+        table.clear()
+        if state["online"] is False:
+            self.app.notify("Ollama ist nicht erreichbar.", severity="error")
+        for m in state["models"]:
+            table.add_row(
+                m["name"], m["digest"][:12], format_size(m["size"]),
+                m["parameter_size"] or "-", m["quantization"] or "-",
+                "🟢 Geladen" if m["loaded"] else "✅ Ready"
+            )
+
     @work(exclusive=True, thread=True)
     def load_models(self):
-        table = self.query_one(DataTable)
-        try:
-            # Wir rufen 'ollama list' ab
-            result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
-            lines = result.stdout.strip().split('\n')[1:] # Header überspringen
-            
-            for line in lines:
-                parts = line.split()
-                if len(parts) >= 3:
-                    name = parts[0]
-                    model_id = parts[1]
-                    size = parts[2]
-                    table.add_row(name, model_id, size, "✅ Ready")
-        except Exception as e:
-            self.app.notify(f"Fehler beim Laden der Modelle: {e}", severity="error")
+        # Ladezustand ändert sich schnell: hier immer frisch abfragen
+        state = self.inventory.get(max_age=0)
+        self.app.call_from_thread(self.show_models, state)
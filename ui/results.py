@@ -1,55 +1,129 @@
-import json
-import os
+import threading
 import time
 
 from textual import work
 from textual.screen import Screen
-from textual.widgets import Header, Footer, DataTable, Label
+from textual.widgets import Header, Footer, DataTable, Label, Input, ProgressBar
 from textual.containers import Container
-from adapters.ollama import OllamaAdapter
-from core.history_manager import load_all_runs, save_run
-from core.scoring import score_response
+from core.datasets import load_manifests
+from core.history_manager import STATUS_PARTIAL, STATUS_RUNNING, delete_run, load_run, query_runs, run_matches
+from core.progress import ProgressTracker
+from core.runner import load_config, resume_run, run_matrix, run_suite
+from core.sampling import run_sample
+from core.export import export_items
+from core.profiling import span
+from ui.events import (
+    ITEM_MESSAGES, BenchmarkFailed, BenchmarkFinished, BenchmarkProgress, ExportFailed, ExportFinished, ExportProgress,
+    ItemsFailed,
+)
 from ui.launcher import LauncherScreen
 
+PAGE_SIZE = 100
+# Nachladen, sobald der Cursor so viele Zeilen vor dem Ende steht
+PREFETCH_ROWS = 10
+# Mindestabstand zwischen zwei Fortschritts-Updates aus dem Worker (Sekunden)
+PROGRESS_INTERVAL = 0.25
+# Fehlgeschlagene Items höchstens so oft einzeln melden (Sekunden); der Zähler läuft immer mit
+FAILURE_NOTIFY_INTERVAL = 5.0
+# Präfix in der Modell-Spalte für Sonderformen von Runs
+RUN_TYPE_LABELS = {"matrix": "[Matrix] ", "probe": "[Probe] ", "sample": "[Stichprobe] "}
+
+# Spalten-Key -> (Überschrift, Sortierschlüssel in history_manager oder None)
+HISTORY_COLUMNS = [
+    ("date", "Datum", "date"),
+    ("model", "Modell", "model"),
+    ("score", "Ø Score", "score"),
+    ("duration", "Ø Dauer(s)", "duration"),
+    ("latency", "p50/p90/p99(s)", None),
+    ("tps", "Ø TPS", "tps"),
+    ("resp_len", "Ø RespLen", None),
+    ("status", "Status", None),
+    ("datasets", "Datasets", None),
+]
+
+
+class SortableCell(str):
+    """Tabellenzelle mit eigenem Sortierwert, damit neue Zeilen lokal einsortiert werden können."""
+
+    def __new__(cls, text, sort_value):
+        cell = super().__new__(cls, text)
+        cell.sort_value = sort_value
+        return cell
+
+
+def parse_filter(text):
+    """'model:llama3 dataset:logic since:2026-01-01 until:...' -> Filter-Dict (freie Wörter = Modell)."""
+    filters = {}
+    for token in text.split():
+        key, sep, value = token.partition(":")
+        if sep and key in ("model", "dataset", "since", "until"):
+            filters[key] = value
+        else:
+            filters["model"] = token
+    return filters
+
 class ResultArchiveScreen(Screen):
     BINDINGS = [
         ("r", "launch_test", "Neuer Run"),
         ("enter", "view_details", "Details öffnen"),
         ("n", "rerun_selected", "Run erneut starten"),
+        ("f", "resume_selected", "Run fortsetzen"),
+        ("v", "compare_selected", "Runs vergleichen"),
+        ("x", "cancel_run", "Run abbrechen"),
+        ("delete", "delete_selected", "Run löschen"),
+        ("e", "export", "Exportieren"),
         ("escape", "app.pop_screen", "Zurück")
     ]
 
     def on_data_table_row_selected(self):
         self.action_view_details()
 
-    def on_benchmark_finished(self):
-        self.refresh_history()
-        indicator = self.query_one("#active-run-indicator")
-        indicator.styles.display = "none"
-
     def compose(self):
         yield Header()
         with Container(classes="main-container"):
             yield Label("TEST ARCHIV", classes="panel-title-text")
             yield Label("", id="active-run-indicator")
+            yield ProgressBar(id="run-progress", show_eta=False)
+            yield Label("", id="export-status")
+            yield Input(placeholder="Filter: model:llama3 dataset:logic since:2026-01-01 until:2026-12-31", id="history-filter")
             yield DataTable(id="history-table")
-            yield Label("Enter: Details | E: Export", id="hint-text")
+            yield Label("Enter: Details | F: Fortsetzen | V: Vergleichen | Entf: Löschen | E: Export", id="hint-text")
         yield Footer()
 
     def on_mount(self):
         table = self.query_one("#history-table")
-        table.add_columns(
-            "Datum", "Modell", "Ø Score", "Ø Dauer(s)", "Ø TPS", "Ø RespLen", "Status", "Datasets"
-        )
+        for key, label, _ in HISTORY_COLUMNS:
+            table.add_column(label, key=key)
         table.cursor_type = "row"
+        self.filters = {}
+        self.sort_key = "date"
+        self.sort_desc = True
         self.refresh_history()
+        table.focus()
         self._run_active = False
+        self._compare_base = None
+        self._delete_pending = None
+        self._export_active = False
+        self._cancel = None
+        self._last_failure_notice = 0.0
 
-    def action_rerun_selected(self):
+    def on_screen_resume(self):
+        # Schwelle in der Config geändert: Status-Spalte neu aufbauen
+        config = load_config()
+        if config and config.version != getattr(self, "_config_version", None) and not getattr(self, "_run_active", False):
+            self.refresh_history()
+
+    def _selected_run(self):
         table = self.query_one("#history-table")
-        idx = table.cursor_row
+        if table.row_count == 0:
+            return None
+        row_key, _ = table.coordinate_to_cell_key(table.cursor_coordinate)
+        return self.runs.get(row_key.value)
 
-        if idx is None or idx >= len(self.runs):
+    def action_rerun_selected(self):
+        selected_run = self._selected_run()
+
+        if selected_run is None:
             self.app.notify("Kein Lauf ausgewählt.", severity="warning")
             return
 
@@ -57,41 +131,264 @@ class ResultArchiveScreen(Screen):
             self.app.notify("Ein Testlauf läuft bereits.", severity="warning")
             return
 
-        selected_run = self.runs[idx]
-        model = selected_run["model"]
+        models = selected_run.get("models") or [selected_run["model"]]
         datasets = selected_run["datasets"]
 
-        self._run_active = True
-        self.show_loading_state()
-
         self.app.notify(
-            f"Neuer Testlauf gestartet: {model} | {', '.join(datasets)}",
+            f"Neuer Testlauf gestartet: {', '.join(models)} | {', '.join(datasets)}",
             title="Rerun",
             timeout=5
         )
 
-        self.run_benchmark(model, datasets)
+        self.start_benchmark(models, datasets, sample=selected_run.get("run_type") == "sample")
+
+    def action_resume_selected(self):
+        selected_run = self._selected_run()
+
+        if selected_run is None:
+            self.app.notify("Kein Lauf ausgewählt.", severity="warning")
+            return
+
+        # Stichproben lassen sich auch abgeschlossen zum vollständigen Run erweitern
+        is_sample = selected_run.get("run_type") == "sample"
+        if selected_run.get("status") != STATUS_PARTIAL and not (is_sample and selected_run.get("status") != STATUS_RUNNING):
+            self.app.notify("Nur unterbrochene Läufe können fortgesetzt werden.", severity="warning")
+            return
+
+        if selected_run.get("run_type") == "probe":
+            self.app.notify("Kapazitätsmessungen können nicht fortgesetzt werden.", severity="warning")
+            return
+
+        if self._run_active:
+            self.app.notify("Ein Testlauf läuft bereits.", severity="warning")
+            return
+
+        self.app.notify(
+            f"{'Erweitere Stichprobe zum vollen Lauf' if is_sample else 'Setze Lauf fort'}: "
+            f"{selected_run['model']} ({selected_run['item_count']} Items bereits fertig)",
+            title="Fortsetzen",
+            timeout=5
+        )
+        self._run_active = True
+        self.show_loading_state()
+        self.run_benchmark(None, None, resume_id=selected_run["id"])
+
+    def action_compare_selected(self):
+        """Erstes V merkt den Basis-Run, zweites V vergleicht ihn mit dem dann gewählten."""
+        selected_run = self._selected_run()
+
+        if selected_run is None:
+            self.app.notify("Kein Lauf ausgewählt.", severity="warning")
+            return
+
+        base = self._compare_base
+        if base is None or base["id"] == selected_run["id"]:
+            self._compare_base = selected_run
+            self.app.notify(
+                f"Basis: {selected_run['model']} ({selected_run['timestamp']}). Zweiten Lauf wählen und V drücken.",
+                title="Vergleich"
+            )
+            return
+
+        self._compare_base = None
+        from ui.modals import RegressionModal
+        self.app.push_screen(RegressionModal(base, selected_run))
+
+    def action_delete_selected(self):
+        """Entf zweimal auf demselben Run löscht ihn samt nicht mehr benötigter Texte."""
+        selected_run = self._selected_run()
+
+        if selected_run is None:
+            self.app.notify("Kein Lauf ausgewählt.", severity="warning")
+            return
+
+        if self._delete_pending != selected_run["id"]:
+            self._delete_pending = selected_run["id"]
+            self.app.notify(
+                f"{selected_run['model']} ({selected_run['timestamp']}) wirklich löschen? Zum Bestätigen erneut Entf drücken.",
+                title="Löschen", severity="warning"
+            )
+            return
+
+        self._delete_pending = None
+        try:
+            freed = delete_run(selected_run["id"])
+        except (KeyError, ValueError) as e:
+            self.app.notify(f"Löschen nicht möglich: {e}", severity="error")
+            return
+        if self._compare_base and self._compare_base["id"] == selected_run["id"]:
+            self._compare_base = None
+        self.query_one("#history-table").remove_row(selected_run["id"])
+        del self.runs[selected_run["id"]]
+        # Die nächste Seite beginnt sonst einen Run zu spät
+        self._loaded_from_db = max(0, self._loaded_from_db - 1)
+        self.app.notify(f"Lauf gelöscht ({freed} Texte freigegeben).", title="Löschen")
+
+    def action_export(self):
+        """E öffnet den Export-Dialog für den gewählten Run oder alle Runs zum aktuellen Filter."""
+        if self._export_active:
+            self.app.notify("Ein Export läuft bereits.", severity="warning")
+            return
+        from ui.modals import ExportModal
+        self.app.push_screen(ExportModal(self._selected_run(), dict(self.filters)), callback=self._start_export)
+
+    def _start_export(self, options):
+        if not options:
+            return
+        self._export_active = True
+        status = self.query_one("#export-status")
+        status.update(f"[#e89f46]Export nach {options['path']} läuft...[/]")
+        status.styles.display = "block"
+        self.export_runs(options)
+
+    @work(exclusive=True, thread=True, group="export")
+    def export_runs(self, options):
+        # Eigene Worker-Gruppe: ein Export bricht keinen laufenden Benchmark ab
+        try:
+            count = export_items(
+                options["path"], fmt=options["fmt"], columns=options["columns"], run_ids=options["run_ids"],
+                on_progress=lambda done, total: self.post_message(ExportProgress(done, total)),
+                **options["filters"]
+            )
+        except Exception as e:
+            self.post_message(ExportFailed(str(e)))
+            return
+        self.post_message(ExportFinished(options["path"], count))
+
+    def on_export_progress(self, message: ExportProgress):
+        percent = f" ({message.done / message.total:.0%})" if message.total else ""
+        self.query_one("#export-status").update(
+            f"[#e89f46]Export: {message.done}/{message.total} Items{percent}[/]"
+        )
+
+    def _end_export_state(self):
+        self._export_active = False
+        self.query_one("#export-status").styles.display = "none"
+
+    def on_export_finished(self, message: ExportFinished):
+        self._end_export_state()
+        self.app.notify(f"{message.count} Items nach {message.path} exportiert.", title="Export")
+
+    def on_export_failed(self, message: ExportFailed):
+        self._end_export_state()
+        self.app.notify(f"Export fehlgeschlagen: {message.error}", severity="error")
+
+    def start_benchmark(self, models, datasets, cache_policy=None, sample=False):
+        """Gemeinsamer Einstieg für Launcher und Rerun (mehrere Modelle = Matrix-Run, `sample` = Stichprobe)."""
+        self._run_active = True
+        self.show_loading_state()
+        self.run_benchmark(models, datasets, cache_policy, sample=sample)
+
+    def _status_cell(self, run):
+        status = run.get("status")
+        if status == STATUS_RUNNING:
+            return "⏳"
+        if status == STATUS_PARTIAL:
+            return "⏸️ teilweise"
+        score = run["estimate"] if run.get("run_type") == "sample" and run.get("estimate") is not None else run["avg_score"]
+        # ♻: Antworten (teilweise) aus dem Antwort-Cache, nicht neu gemessen
+        return ("✅" if score >= self._threshold else "⚠️") + (" ♻" if run.get("cache_hits") else "")
+
+    @staticmethod
+    def _score_cell(run):
+        # Stichprobe: geschätzter gewichteter Score mit halber Intervallbreite
+        if run.get("run_type") == "sample" and run.get("estimate") is not None:
+            half = (run["ci_high"] - run["ci_low"]) / 2
+            return SortableCell(f"≈{run['estimate']}% ±{half:.1f}", (run["estimate"], run["id"]))
+        return SortableCell(f"{run['avg_score']}%", (run["avg_score"], run["id"]))
+
+    def _row_cells(self, run):
+        return [
+            SortableCell(run["timestamp"], (run.get("created_at", ""), run["id"])),
+            SortableCell(
+                RUN_TYPE_LABELS[run["run_type"]] + run["model"] if run.get("run_type") in RUN_TYPE_LABELS else run["model"],
+                (run["model"], run["id"])
+            ),
+            self._score_cell(run),
+            SortableCell(f"{run.get('avg_duration', 0)}", (run.get("avg_duration", 0), run["id"])),
+            f"{run.get('duration_p50', '-')}/{run.get('duration_p90', '-')}/{run.get('duration_p99', '-')}",
+            # "~": TPS beruht (teilweise) auf lokal geschätzten Token-Zahlen
+            SortableCell(
+                f"{'~' if run.get('estimated_token_items') else ''}{run.get('avg_tps', 0)}",
+                (run.get("avg_tps", 0), run["id"])
+            ),
+            f"{run.get('avg_response_length', 0)}",
+            self._status_cell(run),
+            ", ".join(run["datasets"])
+        ]
 
     def refresh_history(self):
+        """Baut die Tabelle für aktuelle Filter/Sortierung neu auf und lädt die erste Seite."""
         table = self.query_one("#history-table")
         table.clear()
-        self.runs = load_all_runs()
-        for run in self.runs:
-            table.add_row(
-                run["timestamp"],
-                run["model"],
-                f"{run['avg_score']}%",
-                f"{run.get('avg_duration', 0)}",
-                f"{run.get('avg_tps', 0)}",
-                f"{run.get('avg_response_length', 0)}",
-                "✅" if run["avg_score"] >= 80 else "⚠️",
-                ", ".join(run["datasets"])
-            )
+        self.runs = {}
+        # Schwelle einmal pro Neuaufbau lesen, nicht pro Zeile
+        config = load_config()
+        self._config_version = config.version if config else None
+        self._threshold = config.get_app_settings().get("default_threshold", 80) if config else 80
+        self._loaded_from_db = 0
+        self._exhausted = False
+        self.load_next_page()
+
+    def load_next_page(self):
+        if self._exhausted:
+            return
+        page = query_runs(
+            offset=self._loaded_from_db, limit=PAGE_SIZE,
+            sort=self.sort_key, descending=self.sort_desc, **self.filters
+        )
+        self._loaded_from_db += len(page)
+        self._exhausted = len(page) < PAGE_SIZE
+
+        table = self.query_one("#history-table")
+        for run in page:
+            # Zwischenzeitlich lokal eingefügte Runs verschieben die Offsets
+            if run["id"] in self.runs:
+                continue
+            self.runs[run["id"]] = run
+            table.add_row(*self._row_cells(run), key=run["id"])
+
+    def add_run_row(self, run):
+        """Fügt nach einem fertigen Benchmark nur die neue Zeile ein, statt alles neu zu laden."""
+        if not run_matches(run, **self.filters):
+            return
+        table = self.query_one("#history-table")
+        if run["id"] in self.runs:
+            # Fortgesetzter oder beim Laden noch laufender Run: Zeile ersetzen
+            table.remove_row(run["id"])
+        self.runs[run["id"]] = run
+        table.add_row(*self._row_cells(run), key=run["id"])
+        table.sort(self.sort_key, key=lambda cell: cell.sort_value, reverse=self.sort_desc)
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted):
+        if event.data_table.id != "history-table":
+            return
+        if event.cursor_row >= event.data_table.row_count - PREFETCH_ROWS:
+            self.load_next_page()
+
+    def on_data_table_header_selected(self, event: DataTable.HeaderSelected):
+        sort_key = dict((key, sort) for key, _, sort in HISTORY_COLUMNS).get(event.column_key.value)
+        if sort_key is None:
+            return
+        if sort_key == self.sort_key:
+            self.sort_desc = not self.sort_desc
+        else:
+            self.sort_key, self.sort_desc = sort_key, True
+        self.refresh_history()
+
+    def on_input_submitted(self, event: Input.Submitted):
+        if event.input.id == "history-filter":
+            self.filters = parse_filter(event.value)
+            self.refresh_history()
+            self.query_one("#history-table").focus()
 
     def show_loading_state(self):
         indicator = self.query_one("#active-run-indicator")
-        indicator.update("[#e89f46]Testlauf aktiv... Bitte warten.[/]")
+        indicator.update("[#e89f46]Testlauf aktiv... Bitte warten. (X: abbrechen)[/]")
         indicator.styles.display = "block"
+        bar = self.query_one("#run-progress")
+        bar.update(total=None, progress=0)
+        bar.styles.display = "block"
 
     def action_launch_test(self):
         if self._run_active:
@@ -101,75 +398,132 @@ class ResultArchiveScreen(Screen):
         self.app.push_screen(LauncherScreen(callback=self.refresh_history))
 
     def action_view_details(self):
-        table = self.query_one("#history-table")
-        idx = table.cursor_row
-        
-        if idx is not None and idx < len(self.runs):
-            selected_run = self.runs[idx]
+        selected_run = self._selected_run()
+
+        if selected_run is not None:
             from ui.modals import RunDetailModal
             self.app.push_screen(RunDetailModal(selected_run))
         else:
             self.app.notify("Kein Lauf ausgewählt.", severity="warning")
     
     @work(exclusive=True, thread=True)
-    def run_benchmark(self, model, datasets):
-        adapter = OllamaAdapter(model)
-        all_results = []
+    def run_benchmark(self, models, datasets, cache_policy=None, resume_id=None, sample=False):
+        already_done = 0
+        if resume_id:
+            resumed = load_run(resume_id)
+            models = resumed.get("models") or [resumed["model"]]
+            datasets = resumed["datasets"]
+            already_done = resumed["item_count"]
+        self._cancel = threading.Event()
+        # Höchstens ~4 Updates pro Sekunde, egal wie schnell die Items fertig werden
+        progress = ProgressTracker(
+            None, on_update=lambda snapshot: self._broadcast(BenchmarkProgress(snapshot)),
+            interval=PROGRESS_INTERVAL, already_done=already_done, on_events=self._broadcast_items
+        )
 
-        for ds_name in datasets:
-            ds_path = os.path.join("datasets", ds_name)
+        def count_total():
+            # Ein geändertes Dataset wird dafür neu gelesen: nicht vor dem Start des Runs warten
+            manifests = load_manifests()
+            progress.set_total(sum(manifests[d]["count"] for d in datasets if d in manifests) * len(models))
 
-            if not os.path.exists(ds_path):
-                continue
+        threading.Thread(target=count_total, daemon=True).start()
+        run_options = {"cache_policy": cache_policy, "cancel": self._cancel, "progress": progress}
+        try:
+            if resume_id:
+                new_run = resume_run(resume_id, **run_options)
+            elif sample:
+                # Fortschritt bezieht sich auf die ganze Suite; die Stichprobe endet meist deutlich früher
+                new_run = run_sample(models[0], datasets, **run_options)
+            elif len(models) > 1:
+                new_run = run_matrix(models, datasets, **run_options)
+            else:
+                new_run = run_suite(models[0], datasets, **run_options)
+        except Exception as e:
+            # Der Run bleibt mit allen fertigen Items als "partial" im Archiv
+            self._broadcast(BenchmarkFailed(str(e)))
+            return
+        progress.flush()
+        self._broadcast(BenchmarkFinished(new_run))
 
-            with open(ds_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            for item in data:
-                start = time.time()
-                res = adapter.send(item["prompt"])
-                end = time.time()
-
-                duration = res.get("metrics", {}).get("duration", end - start)
-                token_count = res.get("metrics", {}).get("tokens", len(res.get("response","").split()))
-                tps = token_count / max(duration, 0.001)
-                response_length = len(res.get("response",""))
-
-                eval_data = score_response(res.get("response",""), item.get("expected_keywords", []))
-
-                completeness = eval_data.get("completeness", True)
-                keywords_present = eval_data.get("keywords_present", 0)
-
-                all_results.append({
-                    "id": item.get("id", "unknown"),
-                    "prompt": item["prompt"],
-                    "response": res.get("response", ""),
-                    "score": eval_data.get("score", 0),
-                    "status": "✅" if eval_data.get("score",0) >= 80 else "⚠️",
-                    "metrics": {
-                        "duration": duration,
-                        "token_count": token_count,
-                        "tps": tps,
-                        "response_length": response_length
-                    },
-                    "business": {
-                        "completeness": completeness,
-                        "keywords_present": keywords_present
-                    }
-                })
-
-        save_run(model, datasets, all_results)
-        self.app.call_from_thread(self._finalize_global)
-        
-    def _finalize_global(self):
-        self.app.notify("Benchmark done!")
-
-        from ui.results import ResultArchiveScreen
-        for screen in self.app.screen_stack:
+    def _broadcast(self, message):
+        """Meldung an alle offenen Archiv-Screens (aus dem Worker-Thread, post_message ist thread-sicher)."""
+        for screen in list(self.app.screen_stack):
             if isinstance(screen, ResultArchiveScreen):
-                screen.refresh_history()
-                try:
-                    indicator = screen.query_one("#active-run-indicator")
-                    indicator.styles.display = "none"
-                except:
-                    pass
\ No newline at end of file
+                screen.post_message(message)
+
+    def _broadcast_items(self, events):
+        for kind, items in events.items():
+            self._broadcast(ITEM_MESSAGES[kind](items))
+
+    def on_items_failed(self, message: ItemsFailed):
+        now = time.monotonic()
+        if now - self._last_failure_notice < FAILURE_NOTIFY_INTERVAL:
+            return
+        self._last_failure_notice = now
+        first = message.items[0]
+        more = f" (+{len(message.items) - 1} weitere)" if len(message.items) > 1 else ""
+        self.app.notify(f"{first['id']}: {first['error']}{more}", title="Item fehlgeschlagen", severity="error")
+
+    def action_cancel_run(self):
+        if not self._run_active or self._cancel is None:
+            self.app.notify("Kein Testlauf aktiv.", severity="warning")
+            return
+        self._cancel.set()
+        self.query_one("#active-run-indicator").update(
+            "[#e89f46]Breche ab... laufende Requests werden noch gespeichert.[/]"
+        )
+
+    def _end_run_state(self):
+        self._run_active = False
+        self.query_one("#active-run-indicator").styles.display = "none"
+        self.query_one("#run-progress").styles.display = "none"
+
+    def on_benchmark_progress(self, message: BenchmarkProgress):
+        with span("ui.progress"):
+            self._show_progress(message)
+
+    def _show_progress(self, message):
+        if not self._run_active:
+            # Zweiter Archiv-Screen, der den Run nicht selbst gestartet hat
+            self._run_active = True
+            self.show_loading_state()
+        snap = message.snapshot
+        bar = self.query_one("#run-progress")
+        bar.update(total=snap["total"] or None, progress=snap["finished"])
+
+        parts = [f"{snap['finished']}/{snap['total'] or '?'} Items", f"{snap['items_per_s']} Items/s"]
+        if snap["eta"] is not None:
+            minutes, seconds = divmod(int(snap["eta"]), 60)
+            parts.append(f"ETA {minutes}:{seconds:02d}")
+        if snap["p95"] is not None:
+            parts.append(f"p95 {snap['p95']:.2f}s")
+        if snap["failed"]:
+            parts.append(f"[red]{snap['failed']} Fehler[/]")
+        if not self._cancel_requested():
+            self.query_one("#active-run-indicator").update(
+                "[#e89f46]Testlauf aktiv: " + " | ".join(parts) + " — X: abbrechen[/]"
+            )
+
+    def _cancel_requested(self):
+        return self._cancel is not None and self._cancel.is_set()
+
+    def on_benchmark_finished(self, message: BenchmarkFinished):
+        run = message.run
+        if run.get("status") == STATUS_PARTIAL:
+            self.app.notify(
+                f"Benchmark abgebrochen: {run['item_count']} Items gespeichert (F: fortsetzen)", severity="warning"
+            )
+        elif run.get("cache_hits"):
+            self.app.notify(
+                f"Benchmark done! {run['cache_hits']} von {run['item_count']} Antworten aus dem Cache (nicht neu gemessen)",
+                severity="warning"
+            )
+        else:
+            self.app.notify("Benchmark done!")
+        self._end_run_state()
+        self.add_run_row({k: v for k, v in run.items() if k != "details"})
+
+    def on_benchmark_failed(self, message: BenchmarkFailed):
+        self.app.notify(f"Benchmark abgebrochen: {message.error} (F: fortsetzen)", severity="error")
+        self._end_run_state()
+        self.refresh_history()